@@ -1,4 +1,8 @@
+from .batch import TestCaseBatch
+from .comparator import Comparator
+from .limits import ResourceLimits
 from .mygrader import Tester
 from .printer import print_test_results
+from .report import TestReport, TestTimeoutError
 from .template import log_template
 from .writer import write_failed_cases_to_csv
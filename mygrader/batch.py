@@ -0,0 +1,386 @@
+from multiprocessing import shared_memory
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# The kinds of columns, with the NumPy type of their values. Ragged columns also have an int64 array of offsets.
+# Ints that do not all fit in an int64 are stored as the bytes of their decimal digits, like strings
+_KINDS = {
+    "int": np.int64,
+    "float": np.float64,
+    "bool": np.bool_,
+    "str": np.uint8,
+    "big_int": np.uint8,
+    "int_list": np.int64,
+    "float_list": np.float64,
+}
+_RAGGED = ("str", "big_int", "int_list", "float_list")
+_TEXT = ("str", "big_int")
+
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+# Every buffer starts at a multiple of this many bytes
+_ALIGNMENT = 8
+
+
+def _copy_arrays(layout: List[Tuple[str, List[Tuple[int, int]]]], columns: List[List[np.ndarray]], buffer: Any) -> None:
+    """
+    Copy the arrays of the columns of a batch to their place in a buffer.
+    """
+    for (kind, placement), arrays in zip(layout, columns):
+        for (offset, _), array in zip(placement, arrays):
+            buffer[offset:offset + array.nbytes] = array.tobytes()
+
+
+def _column_kind(values: Sequence) -> str:
+    """
+    Find the kind of column that stores a parameter of every test case.
+    """
+    types = set(map(type, values))
+
+    if len(types) == 1:
+        value_type = types.pop()
+        if value_type is int and values and not _INT64_MIN <= min(values) <= max(values) <= _INT64_MAX:
+            return "big_int"
+
+        if value_type in (int, float, bool, str):
+            return value_type.__name__
+
+        if value_type is list:
+            item_types = set(type(item) for value in values for item in value)
+            if item_types <= {float}:
+                return "float_list"
+            if item_types == {int}:
+                return "int_list"
+
+    raise TypeError(
+        f"Unsupported parameter types: {', '.join(sorted(t.__name__ for t in set(map(type, values))))}. "
+        "A column must hold ints, floats, bools, strings, lists of ints or lists of floats."
+    )
+
+
+class TestCaseBatch:
+    """
+    A compact, read-only set of test cases, stored as one column per parameter instead of a list of tuples.
+
+    Numeric parameters are NumPy arrays of int64, float64 or bools, and strings and lists of ints or floats are
+    stored as the concatenation of their values, with an array of offsets to where each one starts. A column of
+    ints that do not all fit in an int64, such as the milliseconds of `display_time`, is stored as the decimal
+    digits of its ints, like a column of strings, and comes back as a list of Python ints. All the
+    columns live in a single buffer, so a batch of 10^7 `kth_digit` cases takes 160 MB instead of about 1.5 GB
+    of Python objects.
+
+    `share` moves the buffer to a block of shared memory. A shared batch is pickled as the name of the block,
+    so the worker processes of a run map the same pages instead of receiving a copy of the cases. The test
+    cases come back as tuples of Python values, the same as the ones the batch was built from.
+
+    Example:
+        >>> batch = TestCaseBatch.generate(Generator, "kth_digit", seed=42, num_test_cases=10_000_000)
+        >>> with batch.share() as shared:
+        ...     report = tester.run_test(kth_digit, cases=shared)
+    """
+
+    __test__ = False
+
+    def __init__(
+            self,
+            layout: List[Tuple[str, List[Tuple[int, int]]]],
+            buffer: Any,
+            num_cases: int,
+            seed: Optional[int] = None,
+            shm: Optional[shared_memory.SharedMemory] = None,
+            owner: bool = False
+    ) -> None:
+        """
+        Wrap a buffer of columns. A batch is built with `from_cases`, `from_columns` or `generate` instead.
+
+        Args:
+            layout (List[Tuple[str, List[Tuple[int, int]]]]): The kind of each column, with the offset (in bytes)
+                and the length of each of its arrays in the buffer: the values, then the offsets if it is ragged.
+            buffer (Any): The buffer of the columns.
+            num_cases (int): The number of test cases.
+            seed (Optional[int]): The seed the test cases were generated from, or None.
+            shm (Optional[shared_memory.SharedMemory]): The shared memory block of the buffer, or None.
+            owner (bool): Whether the batch created the shared memory block, and unlinks it when closed.
+        """
+        self.layout: List[Tuple[str, List[Tuple[int, int]]]] = layout
+        self.num_cases: int = num_cases
+        self.seed: Optional[int] = seed
+        self._columns: List[List[np.ndarray]] = [
+            [
+                np.frombuffer(buffer, dtype=np.int64 if i else _KINDS[kind], count=count, offset=offset)
+                for i, (offset, count) in enumerate(arrays)
+            ]
+            for kind, arrays in layout
+        ]
+        self._shm: Optional[shared_memory.SharedMemory] = shm
+        self._owner: bool = owner
+
+    @classmethod
+    def from_columns(cls, columns: Sequence, seed: Optional[int] = None) -> "TestCaseBatch":
+        """
+        Build a batch from the value of each parameter in every test case.
+
+        Args:
+            columns (Sequence): One sequence per parameter, such as the columns of `Generator.columns`:
+                a NumPy array of numbers or bools, or a list of ints, floats, bools, strings or lists.
+            seed (Optional[int]): The seed the test cases were generated from, or None.
+
+        Returns:
+            TestCaseBatch: The batch, in the memory of the calling process.
+
+        Raises:
+            TypeError: If a column holds values of another type, or of several types.
+            ValueError: If the columns do not all have the same length.
+        """
+        lengths = {len(column) for column in columns}
+        if len(lengths) > 1:
+            raise ValueError("Invalid columns. Every column must hold one value per test case.")
+        num_cases = lengths.pop() if lengths else 0
+
+        arrays = []
+        kinds = []
+        for column in columns:
+            if isinstance(column, np.ndarray) and column.dtype.kind in "ib":
+                kind = "bool" if column.dtype.kind == "b" else "int"
+            elif isinstance(column, np.ndarray) and column.dtype.kind == "f":
+                kind = "float"
+            else:
+                kind = _column_kind(column)
+
+            if kind in _TEXT:
+                encoded = [
+                    value.encode("utf-8", "surrogatepass") if kind == "str" else str(value).encode("ascii")
+                    for value in column
+                ]
+                values = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+                sizes = np.fromiter(map(len, encoded), dtype=np.int64, count=num_cases)
+            elif kind in _RAGGED:
+                values = np.fromiter((item for value in column for item in value), dtype=_KINDS[kind])
+                sizes = np.fromiter(map(len, column), dtype=np.int64, count=num_cases)
+            else:
+                values, sizes = np.asarray(column, dtype=_KINDS[kind]), None
+
+            kinds.append(kind)
+            if sizes is None:
+                arrays.append([values])
+            else:
+                offsets = np.zeros(num_cases + 1, dtype=np.int64)
+                np.cumsum(sizes, out=offsets[1:])
+                arrays.append([values, offsets])
+
+        # Lay the arrays out one after the other, each one aligned
+        layout = []
+        size = 0
+        for kind, column_arrays in zip(kinds, arrays):
+            placement = []
+            for array in column_arrays:
+                placement.append((size, len(array)))
+                size += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+            layout.append((kind, placement))
+
+        buffer = bytearray(size)
+        _copy_arrays(layout, arrays, buffer)
+        return cls(layout, buffer, num_cases, seed)
+
+    @classmethod
+    def from_cases(cls, cases: Sequence[tuple], seed: Optional[int] = None) -> "TestCaseBatch":
+        """
+        Build a batch from a list of test cases.
+
+        Args:
+            cases (Sequence[tuple]): The parameters of each test case.
+            seed (Optional[int]): The seed the test cases were generated from, or None.
+
+        Returns:
+            TestCaseBatch: The batch, in the memory of the calling process.
+
+        Raises:
+            TypeError: If a parameter is not a number, a bool, a string or a list of numbers,
+                or has different types in different cases.
+            ValueError: If the cases do not all have the same number of parameters.
+        """
+        if len({len(params) for params in cases}) > 1:
+            raise ValueError("Invalid test cases. Every test case must have the same number of parameters.")
+
+        return cls.from_columns([list(column) for column in zip(*cases)], seed)
+
+    @classmethod
+    def generate(cls, generator: Any, func_name: str, seed: int, num_test_cases: int) -> "TestCaseBatch":
+        """
+        Generate the test cases of a run of a function as a batch.
+
+        Args:
+            generator (Any): The Generator class of the year.
+            func_name (str): The name of the function the test cases are for.
+            seed (int): The seed of the test cases.
+            num_test_cases (int): The number of test cases.
+
+        Returns:
+            TestCaseBatch: The same test cases as a run of `num_test_cases` cases with this seed.
+        """
+        num_cases = generator.num_cases(func_name, num_test_cases)
+
+        if generator.has_bulk(func_name):
+            return cls.from_columns(generator.columns(func_name, seed, 0, num_cases), seed)
+
+        return cls.from_cases(list(generator.iter_cases(func_name, seed, 0, num_cases)), seed)
+
+    def __len__(self) -> int:
+        return self.num_cases
+
+    def __repr__(self) -> str:
+        kinds = ", ".join(kind for kind, _ in self.layout)
+        location = f"shared memory {self._shm.name}" if self._shm is not None else "local memory"
+        return f"TestCaseBatch({self.num_cases} cases of ({kinds}), {self.nbytes} bytes in {location})"
+
+    def __getitem__(self, index: int) -> tuple:
+        if not 0 <= index < self.num_cases:
+            raise IndexError(f"No test case {index} in a batch of {self.num_cases}")
+
+        return self.cases(index, index + 1)[0]
+
+    def __iter__(self) -> Iterator[tuple]:
+        return self.iter_cases(0, self.num_cases)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The size (in bytes) of the buffer of the columns.
+        """
+        return sum(array.nbytes for arrays in self._columns for array in arrays)
+
+    @property
+    def shared(self) -> bool:
+        """
+        Whether the batch is in shared memory.
+        """
+        return self._shm is not None
+
+    def columns(self, start: int, stop: int) -> tuple:
+        """
+        Get the test cases with indices in [start, stop), as one column per parameter.
+
+        Args:
+            start (int): The index of the first test case.
+            stop (int): The index after the last test case.
+
+        Returns:
+            tuple: A read-only NumPy array for each numeric parameter, and a list of the values of each other one,
+                like the columns of `Generator.columns`.
+        """
+        start, stop = max(start, 0), min(stop, self.num_cases)
+        stop = max(start, stop)
+
+        columns = []
+        for (kind, _), arrays in zip(self.layout, self._columns):
+            if kind not in _RAGGED:
+                columns.append(arrays[0][start:stop])
+                continue
+
+            values, offsets = arrays
+            offsets = offsets[start:stop + 1]
+            ends = (offsets[1:] - offsets[0]).tolist()
+            if kind in _TEXT:
+                # The offsets count bytes, so the strings are split before they are decoded
+                flat = values[offsets[0]:offsets[-1]].tobytes()
+                column = [flat[a:b].decode("utf-8", "surrogatepass") for a, b in zip([0] + ends[:-1], ends)]
+                if kind == "big_int":
+                    column = list(map(int, column))
+            else:
+                flat = values[offsets[0]:offsets[-1]].tolist()
+                column = [flat[a:b] for a, b in zip([0] + ends[:-1], ends)]
+            columns.append(column)
+
+        return tuple(columns)
+
+    def cases(self, start: int, stop: int) -> List[tuple]:
+        """
+        Get the test cases with indices in [start, stop), as tuples of Python values.
+        """
+        return list(zip(*(
+            column.tolist() if isinstance(column, np.ndarray) else column for column in self.columns(start, stop)
+        )))
+
+    def iter_cases(self, start: int, stop: int, chunk_size: int = 4096) -> Iterator[tuple]:
+        """
+        Lazily get the test cases with indices in [start, stop), a chunk at a time, like `Generator.iter_cases`.
+        """
+        for chunk_start in range(max(start, 0), min(stop, self.num_cases), chunk_size):
+            yield from self.cases(chunk_start, min(chunk_start + chunk_size, stop))
+
+    def share(self) -> "TestCaseBatch":
+        """
+        Copy the batch to a new block of shared memory.
+
+        Returns:
+            TestCaseBatch: The shared batch, which owns the block and frees it when it is closed.
+                A batch that is already shared is returned as is.
+        """
+        if self._shm is not None:
+            return self
+
+        # A block of shared memory cannot be empty
+        shm = shared_memory.SharedMemory(create=True, size=max(self.__buffer_size(), 1))
+        _copy_arrays(self.layout, self._columns, shm.buf)
+
+        return type(self)(self.layout, shm.buf, self.num_cases, self.seed, shm=shm, owner=True)
+
+    def close(self) -> None:
+        """
+        Release the shared memory of the batch, and free it if the batch created it. The batch cannot be used after.
+        """
+        self._columns = []
+        if self._shm is None:
+            return
+
+        shm, self._shm = self._shm, None
+        shm.close()
+        if self._owner:
+            shm.unlink()
+
+    def __enter__(self) -> "TestCaseBatch":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __reduce__(self) -> tuple:
+        # A shared batch is sent as the name of its block, which the receiving process maps
+        if self._shm is not None:
+            return _attach, (self._shm.name, self.layout, self.num_cases, self.seed)
+
+        return type(self).from_buffer, (self.layout, self.__to_bytes(), self.num_cases, self.seed)
+
+    @classmethod
+    def from_buffer(cls, layout: List, buffer: bytes, num_cases: int, seed: Optional[int]) -> "TestCaseBatch":
+        """
+        Rebuild a batch in local memory from the bytes of its buffer.
+        """
+        return cls(layout, buffer, num_cases, seed)
+
+    def __buffer_size(self) -> int:
+        """
+        Get the size (in bytes) of the buffer, up to the end of its last array.
+        """
+        return max(
+            (offset + array.nbytes for (kind, placement), arrays in zip(self.layout, self._columns)
+             for (offset, _), array in zip(placement, arrays)),
+            default=0
+        )
+
+    def __to_bytes(self) -> bytes:
+        """
+        Copy the buffer of the batch.
+        """
+        buffer = bytearray(self.__buffer_size())
+        _copy_arrays(self.layout, self._columns, buffer)
+        return bytes(buffer)
+
+
+def _attach(name: str, layout: List, num_cases: int, seed: Optional[int]) -> TestCaseBatch:
+    """
+    Map a batch shared by another process.
+    """
+    shm = shared_memory.SharedMemory(name=name)
+    return TestCaseBatch(layout, shm.buf, num_cases, seed, shm=shm)
@@ -0,0 +1,90 @@
+import contextlib
+import io
+from typing import Any, Callable, List
+
+
+class _NullWriter(io.TextIOBase):
+    """
+    A text stream that discards everything written to it.
+    """
+
+    def write(self, text: str) -> int:
+        return len(text)
+
+
+class _PartsWriter(io.TextIOBase):
+    """
+    A text stream that keeps every string written to it, in order, in a list.
+
+    Appending to a list is cheaper than writing to an io.StringIO once the buffer has been read and reset,
+    which matters for functions that print one character at a time.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.parts: List[str] = []
+
+    def write(self, text: str) -> int:
+        self.parts.append(text)
+        return len(text)
+
+
+class BatchCapture:
+    """
+    Capture the printed output of many calls with a single redirection of stdout.
+
+    Stdout is redirected once for the whole batch. For functions that print their answer, every call
+    writes into the same reusable buffer and its output is sliced out from the offset where it started;
+    `clear` empties the buffer between test cases. For functions that return their answer, nothing is
+    captured and whatever they print is discarded.
+
+    Example:
+        >>> with BatchCapture(capture=True) as capture:
+        ...     first = capture.call(print, "Hello")
+        ...     second = capture.call(print, "world!")
+        ...     capture.clear()
+        >>> first, second
+        ('Hello\\n', 'world!\\n')
+    """
+
+    def __init__(self, capture: bool) -> None:
+        """
+        Args:
+            capture (bool): If True, `call` returns the printed text, otherwise the return value.
+        """
+        self.capture: bool = capture
+        self.buffer: io.TextIOBase = _PartsWriter() if capture else _NullWriter()
+        self._redirect = contextlib.redirect_stdout(self.buffer)
+
+    def __enter__(self) -> "BatchCapture":
+        self._redirect.__enter__()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._redirect.__exit__(*exc_info)
+
+    def call(self, func: Callable, *args: Any) -> Any:
+        """
+        Call a function inside the batch.
+
+        Args:
+            func (Callable): The function to call.
+            *args: Arguments to pass to the function.
+
+        Returns:
+            Any: The text printed by the call when capturing, otherwise the return value of the call.
+        """
+        if not self.capture:
+            return func(*args)
+
+        parts = self.buffer.parts
+        start = len(parts)
+        func(*args)
+        return "".join(parts[start:])
+
+    def clear(self) -> None:
+        """
+        Empty the buffer, so that it only ever holds the output of a single test case.
+        """
+        if self.capture:
+            self.buffer.parts.clear()
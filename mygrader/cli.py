@@ -0,0 +1,305 @@
+import argparse
+import contextlib
+import importlib.util
+import os
+import sys
+import time
+from functools import partial
+from multiprocessing import RawArray
+from types import ModuleType
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from tqdm import tqdm
+
+from mygrader import src
+from mygrader.mygrader import Tester
+from mygrader.pool import WorkerPool
+from mygrader.report import TestTimeoutError
+from mygrader.writer import write_gradebook
+
+# The columns of the gradebook, in order
+GRADE_FIELDS = (
+    "student", "function", "status", "score", "passed", "failed",
+    "total_time", "user_time", "solver_time", "slowdown", "message"
+)
+
+
+def find_submissions(directory: str) -> List[str]:
+    """
+    Find the submission modules in a directory, one .py file per student named after the student.
+
+    Args:
+        directory (str): The directory of the submissions.
+
+    Returns:
+        List[str]: The paths of the submissions, sorted by name. Files starting with an underscore are skipped.
+    """
+    return [
+        os.path.join(directory, name) for name in sorted(os.listdir(directory))
+        if name.endswith(".py") and not name.startswith("_") and os.path.isfile(os.path.join(directory, name))
+    ]
+
+
+def _student(path: str) -> str:
+    """
+    Get the name of the student of a submission, the name of its file without the extension.
+    """
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def _grade(student: str, function: str, status: str, **fields: object) -> Dict:
+    """
+    Build a row of the gradebook, with the columns of a grade that were not given left empty.
+    """
+    grade = dict.fromkeys(GRADE_FIELDS, "")
+    grade.update(student=student, function=function, status=status, score=0.0)
+    grade.update(fields)
+    return grade
+
+
+def _load_submission(path: str, module_name: str) -> ModuleType:
+    """
+    Import a submission module under a unique name, discarding whatever it prints while it is imported.
+    """
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        spec.loader.exec_module(module)
+
+    return module
+
+
+def _grade_function(student: str, module: ModuleType, name: str, tester: Tester, num_test_cases: int) -> Dict:
+    """
+    Grade a function of a submission in the calling process.
+
+    Args:
+        student (str): The name of the student.
+        module (ModuleType): The submission module.
+        name (str): The name of the function to grade.
+        tester (Tester): The tester running the test cases in the calling process.
+        num_test_cases (int): The number of test cases of the function.
+
+    Returns:
+        Dict: The grade of the submission on the function.
+    """
+    user_func = getattr(module, name, None)
+    if not callable(user_func):
+        return _grade(student, name, "missing", message=f"Function {name} not found.")
+
+    try:
+        report = tester.run_test(user_func, num_test_cases)
+
+    except TestTimeoutError as e:
+        # The cases that ran before the runtime limit are still counted
+        return _grade(
+            student, name, "timeout", passed=e.report.passed_count, failed=e.report.failed_count, message=str(e)
+        )
+
+    except TimeoutError as e:
+        return _grade(student, name, "timeout", message=str(e))
+
+    except Exception as e:
+        return _grade(student, name, "error", message=str(e))
+
+    return _grade(
+        student, name, "ok",
+        score=report.success_rate,
+        passed=report.passed_count,
+        failed=report.failed_count,
+        total_time=report.total_time,
+        user_time=report.timings["user"],
+        solver_time=report.timings["solver"],
+        slowdown=report.slowdown
+    )
+
+
+def _grade_submissions(shard: Tuple[int, int], status: RawArray, **kwargs: object) -> List[Dict]:
+    """
+    Grade a shard of (submission, function) pairs in a worker of the pool.
+
+    Pair i is the function i % len(functions) of the submission i // len(functions), and a shard holds the pairs
+    of a single submission, so every submission is imported once for all its functions.
+
+    Args:
+        shard (Tuple[int, int]): The range of indices of the pairs of the shard.
+        status (RawArray): Shared with the parent, which reads the index and start time of the running pair
+            to enforce the function timeout.
+        **kwargs (Dict): The `submissions`, `functions`, `year`, `num_test_cases`, `runtime_limit` and `seed`.
+
+    Returns:
+        List[Dict]: The grade of each pair.
+    """
+    submissions: Sequence[str] = kwargs["submissions"]
+    functions: Sequence[str] = kwargs["functions"]
+
+    # The test cases run in the worker itself, which cannot start processes of its own
+    tester = Tester(
+        kwargs["year"], log_option="none", debug=True, runtime_limit=kwargs["runtime_limit"], seed=kwargs["seed"],
+        in_process=True
+    )
+
+    grades = []
+    loaded = module_name = module = import_error = None
+    try:
+        for pair in range(*shard):
+            status[1] = time.monotonic()
+            status[0] = pair
+
+            index, function = divmod(pair, len(functions))
+            student = _student(submissions[index])
+
+            if index != loaded:
+                sys.modules.pop(module_name, None)
+                loaded, module_name = index, f"_mygrader_submission_{index}"
+                try:
+                    module, import_error = _load_submission(submissions[index], module_name), None
+                except (Exception, SystemExit) as e:
+                    module, import_error = None, f"Import failed: {e!r}"
+
+            if module is None:
+                grades.append(_grade(student, functions[function], "error", message=import_error))
+            else:
+                grades.append(_grade_function(student, module, functions[function], tester, kwargs["num_test_cases"]))
+
+    finally:
+        sys.modules.pop(module_name, None)
+
+    return grades
+
+
+def _timed_out_function(submissions: Sequence[str], functions: Sequence[str], timeout: float, pair: int) -> List[Dict]:
+    """
+    Build the grade of a (submission, function) pair whose worker was killed after the function timeout.
+    """
+    index, function = divmod(pair, len(functions))
+    message = f"Grading {functions[function]} did not finish within {timeout} seconds."
+    return [_grade(_student(submissions[index]), functions[function], "timeout", message=message)]
+
+
+def _crashed_function(submissions: Sequence[str], functions: Sequence[str], pair: int, description: str) -> List[Dict]:
+    """
+    Build the grade of a (submission, function) pair whose worker died while grading it.
+    """
+    index, function = divmod(pair, len(functions))
+    message = f"The worker grading {functions[function]} {description}."
+    return [_grade(_student(submissions[index]), functions[function], "crash", message=message)]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Grade every submission in a directory on a list of functions and write a gradebook.
+
+    Each submission is imported once, by a worker process, which then grades all its functions, so a class
+    is graded by `jobs` processes in total instead of one interpreter per student per function. Every
+    submission is tested on the same test cases, from a single seed recorded in the gradebook.
+
+    A function that runs past the runtime limit is interrupted and graded as a timeout. A function that cannot
+    be interrupted, or a submission that hangs while it is imported, gets its worker killed after the function
+    timeout, and the grading of the submission resumes from its next function in a new worker. A function whose
+    worker dies, e.g. from a segfault or os._exit, is graded as a crash, and the grading resumes the same way.
+
+    Args:
+        argv (Optional[Sequence[str]]): The command line arguments, by default the ones of the process.
+
+    Returns:
+        int: The exit status.
+
+    Example:
+        $ mygrader submissions/ --functions calculate_sum kth_digit --jobs 8 --output gradebook.csv
+    """
+    parser = argparse.ArgumentParser(
+        prog="mygrader", description="Grade a directory of submissions and write a CSV or JSON gradebook."
+    )
+    parser.add_argument("submissions", help="The directory of the submissions, one .py file per student.")
+    parser.add_argument("-f", "--functions", nargs="+", required=True, help="The names of the functions to grade.")
+    parser.add_argument("-y", "--year", type=int, default=2023, help="The year of the assignments (default: 2023).")
+    parser.add_argument("-n", "--num-test-cases", type=int, default=100,
+                        help="The number of test cases of each function (default: 100).")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="The number of worker processes (default: the number of CPUs).")
+    parser.add_argument("--runtime-limit", type=float, default=1.0,
+                        help="The maximum time (in seconds) of the test run of a function (default: 1).")
+    parser.add_argument("--function-timeout", type=float, default=None,
+                        help="The maximum time (in seconds) spent grading a function of a submission, including the "
+                             "import of the submission, after which its worker is killed and replaced "
+                             "(default: twice the runtime limit, plus 10 seconds).")
+    parser.add_argument("--seed", type=int, default=None, help="The seed of the test cases (default: random).")
+    parser.add_argument("-o", "--output", default="gradebook.csv",
+                        help="The gradebook file, ending with .csv or .json (default: gradebook.csv).")
+    args = parser.parse_args(argv)
+
+    test_module = getattr(src, f"y{args.year}", None)
+    if test_module is None:
+        parser.error(f"Invalid year: {args.year}")
+
+    unknown = [name for name in args.functions if not hasattr(test_module.Solution, name)]
+    if unknown:
+        parser.error(f"Unknown functions: {', '.join(unknown)}")
+
+    if not args.output.endswith((".csv", ".json")):
+        parser.error(f"Invalid gradebook file: {args.output}. Please use a .csv or .json file.")
+
+    if args.jobs < 1 or args.num_test_cases < 1:
+        parser.error("The number of jobs and of test cases must be positive integers.")
+
+    if not os.path.isdir(args.submissions):
+        parser.error(f"Not a directory: {args.submissions}")
+
+    submissions = find_submissions(args.submissions)
+    if not submissions:
+        parser.error(f"No submissions found in {args.submissions}")
+
+    seed = args.seed if args.seed is not None else test_module.Generator.new_seed()
+    timeout = args.function_timeout or 2 * args.runtime_limit + 10
+
+    grade = partial(
+        _grade_submissions,
+        submissions=submissions,
+        functions=args.functions,
+        year=args.year,
+        num_test_cases=args.num_test_cases,
+        runtime_limit=args.runtime_limit,
+        seed=seed
+    )
+    timeout_result = partial(_timed_out_function, submissions, args.functions, timeout)
+    crash_result = partial(_crashed_function, submissions, args.functions)
+
+    grades = []
+    start_time = time.perf_counter()
+    pool = WorkerPool(
+        min(args.jobs, len(submissions)), case_timeout=timeout, preload=[test_module.__name__, "faker", "tqdm"]
+    )
+
+    try:
+        num_functions = len(args.functions)
+        shards = ((i * num_functions, (i + 1) * num_functions) for i in range(len(submissions)))
+        with tqdm(total=len(submissions) * num_functions, desc="Grading submissions", unit="grades") as progress:
+            for shard_grades in pool.run(grade, shards, float("inf"), timeout_result, crash_result=crash_result):
+                grades.extend(shard_grades)
+                progress.update(len(shard_grades))
+
+    finally:
+        pool.close()
+
+    # The submissions finish in any order, the gradebook lists them by student and function
+    order = {name: i for i, name in enumerate(args.functions)}
+    grades.sort(key=lambda grade: (grade["student"], order[grade["function"]]))
+
+    write_gradebook(grades, args.output, metadata={
+        "year": args.year,
+        "seed": seed,
+        "num_test_cases": args.num_test_cases,
+        "functions": args.functions
+    })
+
+    elapsed = time.perf_counter() - start_time
+    print(f"Graded {len(submissions)} submissions x {len(args.functions)} functions in {elapsed:.2f}s, "
+          f"gradebook written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
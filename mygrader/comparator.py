@@ -0,0 +1,181 @@
+import math
+import struct
+from typing import Any, Optional
+
+import numpy as np
+
+# Sequences of floats at least this long are compared as NumPy arrays
+VECTORIZE_MIN_SIZE = 64
+
+_SIGN_BIT = 1 << 63
+
+
+def _float_bits(x: float) -> int:
+    """
+    Get the bits of a float as an unsigned integer.
+    """
+    return struct.unpack("<Q", struct.pack("<d", x))[0]
+
+
+def ulp_distance(a: float, b: float) -> int:
+    """
+    Count the steps from one float to another through the representable floats: 0 for equal floats, 1 for neighbours.
+
+    Args:
+        a (float): A finite float.
+        b (float): Another finite float.
+
+    Returns:
+        int: The distance in units in the last place. Zero and negative zero are 0 apart.
+
+    Example:
+        >>> ulp_distance(1.0, 1.0 + 2 ** -52)
+        1
+    """
+    bits_a, bits_b = _float_bits(a), _float_bits(b)
+    magnitude_a, magnitude_b = bits_a & ~_SIGN_BIT, bits_b & ~_SIGN_BIT
+
+    # The bits of floats of the same sign are ordered like their magnitudes, and zero sits between the signs
+    if (bits_a ^ bits_b) & _SIGN_BIT:
+        return magnitude_a + magnitude_b
+    return abs(magnitude_a - magnitude_b)
+
+
+class Comparator:
+    """
+    Decide whether the output of the user function matches the output of the solution.
+
+    Outputs that are equal pass at once. Otherwise the outputs are walked together through nested lists, tuples
+    and dicts, which must have the same types, lengths and keys, and every pair of numeric leaves where one of
+    them is a float passes if it is within the tolerances:
+
+        rel_tol, abs_tol: As in math.isclose, |a - b| <= max(rel_tol * max(|a|, |b|), abs_tol).
+        ulps: At most this many floats apart (see `ulp_distance`), or None to disable it.
+
+    Two NaNs match each other, and an infinity only matches itself. Other leaves, such as ints, strings and
+    bools, must be equal. Lists and tuples of at least VECTORIZE_MIN_SIZE floats are compared as NumPy arrays
+    in a single vectorized call.
+
+    Any callable taking the user output and the expected output and returning a bool can be used as the
+    comparator of a Tester instead.
+
+    Example:
+        >>> compare = Comparator(rel_tol=1e-9)
+        >>> compare((0.1 + 0.2, [1.0, 2.0]), (0.3, [1.0, 2.0]))
+        True
+        >>> compare((0.1 + 0.2, [1.0, 2.0]), (0.3, (1.0, 2.0)))
+        False
+    """
+
+    def __init__(self, rel_tol: float = 1e-9, abs_tol: float = 0.0, ulps: Optional[int] = None) -> None:
+        """
+        Args:
+            rel_tol (float): The relative tolerance of floats.
+            abs_tol (float): The absolute tolerance of floats.
+            ulps (Optional[int]): The number of units in the last place floats may differ by, or None.
+
+        Raises:
+            ValueError: If a tolerance is negative.
+        """
+        if rel_tol < 0 or abs_tol < 0 or (ulps is not None and ulps < 0):
+            raise ValueError("Invalid tolerance. Please provide non-negative tolerances.")
+
+        self.rel_tol: float = rel_tol
+        self.abs_tol: float = abs_tol
+        self.ulps: Optional[int] = ulps
+
+    def __repr__(self) -> str:
+        return f"Comparator(rel_tol={self.rel_tol}, abs_tol={self.abs_tol}, ulps={self.ulps})"
+
+    def __call__(self, output: Any, expected: Any) -> bool:
+        """
+        Compare an output to the expected output.
+
+        Args:
+            output (Any): The output of the user function.
+            expected (Any): The output of the solution.
+
+        Returns:
+            bool: True if the output matches.
+        """
+        # Most outputs are exactly right, and == compares them in C, however large they are
+        try:
+            if output == expected:
+                return True
+        except Exception:
+            pass
+
+        return self.__match(output, expected)
+
+    def __match(self, output: Any, expected: Any) -> bool:
+        """
+        Compare two values that are not equal, leaf by leaf.
+        """
+        if isinstance(output, float) or isinstance(expected, float):
+            return self.__close(output, expected)
+
+        for container in (list, tuple):
+            if isinstance(output, container) or isinstance(expected, container):
+                if not (isinstance(output, container) and isinstance(expected, container)) \
+                        or len(output) != len(expected):
+                    return False
+
+                if len(output) >= VECTORIZE_MIN_SIZE and self.__all_floats(output) and self.__all_floats(expected):
+                    return self.__close_arrays(np.array(output, dtype=np.float64),
+                                               np.array(expected, dtype=np.float64))
+
+                return all(a == b or self.__match(a, b) for a, b in zip(output, expected))
+
+        if isinstance(output, dict) and isinstance(expected, dict):
+            return output.keys() == expected.keys() and all(
+                output[key] == expected[key] or self.__match(output[key], expected[key]) for key in output
+            )
+
+        return False
+
+    @staticmethod
+    def __all_floats(values: Any) -> bool:
+        """
+        Check whether every value of a sequence is a float, without a Python loop over the values.
+        """
+        return set(map(type, values)) == {float}
+
+    def __close(self, a: Any, b: Any) -> bool:
+        """
+        Compare two leaves, at least one of which is a float.
+        """
+        numeric = (int, float)
+        if not (isinstance(a, numeric) and isinstance(b, numeric)) or isinstance(a, bool) or isinstance(b, bool):
+            return False
+
+        a, b = float(a), float(b)
+        if math.isnan(a) or math.isnan(b):
+            return math.isnan(a) and math.isnan(b)
+
+        if math.isclose(a, b, rel_tol=self.rel_tol, abs_tol=self.abs_tol):
+            return True
+
+        return self.ulps is not None and math.isfinite(a) and math.isfinite(b) and ulp_distance(a, b) <= self.ulps
+
+    def __close_arrays(self, a: np.ndarray, b: np.ndarray) -> bool:
+        """
+        Compare two arrays of floats of the same length, element by element, like `__close`.
+        """
+        with np.errstate(invalid="ignore", over="ignore"):
+            finite = np.isfinite(a) & np.isfinite(b)
+            tolerance = np.maximum(self.rel_tol * np.maximum(np.abs(a), np.abs(b)), self.abs_tol)
+            close = (a == b) | (finite & (np.abs(a - b) <= tolerance)) | (np.isnan(a) & np.isnan(b))
+
+        if self.ulps is not None and not close.all():
+            bits_a, bits_b = a.view(np.uint64), b.view(np.uint64)
+            magnitude_a, magnitude_b = bits_a & ~np.uint64(_SIGN_BIT), bits_b & ~np.uint64(_SIGN_BIT)
+
+            same_sign = ((bits_a ^ bits_b) & np.uint64(_SIGN_BIT)) == 0
+            distance = np.where(
+                same_sign,
+                np.maximum(magnitude_a, magnitude_b) - np.minimum(magnitude_a, magnitude_b),
+                magnitude_a + magnitude_b
+            )
+            close |= finite & (distance <= np.uint64(self.ulps))
+
+        return bool(close.all())
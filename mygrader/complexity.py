@@ -0,0 +1,214 @@
+import math
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# The growth classes a runtime curve is fitted to, from the slowest growing to the fastest growing
+GROWTH_CLASSES: Dict[str, Callable[[float], float]] = {
+    "O(1)": lambda n: 1.0,
+    "O(log n)": lambda n: math.log2(n + 1),
+    "O(n)": lambda n: n,
+    "O(n log n)": lambda n: n * math.log2(n + 1),
+    "O(n^2)": lambda n: n ** 2,
+    "O(n^3)": lambda n: n ** 3,
+}
+
+EXPONENTIAL = "O(c^n)"
+
+# A faster growing class is only chosen if it fits this much better, so that noise does not inflate the class
+_FIT_MARGIN = 0.8
+
+
+def _fit_linear(
+        xs: Sequence[float], ys: Sequence[float], weights: Sequence[float], non_negative: bool = True
+) -> Tuple[float, float]:
+    """
+    Fit ys = a + b * xs by weighted least squares, with a and b kept non-negative unless told otherwise.
+    """
+    sw = sum(weights)
+    sx = sum(w * x for w, x in zip(weights, xs))
+    sy = sum(w * y for w, y in zip(weights, ys))
+    sxx = sum(w * x * x for w, x in zip(weights, xs))
+    sxy = sum(w * x * y for w, x, y in zip(weights, xs, ys))
+
+    det = sw * sxx - sx * sx
+    if det > 0:
+        a = (sxx * sy - sx * sxy) / det
+        b = (sw * sxy - sx * sy) / det
+        if not non_negative or (a >= 0 and b >= 0):
+            return a, b
+
+    # Fall back to the best fit through the origin, or to a constant
+    b = sxy / sxx if sxx else 0.0
+    a = sy / sw
+    through_origin = sum(w * (b * x - y) ** 2 for w, x, y in zip(weights, xs, ys))
+    constant = sum(w * (a - y) ** 2 for w, y in zip(weights, ys))
+    return (0.0, b) if through_origin < constant else (a, 0.0)
+
+
+def _relative_error(predicted: Sequence[float], times: Sequence[float]) -> float:
+    """
+    Get the root mean square of the relative errors of a fit.
+    """
+    return math.sqrt(sum(((p - t) / t) ** 2 for p, t in zip(predicted, times)) / len(times))
+
+
+def fit_growth(sizes: Sequence[int], times: Sequence[float]) -> Tuple[str, float]:
+    """
+    Estimate the growth class of a runtime curve.
+
+    The times are fitted to a + b * f(n) for every class in GROWTH_CLASSES, and to a * c^n, minimizing the
+    relative error so that small and large sizes weigh the same. The constant term absorbs the overhead of
+    a call, which dominates the smallest sizes.
+
+    Args:
+        sizes (Sequence[int]): The input sizes, at least three.
+        times (Sequence[float]): The time (in seconds) of a call at each size.
+
+    Returns:
+        Tuple[str, float]: The growth class that fits best and its root mean square relative error.
+
+    Raises:
+        ValueError: If fewer than three sizes were measured.
+
+    Example:
+        >>> fit_growth([10, 20, 40, 80], [1.0, 4.0, 16.0, 64.0])
+        ('O(n^2)', 0.0)
+    """
+    if len(sizes) < 3:
+        raise ValueError("At least three sizes are needed to estimate a growth class.")
+
+    times = [max(t, 1e-12) for t in times]
+    weights = [1 / t ** 2 for t in times]
+
+    fits: List[Tuple[str, float]] = []
+    for name, growth in GROWTH_CLASSES.items():
+        xs = [growth(n) for n in sizes]
+        a, b = _fit_linear(xs, times, weights)
+        fits.append((name, _relative_error([a + b * x for x in xs], times)))
+
+    # log t = log a + n log c, fitted without weights since the logarithms are already relative
+    log_a, log_c = _fit_linear(sizes, [math.log(t) for t in times], [1.0] * len(times), non_negative=False)
+    if log_c > 0:
+        predicted = [math.exp(log_a + log_c * n) for n in sizes]
+        fits.append((EXPONENTIAL, _relative_error(predicted, times)))
+
+    best_name, best_error = fits[0]
+    for name, error in fits[1:]:
+        if error < best_error * _FIT_MARGIN:
+            best_name, best_error = name, error
+
+    return best_name, best_error
+
+
+def _log_slope(xs: Sequence[float], ys: Sequence[float]) -> float:
+    """
+    Get the slope of the least squares line through the logarithms of the points.
+    """
+    log_xs = [math.log(x) for x in xs]
+    log_ys = [math.log(max(y, 1e-12)) for y in ys]
+    return _fit_linear(log_xs, log_ys, [1.0] * len(log_xs), non_negative=False)[1]
+
+
+def growth_exponent(sizes: Sequence[int], times: Sequence[float]) -> float:
+    """
+    Estimate k in time ~ n^k from the slope of the log-log curve over the larger half of the sizes.
+
+    Args:
+        sizes (Sequence[int]): The input sizes, at least two.
+        times (Sequence[float]): The time (in seconds) of a call at each size.
+
+    Returns:
+        float: The exponent, e.g. about 1 for a linear function and 2 for a quadratic one.
+    """
+    half = min(len(sizes) // 2, len(sizes) - 2)
+    return _log_slope(sizes[half:], times[half:])
+
+
+class ComplexityReport:
+    """
+    The outcome of a `Tester.measure_complexity` call.
+
+    A report holds the time of a call of the user function and of the solver at every measured input size,
+    the growth class fitted to each runtime curve, and how the slowdown of the user function changes with
+    the size (`scaling_ratio`). A scaling ratio well above 1 means the user function grows faster than
+    the solution, even if it passes every test case.
+
+    Example:
+        >>> report = tester.measure_complexity(left_max)
+        >>> report.growth
+        {'user': 'O(n^2)', 'solver': 'O(n)'}
+    """
+
+    # Tell pytest this is not a test class
+    __test__ = False
+
+    def __init__(
+            self,
+            function_name: str,
+            sizes: List[int],
+            user_times: List[float],
+            solver_times: List[float],
+            mismatched_sizes: List[int]
+    ) -> None:
+        """
+        Args:
+            function_name (str): The name of the measured function.
+            sizes (List[int]): The measured input sizes, in increasing order.
+            user_times (List[float]): The time (in seconds) of a call of the user function at each size.
+            solver_times (List[float]): The time (in seconds) of a call of the solver at each size.
+            mismatched_sizes (List[int]): The sizes at which the user function gave a wrong output.
+        """
+        self.function_name: str = function_name
+        self.sizes: List[int] = sizes
+        self.user_times: List[float] = user_times
+        self.solver_times: List[float] = solver_times
+        self.mismatched_sizes: List[int] = mismatched_sizes
+
+        self.growth: Dict[str, str] = {
+            "user": fit_growth(sizes, user_times)[0],
+            "solver": fit_growth(sizes, solver_times)[0]
+        }
+        self.exponent: Dict[str, float] = {
+            "user": growth_exponent(sizes, user_times),
+            "solver": growth_exponent(sizes, solver_times)
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"ComplexityReport(function_name={self.function_name!r}, growth={self.growth!r}, "
+            f"scaling_ratio={self.scaling_ratio:.2f})"
+        )
+
+    @property
+    def slowdowns(self) -> List[float]:
+        """
+        How many times longer the user function took than the solver, at each size.
+        """
+        return [user / solver if solver else float("nan") for user, solver in zip(self.user_times, self.solver_times)]
+
+    @property
+    def scaling_ratio(self) -> float:
+        """
+        How many times the slowdown grows from the smallest to the largest size.
+
+        The slowdowns are smoothed by a power law fitted to all the sizes, so a single noisy measurement
+        does not swing the ratio. It is about 1 for a function that grows like the solution, and about the
+        ratio of the largest size to the smallest one for a function with one more factor of n.
+        """
+        slope = _log_slope(self.sizes, self.slowdowns)
+        return (self.sizes[-1] / self.sizes[0]) ** slope
+
+    def to_dict(self) -> Dict:
+        """
+        Convert the report to a dictionary, e.g. to serialize it as JSON.
+        """
+        return {
+            "function_name": self.function_name,
+            "sizes": self.sizes,
+            "user_times": self.user_times,
+            "solver_times": self.solver_times,
+            "mismatched_sizes": self.mismatched_sizes,
+            "growth": dict(self.growth),
+            "exponent": dict(self.exponent),
+            "slowdowns": self.slowdowns,
+            "scaling_ratio": self.scaling_ratio
+        }
@@ -0,0 +1,103 @@
+from copy import deepcopy
+from typing import Any, Callable, Iterable, Optional, Tuple
+
+# Types whose instances can never be changed in place
+IMMUTABLE_TYPES = (int, float, complex, bool, str, bytes, type(None), range)
+
+# Containers that a single shallow copy fully protects when they only hold immutable values
+SHALLOW_COPYABLE_TYPES = (list, dict, set, bytearray)
+
+
+def is_immutable(value: Any) -> bool:
+    """
+    Check whether a value is deeply immutable, so it can be passed to a function without being copied.
+
+    Args:
+        value (Any): The value to check.
+
+    Returns:
+        bool: True if the value and everything it contains are immutable.
+    """
+    if isinstance(value, IMMUTABLE_TYPES):
+        return True
+
+    if isinstance(value, (tuple, frozenset)):
+        return all(is_immutable(item) for item in value)
+
+    return False
+
+
+def copier(value: Any) -> Optional[Callable]:
+    """
+    Choose the cheapest way to copy a parameter so that changing the copy never changes the original.
+
+    Args:
+        value (Any): A sample value of the parameter.
+
+    Returns:
+        Optional[Callable]: None if the value is immutable, the type of the value for a shallow copy of
+        a flat container of immutable values, and deepcopy otherwise.
+    """
+    if is_immutable(value):
+        return None
+
+    if type(value) in SHALLOW_COPYABLE_TYPES:
+        items = value.items() if isinstance(value, dict) else value
+        if all(is_immutable(item) for item in items):
+            return type(value)
+
+    return deepcopy
+
+
+def copy_plan(samples: Iterable[tuple]) -> Optional[Tuple[Optional[Callable], ...]]:
+    """
+    Analyse sample test cases of a generator and choose how to copy each parameter of its test cases.
+
+    Args:
+        samples (Iterable[tuple]): Sample test cases, which must all have the same number of parameters.
+
+    Returns:
+        Optional[Tuple[Optional[Callable], ...]]: The copier of each parameter, or None if no parameter
+        ever needs to be copied. A parameter is copied the safest way any of the samples needs.
+
+    Example:
+        >>> copy_plan([(1, 2.0, "a")]) is None
+        True
+        >>> copy_plan([(1, [2.0, 3.0])])
+        (None, <class 'list'>)
+    """
+    strength = {None: 0, deepcopy: 2}
+    plan = None
+
+    for sample in samples:
+        copiers = [copier(param) for param in sample]
+        if plan is None:
+            plan = copiers
+            continue
+
+        plan = [
+            max(planned, chosen, key=lambda c: strength.get(c, 1))
+            for planned, chosen in zip(plan, copiers)
+        ]
+
+    if plan is None or all(c is None for c in plan):
+        return None
+
+    return tuple(plan)
+
+
+def copy_params(plan: Optional[Tuple[Optional[Callable], ...]], params: tuple) -> tuple:
+    """
+    Copy the parameters of a test case according to a copy plan.
+
+    Args:
+        plan (Optional[Tuple[Optional[Callable], ...]]): The copy plan returned by `copy_plan`.
+        params (tuple): The parameters of the test case.
+
+    Returns:
+        tuple: The parameters themselves if nothing needs to be copied, otherwise a new tuple of copies.
+    """
+    if plan is None:
+        return params
+
+    return tuple(param if c is None else c(param) for c, param in zip(plan, params))
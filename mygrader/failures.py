@@ -0,0 +1,399 @@
+import gzip
+import heapq
+import json
+import math
+import os
+import shutil
+import tempfile
+import traceback
+from typing import Any, Dict, List, Optional, Tuple
+
+from mygrader.src.case_random import CaseRandom
+
+# The signature of the failed cases beyond the maximum number of clusters
+OTHER_SIGNATURE = "other"
+
+# The directory of the harness, whose frames are left out of the tracebacks of the user function
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# The seed of the sample keys, which only depend on the index of a case, so a run samples the same cases
+# whatever its shards and workers
+_SAMPLE_SEED = 0x5A4D
+
+
+def sample_key(index: int) -> float:
+    """
+    Get the random key of a failed case in the uniform sample: the sample keeps the cases with the lowest keys.
+    """
+    return CaseRandom(_SAMPLE_SEED, index).random()
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _position(position: int, length: int) -> str:
+    """
+    Describe where the first difference of two sequences is, without the exact position, to keep few signatures.
+    """
+    if position == 0:
+        return "at the start"
+    if position >= length - 1:
+        return "at the end"
+    return "in the middle"
+
+
+def _difference(expected: Any, result: Any) -> str:
+    """
+    Describe how an output differs from the expected output, in a few coarse words.
+    """
+    if type(expected) is not type(result) and not (_is_number(expected) and _is_number(result)):
+        return f"{type(result).__name__} instead of {type(expected).__name__}"
+
+    if _is_number(expected):
+        if isinstance(result, float) and not math.isfinite(result):
+            return f"{result} instead of a finite number"
+        if expected and result == -expected:
+            return "wrong sign"
+
+        error = result - expected
+        direction = "too high" if error > 0 else "too low"
+        if isinstance(expected, int) and isinstance(result, int) and abs(error) <= 2:
+            return f"off by {error:+d}"
+
+        # The order of magnitude of the error, relative to the expected output unless it is zero
+        if expected:
+            return f"{direction} by ~1e{math.floor(math.log10(abs(error / expected)))} relative"
+        return f"{direction} by ~1e{math.floor(math.log10(abs(error)))}"
+
+    if isinstance(expected, (str, list, tuple)):
+        length = "same length" if len(result) == len(expected) else (
+            "too long" if len(result) > len(expected) else "too short"
+        )
+        position = next((i for i, (a, b) in enumerate(zip(expected, result)) if a != b), None)
+        if position is None:
+            return f"{length}, otherwise equal"
+        if not isinstance(expected, str) and len(result) == len(expected) and sorted(map(repr, result)) == sorted(
+                map(repr, expected)):
+            return "same elements in another order"
+
+        difference = f"{length}, differs {_position(position, len(expected))}"
+        if not isinstance(expected, str):
+            difference += f" ({_difference(expected[position], result[position])})"
+        return difference
+
+    if isinstance(expected, dict):
+        if expected.keys() != result.keys():
+            return "missing keys" if expected.keys() - result.keys() else "extra keys"
+        return "different values"
+
+    return "different value"
+
+
+def failure_signature(case: Dict) -> str:
+    """
+    Compute the signature of a failed case, which failed cases that likely have the same cause share.
+
+    A failed case is described by its verdict, or for a wrong output by how it differs from the expected output:
+    the types of the outputs, the direction and order of magnitude of the error of a number, where two strings
+    or lists first differ. The sign of each numeric parameter is added, so that e.g. the failures of a function
+    that only fails on negative inputs share a single signature.
+
+    Args:
+        case (Dict): The failed case, with its input, expected output, actual output and verdict.
+
+    Returns:
+        str: The signature, in a few words.
+
+    Example:
+        >>> failure_signature({"input": (-123,), "expected": -321, "result": -320, "verdict": "wrong_output"})
+        'off by +1, inputs (-)'
+    """
+    if case["verdict"] == "runtime_error":
+        signature = f"raised {case['result'].partition(':')[0]}"
+    elif case["verdict"] != "wrong_output":
+        signature = case["verdict"]
+    else:
+        try:
+            signature = _difference(case["expected"], case["result"])
+        except Exception:
+            signature = "different value"
+
+    signs = [
+        "-" if value < 0 else "+" if value > 0 else "0" if value == 0 else "nan"
+        for value in case["input"] if _is_number(value)
+    ]
+    if signs:
+        signature += f", inputs ({', '.join(signs)})"
+
+    return signature
+
+
+def raise_site(error: BaseException) -> str:
+    """
+    Get the raise site of an exception: its type and the line of code it was raised from.
+
+    Example:
+        >>> try:
+        ...     1 / 0
+        ... except ZeroDivisionError as e:
+        ...     raise_site(e)
+        'ZeroDivisionError at <stdin>:2 in <module>'
+    """
+    tb = error.__traceback__
+    while tb is not None and tb.tb_next is not None:
+        tb = tb.tb_next
+
+    if tb is None:
+        return type(error).__name__
+
+    code = tb.tb_frame.f_code
+    return f"{type(error).__name__} at {code.co_filename}:{tb.tb_lineno} in {code.co_name}"
+
+
+def user_traceback(error: BaseException) -> str:
+    """
+    Format the traceback of an exception raised by the user function, without the frames of the harness.
+    """
+    tb = error.__traceback__
+    while tb is not None and os.path.abspath(tb.tb_frame.f_code.co_filename).startswith(_PACKAGE_DIR + os.sep):
+        tb = tb.tb_next
+
+    return "".join(traceback.format_exception(type(error), error, tb or error.__traceback__))
+
+
+def merge_errors(errors: Dict[str, list], other: Dict[str, list]) -> Dict[str, list]:
+    """
+    Merge two sets of exceptions grouped by raise site.
+
+    Args:
+        errors (Dict[str, list]): The number of exceptions raised from each site, the index of the first case that
+            raised one and its traceback, as [count, index, traceback].
+        other (Dict[str, list]): The exceptions to add to them.
+
+    Returns:
+        Dict[str, list]: The merged exceptions. The traceback of a site is the one of its case with the lowest index.
+    """
+    merged = {site: list(error) for site, error in errors.items()}
+    for site, (count, index, formatted) in other.items():
+        if site not in merged:
+            merged[site] = [count, index, formatted]
+            continue
+
+        merged[site][0] += count
+        if index < merged[site][1]:
+            merged[site][1:] = [index, formatted]
+
+    return merged
+
+
+def merge_clusters(clusters: Dict[str, list], other: Dict[str, list], max_clusters: int) -> Dict[str, list]:
+    """
+    Merge two sets of clusters of failed cases.
+
+    Args:
+        clusters (Dict[str, list]): The count and representative case of each signature, as [count, case].
+        other (Dict[str, list]): The clusters to add to them.
+        max_clusters (int): The maximum number of clusters kept. The least frequent ones are merged into
+            a single OTHER_SIGNATURE cluster.
+
+    Returns:
+        Dict[str, list]: The merged clusters. The representative of a cluster is its case with the lowest index.
+    """
+    merged = {signature: list(cluster) for signature, cluster in clusters.items()}
+    for signature, (count, case) in other.items():
+        if signature in merged:
+            merged[signature][0] += count
+            if case["index"] < merged[signature][1]["index"]:
+                merged[signature][1] = case
+        else:
+            merged[signature] = [count, case]
+
+    if len(merged) > max_clusters:
+        ranked = sorted(merged.items(), key=lambda item: (item[0] == OTHER_SIGNATURE, -item[1][0], item[0]))
+        kept, rest = dict(ranked[:max_clusters - 1]), ranked[max_clusters - 1:]
+        kept[OTHER_SIGNATURE] = [
+            sum(count for _, (count, _) in rest), min((case for _, (_, case) in rest), key=lambda c: c["index"])
+        ]
+        merged = kept
+
+    return merged
+
+
+class FailureStore:
+    """
+    The failed cases of a shard, kept in bounded memory however many cases fail.
+
+    The store keeps the first failed cases in order, and a uniform sample of all of them: every case gets a
+    random key from its index, and the sample holds the cases with the lowest keys. Samples of different shards
+    merge by keeping the lowest keys again, so the merged sample is still uniform over the whole run. When a
+    spill directory is given, every failed case is also written to a gzip-compressed JSON lines file in it.
+
+    The failed cases are also grouped into clusters by their `failure_signature`, each with the number of its
+    cases and the first of them, so that the summary of a run is as long as the number of causes of its failures,
+    not as the number of failures. Likewise, the exceptions raised by the user function are grouped by
+    `raise_site`, and the traceback of a site is only formatted for the first exception raised from it.
+
+    Example:
+        >>> store = FailureStore(max_first=100, max_sampled=20)
+        >>> for index in range(10 ** 6):
+        ...     store.add({"index": index, "input": (index,), "expected": 0, "result": 1, "verdict": "wrong_output"})
+        >>> len(store.first), len(store.sampled_cases())
+        (100, 20)
+    """
+
+    def __init__(
+            self, max_first: int, max_sampled: int, max_clusters: int = 50, spill_dir: Optional[str] = None
+    ) -> None:
+        """
+        Args:
+            max_first (int): The number of failed cases with the lowest indices kept.
+            max_sampled (int): The size of the uniform sample of the failed cases.
+            max_clusters (int): The number of clusters kept, after which new signatures are counted as
+                OTHER_SIGNATURE.
+            spill_dir (Optional[str]): The directory of the file every failed case is written to, or None.
+        """
+        self.max_first: int = max_first
+        self.max_sampled: int = max_sampled
+        self.max_clusters: int = max_clusters
+        self.clusters: Dict[str, list] = {}
+        self.errors: Dict[str, list] = {}
+        self.spill_dir: Optional[str] = spill_dir
+        self.spill_path: Optional[str] = None
+        self.first: List[Dict] = []
+
+        # A max-heap of the lowest keys, as (-key, index, case)
+        self._sample: List[tuple] = []
+        self._spill: Any = None
+
+    def __enter__(self) -> "FailureStore":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+    def add(self, case: Dict) -> None:
+        """
+        Record a failed case, given with its index, input, expected output, actual output and verdict.
+        """
+        if len(self.first) < self.max_first:
+            self.first.append(case)
+
+        signature = failure_signature(case)
+        cluster = self.clusters.get(signature)
+        if cluster is None and len(self.clusters) >= self.max_clusters - 1:
+            signature = OTHER_SIGNATURE
+            cluster = self.clusters.get(signature)
+        if cluster is None:
+            self.clusters[signature] = [1, case]
+        else:
+            cluster[0] += 1
+
+        index = case["index"]
+        entry = (-sample_key(index), index, case)
+        if len(self._sample) < self.max_sampled:
+            heapq.heappush(self._sample, entry)
+        elif entry[:2] > self._sample[0][:2]:
+            heapq.heapreplace(self._sample, entry)
+
+        if self.spill_dir is not None:
+            if self._spill is None:
+                handle, self.spill_path = tempfile.mkstemp(suffix=".jsonl.gz", dir=self.spill_dir)
+                os.close(handle)
+                self._spill = gzip.open(self.spill_path, "wt", compresslevel=1, encoding="utf-8")
+            self._spill.write(json.dumps(case, default=repr) + "\n")
+
+    def add_error(self, index: int, params: tuple, error: BaseException) -> None:
+        """
+        Record a case where the user function raised an exception, as a failed case with the runtime_error verdict.
+
+        Args:
+            index (int): The index of the case.
+            params (tuple): The parameters of the case.
+            error (BaseException): The exception raised by the user function.
+        """
+        site = raise_site(error)
+        if site in self.errors:
+            self.errors[site][0] += 1
+        else:
+            self.errors[site] = [1, index, user_traceback(error)]
+
+        self.add({
+            "index": index,
+            "input": params,
+            "expected": "No exception",
+            "result": f"{type(error).__name__}: {error}",
+            "verdict": "runtime_error"
+        })
+
+    def sampled_cases(self) -> List[Tuple[float, Dict]]:
+        """
+        Get the uniform sample of the failed cases.
+
+        Returns:
+            List[Tuple[float, Dict]]: The key and the case of every sampled case, from the lowest key to the highest.
+        """
+        return [(-negative_key, case) for negative_key, _, case in sorted(self._sample, reverse=True)]
+
+
+class FailureLog:
+    """
+    The gzip-compressed JSON lines file every failed case of a run is written to, one object per line.
+
+    The workers write the failed cases of each shard to a file of their own in a temporary directory next to the
+    log, and the parent appends the file of a shard to the log once its result arrives. A gzip file can hold
+    several compressed members one after the other, so the files are appended as they are, without being
+    decompressed. The files of shards that did not finish, e.g. when a worker was killed, are discarded.
+
+    Note:
+        The cases of a shard are in order, but the shards are in the order they finished.
+
+    Example:
+        >>> with gzip.open("failures.jsonl.gz", "rt") as log:
+        ...     failures = [json.loads(line) for line in log]
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Create the log, replacing the file if it exists.
+
+        Args:
+            path (str): The path of the log.
+        """
+        self.path: str = path
+        self.spill_dir: str = tempfile.mkdtemp(prefix=".mygrader-", dir=os.path.dirname(os.path.abspath(path)))
+        self._file = open(path, "wb")
+
+    def __enter__(self) -> "FailureLog":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def append_file(self, spill_path: Optional[str]) -> None:
+        """
+        Append the failed cases a shard wrote to a file of the spill directory, and delete the file.
+        """
+        if not spill_path:
+            return
+
+        with open(spill_path, "rb") as spill:
+            shutil.copyfileobj(spill, self._file)
+        os.remove(spill_path)
+
+    def append_cases(self, cases: List[Dict]) -> None:
+        """
+        Append failed cases recorded by the parent, such as the cases that exceeded the case timeout.
+        """
+        if cases:
+            lines = "".join(json.dumps(case, default=repr) + "\n" for case in cases)
+            self._file.write(gzip.compress(lines.encode("utf-8"), compresslevel=1))
+
+    def close(self) -> None:
+        """
+        Close the log, and delete the spill directory with the files of the shards that did not finish.
+        """
+        self._file.close()
+        shutil.rmtree(self.spill_dir, ignore_errors=True)
@@ -0,0 +1,135 @@
+from typing import Dict, Tuple
+
+# Each power of two is split into 2 ** _SUB_BITS buckets, so a bucket is at most 1/16 (6.25%) wide
+_SUB_BITS = 4
+_SUB_BUCKETS = 1 << _SUB_BITS
+
+
+class LatencyHistogram:
+    """
+    A streaming histogram of latencies in nanoseconds, with constant memory.
+
+    Any other non-negative integer can be counted the same way, such as the peak memory of a call in bytes.
+
+    Latencies are counted in log-linear buckets: below 32ns every nanosecond has its own bucket, and above it
+    every power of two is split into 16 buckets. A histogram therefore never holds more than about a thousand
+    buckets, however many latencies are added, and the percentiles it reports are at most 6.25% above the exact
+    ones. The count, total and maximum are exact. Histograms of different shards and workers are merged with
+    `merge`.
+
+    Example:
+        >>> histogram = LatencyHistogram()
+        >>> for ns in range(1, 1001):
+        ...     histogram.add(ns)
+        >>> histogram.percentile(50), histogram.max
+        (511, 1000)
+    """
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self) -> None:
+        self.counts: Dict[int, int] = {}
+        self.count: int = 0
+        self.total: int = 0
+        self.max: int = 0
+
+    @staticmethod
+    def bucket(ns: int) -> int:
+        """
+        Get the bucket of a latency.
+        """
+        if ns < 2 * _SUB_BUCKETS:
+            return ns
+
+        # Keep the 5 most significant bits: the power of two and the 16th of it the latency falls in
+        shift = ns.bit_length() - _SUB_BITS - 1
+        return (shift << _SUB_BITS) + (ns >> shift)
+
+    @staticmethod
+    def bucket_bounds(bucket: int) -> Tuple[int, int]:
+        """
+        Get the lowest and highest latencies of a bucket.
+        """
+        if bucket < 2 * _SUB_BUCKETS:
+            return bucket, bucket
+
+        shift = (bucket >> _SUB_BITS) - 1
+        significand = bucket - (shift << _SUB_BITS)
+        return significand << shift, ((significand + 1) << shift) - 1
+
+    def add(self, ns: int) -> None:
+        """
+        Add a latency.
+
+        Args:
+            ns (int): The latency in nanoseconds, e.g. a difference of `time.perf_counter_ns` values.
+        """
+        bucket = self.bucket(ns)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """
+        Add the latencies of another histogram to this one.
+        """
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent: float) -> int:
+        """
+        Estimate a percentile of the latencies.
+
+        Args:
+            percent (float): The percentile, between 0 and 100.
+
+        Returns:
+            int: The highest latency of the bucket holding the percentile, capped by the maximum, in nanoseconds,
+                or 0 if the histogram is empty.
+        """
+        rank = percent / 100 * self.count
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(self.bucket_bounds(bucket)[1], self.max)
+
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Summarize the latencies.
+
+        Returns:
+            Dict[str, float]: The count, mean, p50, p95, p99 and max, in nanoseconds.
+        """
+        summary = {"count": self.count, "mean": self.mean}
+        summary.update({f"p{percent}": self.percentile(percent) for percent in self.PERCENTILES})
+        summary["max"] = self.max
+        return summary
+
+    def to_state(self) -> Tuple[Dict[int, int], int, int, int]:
+        """
+        Get the state of the histogram as plain values, e.g. to send it to another process.
+        """
+        return self.counts, self.count, self.total, self.max
+
+    @classmethod
+    def from_state(cls, state: Tuple[Dict[int, int], int, int, int]) -> "LatencyHistogram":
+        """
+        Rebuild a histogram from the state returned by `to_state`.
+        """
+        histogram = cls()
+        histogram.counts, histogram.count, histogram.total, histogram.max = state
+        return histogram
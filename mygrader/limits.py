@@ -0,0 +1,188 @@
+import errno
+import math
+import signal
+from typing import Any, Dict, Optional
+
+try:
+    import resource
+except ImportError:  # Windows has no resource limits
+    resource = None
+
+
+class ResourceLimitExceeded(BaseException):
+    """
+    Raised in a worker when a test case exceeds a resource limit that does not raise an exception of its own.
+
+    Like KeyboardInterrupt, it is not an Exception, so a submission that catches every Exception cannot swallow it.
+    """
+
+    def __init__(self, limit: str) -> None:
+        super().__init__(f"{limit} limit exceeded")
+        self.limit: str = limit
+
+
+class ResourceLimits:
+    """
+    Operating system limits applied to a worker process while it runs test cases.
+
+    The limits are enforced by the kernel, so a runaway submission cannot make the grading host swap or fill its
+    disk, whatever it does. A test case that exceeds a limit fails with its own verdict, and the run goes on:
+
+        address_space (RLIMIT_AS): The allocation fails with a MemoryError.
+        cpu_time (RLIMIT_CPU): The kernel sends SIGXCPU, which interrupts the case.
+        open_files (RLIMIT_NOFILE): Opening a file fails with EMFILE.
+        file_size (RLIMIT_FSIZE): Writing past the limit fails with EFBIG, instead of the default SIGXFSZ.
+
+    Only the soft limits are changed, and they are restored at the end of every shard, so a persistent worker
+    can run another run with other limits.
+
+    Note:
+        The limits apply to the whole worker process, including the harness and the solution. The address space
+        counts the interpreter and the libraries it has loaded, so it should be at least a few hundred megabytes,
+        and the open files count the connections of the worker to the parent.
+
+    Example:
+        >>> limits = ResourceLimits(address_space=512 * 1024 ** 2, cpu_time=2)
+        >>> tester = Tester(year=2023, resource_limits=limits)
+    """
+
+    # The resource limit behind each of the limits
+    RESOURCES = {
+        "address_space": "RLIMIT_AS",
+        "cpu_time": "RLIMIT_CPU",
+        "open_files": "RLIMIT_NOFILE",
+        "file_size": "RLIMIT_FSIZE",
+    }
+
+    def __init__(
+            self,
+            address_space: Optional[int] = None,
+            cpu_time: Optional[int] = None,
+            open_files: Optional[int] = None,
+            file_size: Optional[int] = None
+    ) -> None:
+        """
+        Args:
+            address_space (Optional[int]): The maximum size (in bytes) of the address space of a worker.
+            cpu_time (Optional[int]): The CPU time (in whole seconds) a single test case may use, give or take
+                two seconds (see `start_case`).
+            open_files (Optional[int]): The maximum number of file descriptors a worker may have open.
+            file_size (Optional[int]): The maximum size (in bytes) of a file written by a worker.
+
+        Raises:
+            ValueError: If a limit is not a positive integer.
+            NotImplementedError: If the platform has no resource limits.
+        """
+        self.limits: Dict[str, int] = {
+            name: value for name, value in (
+                ("address_space", address_space),
+                ("cpu_time", cpu_time),
+                ("open_files", open_files),
+                ("file_size", file_size),
+            ) if value is not None
+        }
+
+        for name, value in self.limits.items():
+            if not isinstance(value, int) or value <= 0:
+                raise ValueError(f"Invalid {name} limit. Please provide a positive integer.")
+
+        if resource is None:
+            raise NotImplementedError("Resource limits are not supported on this platform.")
+
+        self._saved_limits: Dict[int, tuple] = {}
+        self._saved_handlers: Dict[int, Any] = {}
+
+        # The time.monotonic() value after which the soft CPU limit must be moved forward again
+        self._next_move: float = math.inf
+
+    def __repr__(self) -> str:
+        limits = ", ".join(f"{name}={value}" for name, value in self.limits.items())
+        return f"ResourceLimits({limits})"
+
+    def __enter__(self) -> "ResourceLimits":
+        for name, value in self.limits.items():
+            if name != "cpu_time":
+                self.__set_soft_limit(getattr(resource, self.RESOURCES[name]), value)
+
+        if "cpu_time" in self.limits:
+            self._saved_limits[resource.RLIMIT_CPU] = resource.getrlimit(resource.RLIMIT_CPU)
+            self._next_move = -math.inf
+            self._saved_handlers[signal.SIGXCPU] = signal.signal(signal.SIGXCPU, self.__cpu_time_exceeded)
+
+        if "file_size" in self.limits:
+            self._saved_handlers[signal.SIGXFSZ] = signal.signal(signal.SIGXFSZ, signal.SIG_IGN)
+
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        for limit, saved in self._saved_limits.items():
+            resource.setrlimit(limit, saved)
+
+        for signal_number, handler in self._saved_handlers.items():
+            signal.signal(signal_number, handler)
+
+        self._saved_limits.clear()
+        self._saved_handlers.clear()
+        self._next_move = math.inf
+
+    def start_case(self, now: float) -> None:
+        """
+        Make sure the next test case has its own CPU time limit, counted from the CPU time used so far by the worker.
+
+        Args:
+            now (float): The time.monotonic() value when the test case starts.
+
+        Note:
+            The soft limit is moved forward to the CPU time used plus `cpu_time` plus one second, at most once per
+            second. A worker cannot use more CPU time than the wall-clock time that passes, so every case gets at
+            least `cpu_time` seconds and at most two seconds more, without a system call for every case.
+        """
+        if now < self._next_move:
+            return
+
+        self._next_move = now + 1
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        soft = math.ceil(usage.ru_utime + usage.ru_stime) + self.limits["cpu_time"] + 1
+
+        hard = self._saved_limits[resource.RLIMIT_CPU][1]
+        resource.setrlimit(resource.RLIMIT_CPU, (soft if hard == resource.RLIM_INFINITY else min(soft, hard), hard))
+
+    def violation(self, error: BaseException) -> Optional[str]:
+        """
+        Find the limit a test case exceeded from the exception it raised.
+
+        Args:
+            error (BaseException): The exception raised while running the test case.
+
+        Returns:
+            Optional[str]: The name of the exceeded limit, or None if the exception is not due to a limit.
+        """
+        if isinstance(error, ResourceLimitExceeded):
+            return error.limit
+
+        if isinstance(error, MemoryError) and "address_space" in self.limits:
+            return "address_space"
+
+        if isinstance(error, OSError):
+            if error.errno in (errno.EMFILE, errno.ENFILE) and "open_files" in self.limits:
+                return "open_files"
+            if error.errno == errno.EFBIG and "file_size" in self.limits:
+                return "file_size"
+
+        return None
+
+    def __set_soft_limit(self, limit: int, value: int) -> None:
+        """
+        Lower the soft limit of a resource, which can never exceed its hard limit.
+        """
+        soft, hard = resource.getrlimit(limit)
+        self._saved_limits[limit] = (soft, hard)
+
+        if hard != resource.RLIM_INFINITY:
+            value = min(value, hard)
+
+        resource.setrlimit(limit, (value, hard))
+
+    @staticmethod
+    def __cpu_time_exceeded(signal_number: int, frame: Any) -> None:
+        raise ResourceLimitExceeded("cpu_time")
@@ -0,0 +1,92 @@
+import heapq
+import tracemalloc
+from typing import Any, Dict, List
+
+from mygrader.histogram import LatencyHistogram
+
+
+class MemoryTracker:
+    """
+    Measure the peak memory allocated by each call of the user function and of the solver with tracemalloc.
+
+    The traces are cleared right before a call and the peak is read right after it, so the peak of a call only
+    counts the memory allocated while it ran, including its output, and not the memory of the test case itself.
+    The peaks are counted in histograms, and the cases with the highest peaks of the user function are kept.
+
+    Example:
+        >>> with MemoryTracker(max_cases=5) as tracker:
+        ...     tracker.reset()
+        ...     output = sorted(range(1000))
+        ...     peak = tracker.peak()
+        >>> peak > 8000
+        True
+    """
+
+    def __init__(self, max_cases: int) -> None:
+        """
+        Args:
+            max_cases (int): The number of cases kept that used the most memory.
+        """
+        self.max_cases: int = max_cases
+        self.histograms: Dict[str, LatencyHistogram] = {"user": LatencyHistogram(), "solver": LatencyHistogram()}
+        self._largest: List[tuple] = []
+        self._started: bool = False
+
+    def __enter__(self) -> "MemoryTracker":
+        # Keep a single frame per trace, the cheapest setting, unless tracemalloc is already used by someone else
+        self._started = not tracemalloc.is_tracing()
+        if self._started:
+            tracemalloc.start(1)
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self._started:
+            tracemalloc.stop()
+
+    @staticmethod
+    def reset() -> None:
+        """
+        Forget the memory allocated so far, so that the next peak only counts what is allocated from now on.
+        """
+        tracemalloc.clear_traces()
+
+    @staticmethod
+    def peak() -> int:
+        """
+        Get the peak memory (in bytes) allocated since the last reset.
+        """
+        return tracemalloc.get_traced_memory()[1]
+
+    def record(self, index: int, params: tuple, user_peak: int, solver_peak: int) -> None:
+        """
+        Record the peak memory of the user function and the solver on a test case.
+
+        Args:
+            index (int): The index of the test case.
+            params (tuple): The parameters of the test case.
+            user_peak (int): The peak memory (in bytes) of the user function.
+            solver_peak (int): The peak memory (in bytes) of the solver.
+        """
+        self.histograms["user"].add(user_peak)
+        self.histograms["solver"].add(solver_peak)
+
+        # A min-heap of the largest peaks, where ties keep the lowest indices
+        entry = (user_peak, -index, params, solver_peak)
+        if len(self._largest) < self.max_cases:
+            heapq.heappush(self._largest, entry)
+        elif entry[:2] > self._largest[0][:2]:
+            heapq.heapreplace(self._largest, entry)
+
+    def largest_cases(self) -> List[Dict]:
+        """
+        Get the cases with the highest peak memory of the user function.
+
+        Returns:
+            List[Dict]: The index, input and peak memory of the user function and the solver of each case,
+                from the highest peak to the lowest.
+        """
+        return [
+            {"index": -negative_index, "input": params, "user_peak": user_peak, "solver_peak": solver_peak}
+            for user_peak, negative_index, params, solver_peak in sorted(self._largest, key=lambda e: e[:2],
+                                                                         reverse=True)
+        ]
@@ -1,45 +1,172 @@
+import asyncio
 import contextlib
 import inspect
 import io
 import logging
 import os
 import sys
+import threading
 import time
 import unittest
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
-from math import isclose
-from multiprocessing import Process, Queue
-from typing import Callable, Dict, Iterable, Any
+from functools import partial
+from multiprocessing import RawArray
+from typing import Callable, Dict, Iterable, Any, List, Optional, Tuple, Union
 
 from tabulate import tabulate
 from tqdm import tqdm
 
 from mygrader import src, template
+from mygrader.batch import TestCaseBatch
+from mygrader.capture import BatchCapture
+from mygrader.comparator import Comparator
+from mygrader.complexity import ComplexityReport
+from mygrader.copying import copy_params, copy_plan
+from mygrader.failures import FailureLog, FailureStore, failure_signature, sample_key
+from mygrader.histogram import LatencyHistogram
+from mygrader.limits import ResourceLimitExceeded, ResourceLimits
+from mygrader.memory import MemoryTracker
+from mygrader.pool import InlinePool, WorkerPool
+from mygrader.report import TestReport, TestTimeoutError
+from mygrader.result import ShardResult
 
 
 class Tester(unittest.TestCase):
 
+    # The maximum number of test cases in a shard handed to a worker
+    MAX_SHARD_SIZE = 10_000
+
+    # The maximum number of failed cases kept for the summary
+    MAX_FAILED_CASES = 100
+
+    # The size of the uniform sample of the failed cases, from which the summary shows its cases
+    MAX_SAMPLED_CASES = 20
+
+    # The maximum number of clusters of failed cases by signature, and the number shown in the summary
+    MAX_CLUSTERS = 50
+    SUMMARY_CLUSTERS = 10
+
+    # The number of cases that used the most memory kept for the summary in memory mode
+    MAX_MEMORY_CASES = 5
+
+    # With a batch solver, the scalar solver still runs on one case in this many, to measure its latency
+    SOLVER_SAMPLE_INTERVAL = 16
+
+    # The number of inputs of each size timed by measure_complexity, and the minimum time spent on each one
+    COMPLEXITY_SAMPLES = 3
+    COMPLEXITY_MIN_TIME = 0.005
+
+    # How the parameters of the test cases of each generator are copied, by year and function name
+    _copy_plans: Dict[Tuple[str, str], Optional[Tuple]] = {}
+
+    # Held while sys.stdout is redirected or written to, since concurrent runs share it
+    _stdout_lock = threading.Lock()
+
     def __init__(
             self,
             year: int,
             log_option: str = 'print',
             debug: bool = False,
             runtime_limit: int = 1,
-            show_table: bool = False
+            show_table: bool = False,
+            jobs: int = 1,
+            case_timeout: Optional[float] = None,
+            persistent_workers: bool = False,
+            seed: Optional[int] = None,
+            perf_budget: Optional[float] = None,
+            track_memory: bool = False,
+            memory_limit: Optional[int] = None,
+            resource_limits: Optional[ResourceLimits] = None,
+            max_concurrency: Optional[int] = None,
+            in_process: bool = False,
+            comparator: Optional[Callable[[Any, Any], bool]] = None,
+            failure_log: Optional[str] = None
     ) -> None:
         """
         Initialize the Tester class.
 
         Args:
            year (int): The year for which the tests are being run (e.g., 2023).
-           log_option (str): The logging option ("print" or "write") for the tests summary.
+           log_option (str): The logging option ("print", "write" or "none") for the tests summary.
            debug (bool): If True, enable debug mode for additional information.
-           runtime_limit (int): The maximum runtime limit (in seconds) for each test case execution.
+           runtime_limit (int): The maximum wall-clock time (in seconds) of the whole test run, across all jobs.
            show_table (bool): If True, show the table of failed cases in the summary.
+           jobs (int): The number of worker processes the test cases are sharded across.
+           case_timeout (Optional[float]): The maximum time (in seconds) a single test case may take, or None.
+           persistent_workers (bool): If True, keep the worker processes alive between runs until `close` is called.
+           seed (Optional[int]): The seed of the generated test cases, or None for a new random seed on every run.
+           perf_budget (Optional[float]): The maximum time the user function may take, as a multiple of the time
+               taken by the solution on the same test cases, or None to disable performance grading.
+           track_memory (bool): If True, measure the peak memory allocated by every call of the user function
+               and the solution.
+           memory_limit (Optional[int]): The maximum memory (in bytes) a single call of the user function may
+               allocate, or None. Setting it enables `track_memory`.
+           resource_limits (Optional[ResourceLimits]): The operating system limits of the worker processes while
+               they run test cases, or None.
+           max_concurrency (Optional[int]): The maximum number of runs of `run_test_async` in progress at once,
+               or None for the number of CPUs.
+           in_process (bool): If True, run the test cases in the calling process instead of worker processes,
+               e.g. inside a worker of another pool. `jobs` and `persistent_workers` are ignored.
+           comparator (Optional[Callable[[Any, Any], bool]]): Decides whether an output of the user function
+               matches the output of the solution, or None for a `Comparator` with its default tolerances.
+           failure_log (Optional[str]): The gzip-compressed JSON lines file every failed case of a run is written to,
+               replaced by each run, or None.
 
         Note:
-           The `runtime_limit` parameter defines the maximum time a tests case execution is allowed to take.
-           If a test case execution exceeds this limit, it will be terminated and considered as a TimeoutError.
+           The `runtime_limit` parameter defines the maximum wall-clock time the whole test run is allowed to take,
+           measured in the parent from the moment the workers start, no matter how many `jobs` are used.
+           If the run exceeds this limit, the workers are terminated and a TestTimeoutError is raised, holding the
+           report of the test cases that ran before the limit and the throughput the function achieved.
+
+           The `case_timeout` parameter defines the maximum time a single test case is allowed to take.
+           A worker running a case that exceeds it is killed and replaced, the case is recorded as a failed
+           "Timeout" case, and the run resumes from the next case.
+
+           With `persistent_workers`, the first run starts `jobs` worker processes which have already imported
+           the test module and the libraries used by the runs, and every later run reuses them. Use the Tester
+           as a context manager, or call `close`, to stop them.
+
+           The seed of a run is shown in its summary, and each failed case with its index, so a failed case can be
+           replayed with `Generator.case(function_name, seed, index)` and a whole run with `Tester(seed=seed)`.
+
+           The `perf_budget` parameter grades performance relative to the solution instead of the wall clock:
+           each test case runs the user function and then the solution on the same input, in the same process,
+           so both are slowed down alike by a loaded machine. The run is within budget if the user function took
+           at most `perf_budget` times as long as the solution over all the test cases. The verdict and the
+           measured ratio are shown in the summary. The `runtime_limit` still applies, as a safety cap.
+
+           With `track_memory`, tracemalloc measures the peak memory allocated by each call, which includes its
+           output but not its input. The summary shows the distribution of the peaks and the inputs that used
+           the most memory, and a case whose user call allocated more than `memory_limit` bytes fails even if
+           its output is correct. Tracing slows down every allocation, so the timings and latencies of a run
+           in memory mode are not representative.
+
+           The `resource_limits` are enforced by the kernel on the worker processes: the size of their address
+           space, the CPU time of each test case, their open files and the size of the files they write.
+           A case that exceeds one of them fails with a verdict naming the limit, and the run continues.
+
+           With `in_process`, the test cases run in the calling process, and the `runtime_limit` and `case_timeout`
+           are enforced by interrupting the running case with SIGALRM, which requires the main thread on Unix.
+
+           The `max_concurrency` parameter bounds the runs of `run_test_async` in progress at once, each with
+           up to `jobs` worker processes. Further runs wait for a slot without holding any resources.
+
+           Memory stays bounded however many cases fail: a run keeps the exact counts, the MAX_FAILED_CASES failed
+           cases with the lowest indices and a uniform sample of MAX_SAMPLED_CASES failed cases, which the summary
+           shows. Every failed case is only kept on disk, in the `failure_log`, if one is given. The failed cases
+           are also grouped by signature, such as "off by +1, inputs (-)", and the summary lists the most frequent
+           signatures, each with the number of its cases and an example.
+
+           A test case where the user function raises an exception fails with the "runtime_error" verdict, and the
+           run goes on. The summary counts the exceptions by the line they were raised from, and shows the
+           traceback of the first exception raised from each line in the detailed summary of `show_table`.
+
+        Example:
+            >>> with Tester(year=2023, persistent_workers=True) as tester:
+            ...     tester.run_test(calculate_sum)
+            ...     tester.run_test(kth_digit)
         """
         super().__init__()
         self.year: str = f'y{year}'
@@ -48,25 +175,93 @@ class Tester(unittest.TestCase):
         self.runtime_limit: int = runtime_limit
         self.show_table: bool = show_table
 
-    def run_test(self, user_func: Callable, num_test_cases: int = 100) -> None:
+        if jobs < 1:
+            raise ValueError("Invalid number of jobs. Please provide a positive integer.")
+        self.jobs: int = jobs
+
+        if case_timeout is not None and case_timeout <= 0:
+            raise ValueError("Invalid case timeout. Please provide a positive number of seconds.")
+        self.case_timeout: Optional[float] = case_timeout
+
+        self.persistent_workers: bool = persistent_workers
+        self.pool: Optional[WorkerPool] = None
+
+        self.seed: Optional[int] = seed
+
+        if perf_budget is not None and perf_budget <= 0:
+            raise ValueError("Invalid performance budget. Please provide a positive multiple of the solution time.")
+        self.perf_budget: Optional[float] = perf_budget
+
+        if memory_limit is not None and memory_limit <= 0:
+            raise ValueError("Invalid memory limit. Please provide a positive number of bytes.")
+        self.memory_limit: Optional[int] = memory_limit
+        self.track_memory: bool = track_memory or memory_limit is not None
+
+        self.resource_limits: Optional[ResourceLimits] = resource_limits
+
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("Invalid maximum concurrency. Please provide a positive integer.")
+        self.max_concurrency: int = max_concurrency or os.cpu_count() or 1
+
+        self.in_process: bool = in_process
+
+        self.comparator: Callable[[Any, Any], bool] = comparator or Comparator()
+
+        self.failure_log: Optional[str] = failure_log
+
+        # The threads the async runs are supervised from, and the semaphore of the event loop they are awaited in
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def __enter__(self) -> "Tester":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Stop the persistent worker processes, if any. The next run starts new ones.
+        """
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def run_test(
+            self, user_func: Callable, num_test_cases: int = 100, cases: Optional[TestCaseBatch] = None
+    ) -> TestReport:
         """
         Run tests for the specified function using generated test cases.
 
         Args:
             user_func (Callable): The user-defined function to be tested.
             num_test_cases (int): The number of test cases to generate and run.
+            cases (Optional[TestCaseBatch]): Run these test cases instead of generating them, in which case
+                num_test_cases is ignored. A batch that is not shared yet is copied to shared memory for the run.
+
+        Returns:
+            TestReport: The pass/fail counts, the failed cases kept for the summary and the time spent in each phase.
 
         Raises:
             ValueError: If an invalid option is provided.
             AttributeError: If an invalid function name is provided.
-            TimeoutError: If the function execution exceeds the timeout.
+            TestTimeoutError: If the function execution exceeds the timeout, with the report of the cases that ran.
 
         Note:
             This method generates test cases, compares function outputs, and calculates success rate.
             Test results can be printed or written to a file based on provided options.
 
-            If a test case execution takes more than the specified runtime_limit (in seconds),
-            the function will raise a TimeoutError and terminate.
+            If the test run takes more than the specified runtime_limit (in seconds),
+            the function will raise a TestTimeoutError and terminate. A single test case that takes more than
+            the specified case_timeout is recorded as a failed case and the run continues.
+
+            The worker processes generate their own test cases, or map the same shared batch of `cases`,
+            so the test cases of a run are never copied to each worker.
 
         Example:
             >>> from mygrader import mygrader
@@ -74,8 +269,89 @@ class Tester(unittest.TestCase):
             >>> def add(a, b):
             ...     return a + b
             ...
-            >>> tester.run_test(add, num_test_cases=50)
+            >>> report = tester.run_test(add, num_test_cases=50)
+            >>> report.success_rate
+            100.0
+        """
+        return self.__run_test(user_func, num_test_cases, cases)
+
+    async def run_test_async(
+            self, user_func: Callable, num_test_cases: int = 100, cases: Optional[TestCaseBatch] = None
+    ) -> TestReport:
+        """
+        Run tests for the specified function like `run_test`, without blocking the event loop.
+
+        Args:
+            user_func (Callable): The user-defined function to be tested.
+            num_test_cases (int): The number of test cases to generate and run.
+            cases (Optional[TestCaseBatch]): Run these test cases instead of generating them.
+
+        Returns:
+            TestReport: The same report as `run_test`.
+
+        Raises:
+            ValueError: If an invalid option is provided, or the tester runs the test cases `in_process`.
+            AttributeError: If an invalid function name is provided.
+            TestTimeoutError: If the function execution exceeds the timeout, with the report of the cases that ran.
+
+        Note:
+            At most `max_concurrency` runs are in progress at once, the others wait for a slot in the event loop.
+            A run in progress is supervised from a thread, with its own worker processes even if
+            `persistent_workers` is enabled, and without a progress bar.
+
+            Cancelling the task kills the worker processes of the run, and the cancellation completes once they
+            are gone, so a grading service can bound the time spent on a request with `asyncio.wait_for`.
+
+        Example:
+            >>> tester = Tester(year=2023, max_concurrency=8)
+            >>> reports = await asyncio.gather(*(tester.run_test_async(func) for func in submissions))
+        """
+        # The deadlines of an inline run rely on SIGALRM, which only reaches the main thread, and its captured
+        # output on the global sys.stdout, which the concurrent runs would swap under each other
+        if self.in_process:
+            raise ValueError("Invalid option. run_test_async cannot run the test cases in_process, use run_test.")
+
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_concurrency, thread_name_prefix="mygrader")
+
+        async with self._semaphore:
+            cancel = threading.Event()
+            future = self._executor.submit(self.__run_test, user_func, num_test_cases, cases, cancel)
+            try:
+                return await asyncio.wrap_future(future)
+
+            except asyncio.CancelledError:
+                # Have the supervising thread kill the workers, and keep the slot until it has done so
+                cancel.set()
+                with contextlib.suppress(BaseException):
+                    await asyncio.shield(asyncio.wrap_future(future))
+                raise
+
+    def __run_test(
+            self,
+            user_func: Callable,
+            num_test_cases: int,
+            cases: Optional[TestCaseBatch] = None,
+            cancel: Optional[threading.Event] = None
+    ) -> TestReport:
+        """
+        Run the tests of `run_test`, or of `run_test_async` if a cancel event is given.
+
+        Args:
+            user_func (Callable): The user-defined function to be tested.
+            num_test_cases (int): The number of test cases to generate and run.
+            cases (Optional[TestCaseBatch]): The test cases to run instead of generated ones, or None.
+            cancel (Optional[threading.Event]): Cancels the run when set, which then raises a CancelledError.
+
+        Returns:
+            TestReport: The report of the run.
         """
+        timings = {}
 
         # Get the test module corresponding to the specified year
         test_module = getattr(src, self.year)
@@ -84,8 +360,10 @@ class Tester(unittest.TestCase):
         solver = getattr(test_module.Solution, user_func.__name__)
 
         # Get return type information for both the user and solver functions
+        probe_start = time.perf_counter()
         return_type = self.return_type(user_func)
         solver_return = self.return_type(solver)
+        timings["return_type"] = time.perf_counter() - probe_start
 
         # Check for mismatched return types
         if return_type["type"] != solver_return["type"]:
@@ -97,40 +375,402 @@ class Tester(unittest.TestCase):
             expected_property = "destructive" if solver_return["is_dest"] else "non-destructive"
             raise Exception(f"This function should be {expected_property}, but your function is not.")
 
-        if num_test_cases > 1_000_000:
-            raise MemoryError("Too many test cases. Please reduce the number of test cases.")
-        elif num_test_cases < 1:
+        if cases is not None:
+            num_cases = len(cases)
+        elif num_test_cases >= 1:
+            num_cases = test_module.Generator.num_cases(user_func.__name__, num_test_cases)
+        else:
+            num_cases = 0
+
+        if num_cases < 1:
             raise ValueError("Invalid number of test cases. Please provide a positive integer.")
-        elif num_test_cases >= 100_000:
+        elif num_cases >= 100_000:
             logging.warning("This may take a while...")
 
-        # Generate test case parameters using the Generator class
-        test_cases_params = getattr(test_module.Generator, f"{user_func.__name__}_test_cases")(num_test_cases)
-
-        # Use multiprocessing to run the tests with a timeout
-        result_queue = Queue()
-        process = Process(
-            target=self._run_test_case,
-            kwargs={
-                "user_func": user_func,
-                "solver": solver,
-                "test_cases_params": test_cases_params,
-                "num_test_cases": num_test_cases,
-                "return_type": return_type,
-                "result_queue": result_queue
-            }
+        # The results of the shards are merged as soon as they arrive
+        run_result = ShardResult()
+        start_time = time.perf_counter()
+        shard_size = self.__shard_size(num_cases)
+        pool = self.__worker_pool(-(-num_cases // shard_size), shared=cancel is None)
+        shared_cases = None
+        failure_log = FailureLog(self.failure_log) if self.failure_log is not None else None
+
+        try:
+            batch_solver = self.__batch_solver(test_module, user_func.__name__)
+            if cases is None:
+                # The workers generate the parameters of their own test cases from the seed using the Generator class
+                seed = self.seed if self.seed is not None else test_module.Generator.new_seed()
+                generate = partial(test_module.Generator.case, user_func.__name__, seed)
+                iter_cases = partial(test_module.Generator.iter_cases, user_func.__name__, seed)
+                bulk = batch_solver is not None and test_module.Generator.has_bulk(user_func.__name__)
+                columns = partial(test_module.Generator.columns, user_func.__name__, seed) if bulk else None
+            else:
+                # The workers map the same batch of test cases from shared memory
+                if isinstance(pool, WorkerPool) and not cases.shared:
+                    shared_cases = cases.share()
+                source = shared_cases or cases
+                seed, generate, iter_cases = cases.seed, cases.__getitem__, source.iter_cases
+                columns = source.columns if batch_solver is not None else None
+
+            # Split the test cases into shards, which are handed lazily to a pool of worker processes
+            shards = ((i, min(i + shard_size, num_cases)) for i in range(0, num_cases, shard_size))
+            run_shard = partial(
+                self._run_test_case,
+                user_func=user_func,
+                solver=solver,
+                return_type=return_type,
+                iter_cases=iter_cases,
+                copy_plan=self.__copy_plan(test_module.Generator, user_func.__name__),
+                track_memory=self.track_memory,
+                memory_limit=self.memory_limit,
+                resource_limits=self.resource_limits,
+                comparator=self.comparator,
+                batch_solver=batch_solver,
+                columns=columns,
+                to_cases=test_module.Generator.to_cases,
+                spill_dir=failure_log.spill_dir if failure_log is not None else None
+            )
+            timeout_result = partial(self.__timeout_result, generate)
+            crash_result = partial(self.__crash_result, generate)
+            deadline = time.monotonic() + self.runtime_limit
+
+            show_progress = not self.debug and cancel is None
+            with tqdm(total=num_cases, desc="Running test cases", unit="tests", disable=not show_progress) as progress:
+                for payload in pool.run(run_shard, shards, deadline, timeout_result, cancel, crash_result):
+                    shard_result = ShardResult.decode(payload)
+                    if not run_result.num_cases:
+                        # Whatever the first shard did not spend running its cases was spent starting up
+                        first_result_time = time.perf_counter() - start_time
+                        timings["startup"] = max(first_result_time - shard_result.timing("total"), 0.0)
+
+                    run_result.merge(
+                        shard_result, self.MAX_FAILED_CASES, self.MAX_MEMORY_CASES, self.MAX_SAMPLED_CASES,
+                        self.MAX_CLUSTERS
+                    )
+                    if failure_log is not None:
+                        # The results of the cases that exceeded the case timeout or crashed their worker are built
+                        # by the parent, and have no spill file
+                        if shard_result.spill_path:
+                            failure_log.append_file(shard_result.spill_path)
+                        else:
+                            failure_log.append_cases(shard_result.failed_cases)
+                    progress.update(shard_result.num_cases)
+
+        except TimeoutError as e:
+            # The cases run by the shards that were cut short are counted from the last checkpoint of their worker
+            for checkpoint in getattr(e, "checkpoints", ()):
+                run_result.passed_count += checkpoint["passed"]
+                run_result.failed_count += checkpoint["cases"] - checkpoint["passed"]
+
+            report = self.__build_report(
+                user_func.__name__, seed, run_result, time.perf_counter() - start_time, timings, num_cases
+            )
+            raise TestTimeoutError(report, self.runtime_limit) from None
+
+        finally:
+            if pool is not self.pool:
+                pool.close()
+            if shared_cases is not None:
+                shared_cases.close()
+            if failure_log is not None:
+                failure_log.close()
+
+        total_time = time.perf_counter() - start_time
+        report = self.__build_report(user_func.__name__, seed, run_result, total_time, timings)
+
+        # Only the parent renders the results
+        render_start = time.perf_counter()
+        summary_data = report.to_dict()
+        summary_data["total_time_result"] = total_time
+
+        formatted_summary_data = self.__generate_summary(summary_data)
+        self.__handle_log_option(formatted_summary_data)
+        report.timings["rendering"] = time.perf_counter() - render_start
+
+        return report
+
+    def __build_report(
+            self,
+            function_name: str,
+            seed: Optional[int],
+            run_result: ShardResult,
+            total_time: float,
+            timings: Dict[str, float],
+            num_requested: Optional[int] = None
+    ) -> TestReport:
+        """
+        Build the report of a run from the merged results of its shards.
+
+        Args:
+            function_name (str): The name of the tested function.
+            seed (Optional[int]): The seed of the test cases.
+            run_result (ShardResult): The merged results of the shards.
+            total_time (float): The wall-clock time (in seconds) of the run.
+            timings (Dict[str, float]): The time (in seconds) spent in the phases measured by the parent.
+            num_requested (Optional[int]): The number of test cases of a run cut short by the runtime limit, or None.
+
+        Returns:
+            TestReport: The report of the run.
+        """
+        for phase in ("generation", "user", "solver", "comparison"):
+            timings[phase] = run_result.timing(phase)
+
+        return TestReport(
+            function_name=function_name,
+            seed=seed,
+            passed_count=run_result.passed_count,
+            failed_count=run_result.failed_count,
+            failed_cases=run_result.failed_cases,
+            sampled_cases=[case for _, case in run_result.sampled_cases],
+            clusters=[
+                {"signature": signature, "count": count, "case": case}
+                for signature, (count, case) in sorted(run_result.clusters.items(), key=lambda item: -item[1][0])
+            ],
+            errors=[
+                {"site": site, "count": count, "index": index, "traceback": formatted}
+                for site, (count, index, formatted) in sorted(run_result.errors.items(), key=lambda item: -item[1][0])
+            ],
+            total_time=total_time,
+            timings=timings,
+            latencies=run_result.latencies,
+            perf_budget=self.perf_budget,
+            memory=run_result.memory if self.track_memory else None,
+            memory_cases=run_result.memory_cases,
+            memory_limit=self.memory_limit,
+            verdicts=run_result.verdicts,
+            num_requested=num_requested
         )
 
-        process.start()
-        process.join(timeout=self.runtime_limit)
+    def measure_complexity(
+            self, user_func: Callable, time_limit: float = 10.0, max_size: Optional[int] = None
+    ) -> ComplexityReport:
+        """
+        Measure how the runtime of a function grows with the size of its input, compared to the solution.
+
+        Args:
+            user_func (Callable): The user-defined function to be measured.
+            time_limit (float): The maximum wall-clock time (in seconds) of the measurement.
+            max_size (Optional[int]): The largest input size to measure, or None for every size of the function.
 
-        if process.is_alive():
-            process.terminate()
-            process.join()
-            raise TimeoutError(f"Function {user_func.__name__} timed out after {self.runtime_limit} seconds.")
+        Returns:
+            ComplexityReport: The time of a call at each size, the growth class of the user function and of
+                the solution, and the scaling ratio of the user function.
 
-        formatted_summary_data = result_queue.get()
-        self.__handle_log_option(formatted_summary_data)
+        Raises:
+            AttributeError: If an invalid function name is provided.
+            ValueError: If the input size of the function cannot be varied.
+            TimeoutError: If fewer than three sizes were measured within the time limit.
+
+        Note:
+            The input sizes are listed in `Generator.COMPLEXITY_SIZES`: the length of the list for `left_max`
+            or `median_of_median`, the length of the lanes for `arrival_sequences`, n for `corner_frame`.
+            They are measured smallest first by a single worker process, so that the measurements do not
+            compete for the CPU, and the sizes measured before the time limit runs out are kept. Each call
+            is repeated for at least COMPLEXITY_MIN_TIME seconds and its fastest run is kept.
+
+        Example:
+            >>> tester = Tester(year=2023)
+            >>> report = tester.measure_complexity(left_max)
+            >>> report.growth["user"], report.scaling_ratio
+            ('O(n)', 1.1)
+        """
+        test_module = getattr(src, self.year)
+        func_name = user_func.__name__
+        solver = getattr(test_module.Solution, func_name)
+
+        sizes = [
+            size for size in test_module.Generator.COMPLEXITY_SIZES.get(func_name, ())
+            if max_size is None or size <= max_size
+        ]
+        if len(sizes) < 3:
+            raise ValueError(f"The input size of {func_name} cannot be varied over at least three sizes.")
+
+        seed = self.seed if self.seed is not None else test_module.Generator.new_seed()
+        measure = partial(
+            self._measure_size,
+            user_func=user_func,
+            solver=solver,
+            sized_case=partial(test_module.Generator.sized_case, func_name, seed),
+            sizes=sizes,
+            comparator=self.comparator
+        )
+
+        measurements = {}
+        pool = WorkerPool(1, preload=self.__preload())
+        deadline = time.monotonic() + time_limit
+
+        try:
+            shards = ((i, i + 1) for i in range(len(sizes)))
+            for measurement in pool.run(measure, shards, deadline, timeout_result=None):
+                measurements[measurement["size"]] = measurement
+
+        except TimeoutError:
+            # Keep the sizes measured before the time limit
+            pass
+
+        finally:
+            pool.close()
+
+        if len(measurements) < 3:
+            raise TimeoutError(
+                f"Function {func_name} only completed {len(measurements)} input sizes in {time_limit} seconds.")
+
+        measured = sorted(measurements)
+        report = ComplexityReport(
+            function_name=func_name,
+            sizes=measured,
+            user_times=[measurements[size]["user"] for size in measured],
+            solver_times=[measurements[size]["solver"] for size in measured],
+            mismatched_sizes=[size for size in measured if not measurements[size]["correct"]]
+        )
+
+        self.__handle_log_option(self.__complexity_summary(report))
+        return report
+
+    def __worker_pool(self, num_shards: int, shared: bool = True) -> Union[WorkerPool, InlinePool]:
+        """
+        Get the pool of worker processes for a run.
+
+        Args:
+            num_shards (int): The number of shards of the run.
+            shared (bool): If False, never use the persistent pool, e.g. for a run concurrent with others.
+
+        Returns:
+            Union[WorkerPool, InlinePool]: An inline pool if `in_process` is enabled, the persistent pool if
+                `persistent_workers` is enabled, otherwise a new pool for this run only.
+        """
+        if self.in_process:
+            return InlinePool(case_timeout=self.case_timeout)
+
+        if not self.persistent_workers or not shared:
+            return WorkerPool(min(self.jobs, num_shards), case_timeout=self.case_timeout, preload=self.__preload())
+
+        if self.pool is None:
+            self.pool = WorkerPool(self.jobs, case_timeout=self.case_timeout, preload=self.__preload())
+
+        return self.pool
+
+    def __batch_solver(self, test_module: Any, func_name: str) -> Optional[Callable]:
+        """
+        Get the vectorized counterpart of the solver of a function, which computes the expected outputs of a whole
+        shard in one call.
+
+        Args:
+            test_module (Any): The test module of the year.
+            func_name (str): The name of the function.
+
+        Returns:
+            Optional[Callable]: The method of the BatchSolution class of the year, or None if the function has none
+                or if the run needs the solver to run on every case.
+
+        Note:
+            In memory mode and with a performance budget, the solver runs on every case, since its peak memory
+            and its time on the same inputs as the user function are part of the grade.
+        """
+        if self.track_memory or self.perf_budget is not None:
+            return None
+
+        return getattr(getattr(test_module, "BatchSolution", None), func_name, None)
+
+    def __preload(self) -> List[str]:
+        """
+        Get the modules the worker processes import before their first run.
+
+        Returns:
+            List[str]: The test module of the year and the libraries used while running the tests.
+        """
+        return [f"{src.__name__}.{self.year}", "faker", "tabulate", "tqdm"]
+
+    def __shard_size(self, num_cases: int) -> int:
+        """
+        Get the number of test cases in each shard handed to the worker pool.
+
+        Args:
+            num_cases (int): The number of test cases.
+
+        Returns:
+            int: The size of the shards.
+
+        Note:
+            Each worker gets several shards so that a slow shard does not leave the other workers idle,
+            and so that the progress bar moves while the shards are being run. Shards never exceed
+            MAX_SHARD_SIZE cases, which bounds the work lost when a worker is killed.
+        """
+        num_shards = min(num_cases, self.jobs * 8)
+        return min(-(-num_cases // num_shards), self.MAX_SHARD_SIZE)
+
+    def __copy_plan(self, generator: type, func_name: str) -> Optional[Tuple]:
+        """
+        Get how the parameters of the test cases of a function are copied before each call.
+
+        Args:
+            generator (type): The Generator class of the year.
+            func_name (str): The name of the function.
+
+        Returns:
+            Optional[Tuple]: The copy plan returned by `copy_plan`, analysed once per generator.
+
+        Note:
+            Immutable parameters, such as the ints, floats and strings of most generators, are not copied at all,
+            and flat lists of immutable values get a single shallow copy instead of a deepcopy.
+        """
+        key = (self.year, func_name)
+        if key not in self._copy_plans:
+            samples = generator.iter_cases(func_name, 0, 0, 8)
+            self._copy_plans[key] = copy_plan(samples)
+
+        return self._copy_plans[key]
+
+    @classmethod
+    def __timeout_result(cls, generate: Callable, index: int) -> bytes:
+        """
+        Build the result of a test case that exceeded the per-case timeout.
+
+        Args:
+            generate (Callable): Generates the parameters of a test case from its index.
+            index (int): The index of the test case.
+
+        Returns:
+            bytes: An encoded ShardResult, like the ones returned by `_run_test_case`.
+        """
+        return cls.__lost_case_result(generate, index, "timeout", "Timeout", "Timeout")
+
+    @classmethod
+    def __crash_result(cls, generate: Callable, index: int, description: str) -> bytes:
+        """
+        Build the result of a test case during which its worker process died, e.g. from a segfault or os._exit.
+
+        Args:
+            generate (Callable): Generates the parameters of a test case from its index.
+            index (int): The index of the test case.
+            description (str): How the worker exited, e.g. "killed by signal SIGSEGV".
+
+        Returns:
+            bytes: An encoded ShardResult, like the ones returned by `_run_test_case`.
+        """
+        return cls.__lost_case_result(generate, index, "crash", "No crash", f"Worker {description}")
+
+    @classmethod
+    def __lost_case_result(cls, generate: Callable, index: int, verdict: str, expected: str, result: str) -> bytes:
+        """
+        Build the result of a failed test case whose worker was lost before it could report it.
+        """
+        case = {
+            "index": index,
+            "input": generate(index),
+            "expected": expected,
+            "result": result,
+            "verdict": verdict
+        }
+        return ShardResult(
+            start=index,
+            stop=index + 1,
+            failed_count=1,
+            failed_cases=[case],
+            verdicts={verdict: 1},
+            sampled_cases=[(sample_key(index), case)],
+            clusters={failure_signature(case): [1, case]}
+        ).encode()
 
     @classmethod
     def return_type(cls, func: Callable) -> Dict[str, bool]:
@@ -153,6 +793,7 @@ class Tester(unittest.TestCase):
             >>> Tester.return_type(add)
             {'type': 'int', 'is_dest': False}
         """
+        cls._stdout_lock.acquire()
         original_stdout = sys.stdout
         sys.stdout = open(os.devnull, 'w')  # Redirect stdout to null device
 
@@ -185,7 +826,9 @@ class Tester(unittest.TestCase):
             raise AttributeError(f"Function not found in the Generator class: {func.__name__}")
 
         finally:
+            sys.stdout.close()
             sys.stdout = original_stdout  # Restore original stdout
+            cls._stdout_lock.release()
 
         return result
 
@@ -228,90 +871,291 @@ class Tester(unittest.TestCase):
             "printed_text": printed_text
         }
 
-    def _run_test_case(self: "Tester", **kwargs: Iterable) -> None:
+    @classmethod
+    def _run_test_case(cls, shard: Tuple[int, int], status: RawArray, **kwargs: Iterable) -> bytes:
         """
-        Run tests cases and compare function outputs.
+        Run a shard of tests cases and compare function outputs.
 
         Args:
+            shard (Tuple[int, int]): The range of test case indices of the shard.
+            status (RawArray): Shared with the parent, which reads the index and start time of the running case
+                to enforce the per-case timeout, and the number of cases of the shard that passed before it
+                to report the progress of a run cut short by the runtime limit.
             **kwargs (Dict): Keyword arguments containing the necessary parameters for running the tests:
 
         Returns:
-            None
+            bytes: An encoded ShardResult with the pass/fail counts, the first MAX_FAILED_CASES failed cases,
+                a uniform sample of MAX_SAMPLED_CASES failed cases, the file the failed cases were spilled to,
+                the time spent by the shard in each phase and the latencies of the user function and the solver.
 
         Note:
             This method runs test cases using the provided user_func and solver.
-            It compares the outputs of these functions, tracks failures, and calculates test results.
+            It compares the outputs of these functions and tracks failures;
+            the results of every shard are merged and rendered by the parent.
+            A case where user_func raises an exception, including SystemExit, fails with the runtime_error verdict.
 
         Raises:
-            TimeoutError: If the function execution exceeds the timeout.
-            Exception: If an error occurs while generating the summary.
+            Exception: If the solver or the comparator raises an exception while running the test cases.
         """
 
         # the user-defined function to be tested.
         user_func: Callable = kwargs["user_func"]
         # the solution function to be tested against.
         solver: Callable = kwargs["solver"]
-        # the parameters for the test cases.
-        test_cases_params: Iterable = kwargs["test_cases_params"]
-        # the number of test cases to generate and run.
-        num_test_cases: int = kwargs["num_test_cases"]
         # the return type of the functions being tested.
         return_type: str = kwargs["return_type"]
-        # the queue to store the tests results.
-        result_queue: Queue = kwargs["result_queue"]
-
-        start_time = time.time()
+        # lazily generates the parameters of the test cases in a range of indices.
+        iter_cases: Callable = kwargs["iter_cases"]
+        # how the parameters are copied so that the functions cannot change the test case.
+        plan: Optional[Tuple] = kwargs["copy_plan"]
+        # whether the peak memory of each call is measured, and the most a call of user_func may allocate.
+        track_memory: bool = kwargs["track_memory"]
+        memory_limit: Optional[int] = kwargs["memory_limit"]
+        # the operating system limits applied to the worker while it runs the shard.
+        limits: Optional[ResourceLimits] = kwargs["resource_limits"]
+        # decides whether the output of user_func matches the output of solver.
+        compare: Callable[[Any, Any], bool] = kwargs["comparator"]
+        # computes the outputs of solver on every case of the shard in one call, or None.
+        batch_solver: Optional[Callable] = kwargs.get("batch_solver")
+        # generates the parameters of the test cases in a range of indices in bulk, one array per parameter, or None.
+        columns: Optional[Callable] = kwargs.get("columns")
+        to_cases: Optional[Callable] = kwargs.get("to_cases")
+        # the directory every failed case is written to, or None.
+        spill_dir: Optional[str] = kwargs.get("spill_dir")
+
+        # the range of test case indices of the shard.
+        start, stop = shard
+
+        perf_counter_ns = time.perf_counter_ns
+        start_time = perf_counter_ns()
 
         passed_count = 0
         failed_count = 0
-        failed_cases = []
+        failures = FailureStore(cls.MAX_FAILED_CASES, cls.MAX_SAMPLED_CASES, cls.MAX_CLUSTERS, spill_dir)
+        verdicts = {}
+
+        # The time spent in each phase in nanoseconds, summed over the test cases of the shard,
+        # and the distribution of the latencies of the user function and the solver
+        generation_time = comparison_time = 0
+        user_latency = LatencyHistogram()
+        solver_latency = LatencyHistogram()
+        phase_start = start_time
+
+        # The peak memory of every call is only measured in memory mode, since tracemalloc slows down every allocation
+        tracker = MemoryTracker(cls.MAX_MEMORY_CASES) if track_memory else None
+
+        # With a batch solver, the expected outputs of the whole shard are computed in one call,
+        # and the scalar solver only runs on one case in SOLVER_SAMPLE_INTERVAL to measure its latency.
+        # Cases generated in bulk are handed to the batch solver as the columns they were generated as
+        expected_outputs = None
+        batch_time = 0
+        if batch_solver is None:
+            cases = iter_cases(start, stop)
+        else:
+            if columns is not None:
+                batch_params = columns(start, stop)
+                cases = to_cases(batch_params)
+            else:
+                cases = list(iter_cases(start, stop))
+                batch_params = tuple(zip(*cases))
+            batch_start = perf_counter_ns()
+            generation_time += batch_start - phase_start
 
-        for params in tqdm(test_cases_params, desc="Running test cases", unit="tests", disable=self.debug):
             try:
-                user_params = deepcopy(params)
-                solver_params = deepcopy(params)
+                expected_outputs = batch_solver(*batch_params)
+            except Exception:
+                # The scalar solver runs on every case instead, so that a case it fails on fails like without
+                # a batch solver, instead of the whole shard
+                expected_outputs = None
+            phase_start = perf_counter_ns()
+            batch_time = phase_start - batch_start
+
+        # Stdout is redirected once for the whole shard, and only captured for functions that print their answer
+        with BatchCapture(capture=return_type == 'None') as capture, failures, \
+                tracker or contextlib.nullcontext(), limits or contextlib.nullcontext():
+            for index, params in enumerate(cases, start):
+                # Publish the start time and the progress before the index, the parent reads them in the reverse order
+                case_start = time.monotonic()
+                status[1] = case_start
+                status[2] = passed_count
+                status[0] = index
+
+                in_user_func = False
+                try:
+                    if limits is not None:
+                        limits.start_case(case_start)
+
+                    run_solver = expected_outputs is None or not index % cls.SOLVER_SAMPLE_INTERVAL
+                    user_params = copy_params(plan, params)
+                    solver_params = copy_params(plan, params) if run_solver else None
+
+                    user_peak = solver_peak = 0
+                    if tracker is not None:
+                        tracker.reset()
+                    user_start = perf_counter_ns()
+
+                    in_user_func = True
+                    user_output = capture.call(user_func, *user_params)
+                    in_user_func = False
+                    user_end = perf_counter_ns()
+
+                    if tracker is not None:
+                        user_peak = tracker.peak()
+                        tracker.reset()
+                    if run_solver:
+                        solver_start = perf_counter_ns()
+                        solver_output = capture.call(solver, *solver_params)
+                        solver_end = perf_counter_ns()
+                    else:
+                        solver_start = solver_end = user_end
+
+                    if expected_outputs is not None:
+                        solver_output = expected_outputs[index - start]
+
+                    if tracker is not None:
+                        solver_peak = tracker.peak()
+                        tracker.record(index, params, user_peak, solver_peak)
+                    capture.clear()
+
+                    correct = compare(user_output, solver_output)
+
+                    # A correct output still fails if it took more memory than the limit
+                    if correct and (memory_limit is None or user_peak <= memory_limit):
+                        passed_count += 1
+                    else:
+                        verdict = "memory_limit" if correct else "wrong_output"
+                        failed_count += 1
+                        verdicts[verdict] = verdicts.get(verdict, 0) + 1
+                        failures.add({
+                            "index": index,
+                            "input": params,
+                            "expected": solver_output if not correct else f"<= {memory_limit} bytes",
+                            "result": user_output if not correct else f"{user_peak} bytes",
+                            "verdict": verdict
+                        })
+
+                except (Exception, SystemExit, ResourceLimitExceeded) as e:
+                    limit = limits.violation(e) if limits is not None else None
+                    failed_count += 1
+                    capture.clear()
+
+                    if limit is not None:
+                        # The case exceeded a resource limit of the worker, which is a verdict of its own
+                        verdict = f"{limit}_limit"
+                        failures.add({
+                            "index": index,
+                            "input": params,
+                            "expected": f"{limit} <= {limits.limits[limit]}",
+                            "result": f"{limit} limit exceeded",
+                            "verdict": verdict
+                        })
+                    elif in_user_func:
+                        # An exception of the user function fails the case, and the run goes on
+                        verdict = "runtime_error"
+                        failures.add_error(index, params, e)
+                    else:
+                        raise Exception(f"Error occurred while running test cases: {e}")
+
+                    verdicts[verdict] = verdicts.get(verdict, 0) + 1
+
+                    # A case cut short by a limit or an exception has no latency
+                    phase_start = perf_counter_ns()
+                    continue
+
+                # Generating the next case is counted from the end of the comparison of this one
+                end = perf_counter_ns()
+                generation_time += user_start - phase_start
+                user_latency.add(user_end - user_start)
+                if run_solver:
+                    solver_latency.add(solver_end - solver_start)
+                comparison_time += end - solver_end
+                phase_start = end
+
+        timings = [
+            perf_counter_ns() - start_time, generation_time, user_latency.total, solver_latency.total + batch_time,
+            comparison_time
+        ]
+
+        return ShardResult(
+            start=start,
+            stop=stop,
+            passed_count=passed_count,
+            failed_count=failed_count,
+            timings=array('d', [ns / 1e9 for ns in timings]),
+            failed_cases=failures.first,
+            latencies={"user": user_latency, "solver": solver_latency},
+            memory=tracker.histograms if tracker is not None else None,
+            memory_cases=tracker.largest_cases() if tracker is not None else None,
+            verdicts=verdicts,
+            sampled_cases=failures.sampled_cases(),
+            spill_path=failures.spill_path,
+            clusters=failures.clusters,
+            errors=failures.errors
+        ).encode()
 
-                user_output = self.__caller(user_func, return_type, *user_params)
-                solver_output = self.__caller(solver, return_type, *solver_params)
+    @classmethod
+    def _measure_size(cls, shard: Tuple[int, int], status: RawArray, **kwargs: Any) -> Dict:
+        """
+        Time the user function and the solver on inputs of one size.
 
-                if isinstance(user_output, float) and isclose(user_output, solver_output, rel_tol=1e-9):
-                    passed_count += 1
-                elif user_output == solver_output:
-                    passed_count += 1
-                else:
-                    failed_count += 1
-                    failed_cases.append({
-                        "input": params,
-                        "expected": solver_output,
-                        "result": user_output
-                    })
-
-            except TimeoutError:
-                failed_count += 1
-                failed_cases.append({
-                    "input": params,
-                    "expected": "Timeout",
-                    "result": "Timeout"
-                })
-
-            except Exception as e:
-                raise Exception(f"Error occurred while running test cases: {e}")
-
-        end_time = time.time()
-        total_time = end_time - start_time
-
-        # Generate and format the summary based on the test results
-        summary = self.__generate_summary({
-            "passed_count": passed_count,
-            "failed_count": failed_count,
-            "failed_cases": failed_cases,
-            "success_rate": (passed_count / num_test_cases) * 100,
-            "total_time_result": total_time,
-            "average_time": total_time / num_test_cases,
-            "test_per_second": num_test_cases / total_time
-        })
-
-        result_queue.put(summary)
+        Args:
+            shard (Tuple[int, int]): The position of the size in `sizes`, as a range of length one.
+            status (RawArray): Shared with the parent, unused since the measurement has no per-case timeout.
+            **kwargs (Dict): The user_func, the solver, sized_case(size, index) which generates the inputs,
+                the sizes being measured and the comparator of the outputs.
+
+        Returns:
+            Dict: The size, the average time (in seconds) of a call of the "user" function and of the "solver",
+                and whether the user function gave the "correct" output for every input.
+        """
+        user_func: Callable = kwargs["user_func"]
+        solver: Callable = kwargs["solver"]
+        sized_case: Callable = kwargs["sized_case"]
+        size: int = kwargs["sizes"][shard[0]]
+        compare: Callable[[Any, Any], bool] = kwargs["comparator"]
+
+        samples = [sized_case(size, index) for index in range(cls.COMPLEXITY_SAMPLES)]
+        plan = copy_plan(samples)
+        measurement = {"size": size}
+        outputs = {}
+
+        # Whatever the functions print is discarded
+        with BatchCapture(capture=False) as capture:
+            for name, func in (("user", user_func), ("solver", solver)):
+                times = []
+                outputs[name] = []
+                for params in samples:
+                    elapsed, output = cls.__time_call(capture, func, plan, params)
+                    times.append(elapsed)
+                    outputs[name].append(output)
+
+                measurement[name] = sum(times) / len(times)
+
+        measurement["correct"] = all(map(compare, outputs["user"], outputs["solver"]))
+        return measurement
+
+    @classmethod
+    def __time_call(cls, capture: BatchCapture, func: Callable, plan: Optional[Tuple], params: tuple) -> Tuple:
+        """
+        Time a call of a function, repeated for at least COMPLEXITY_MIN_TIME seconds.
+
+        Returns:
+            Tuple: The fastest time (in seconds) of the call and its output.
+        """
+        best = None
+        spent = 0
+        min_time = cls.COMPLEXITY_MIN_TIME * 1e9
+
+        while spent < min_time:
+            args = copy_params(plan, params)
+            start = time.perf_counter_ns()
+            output = capture.call(func, *args)
+            elapsed = time.perf_counter_ns() - start
+
+            spent += elapsed
+            best = elapsed if best is None else min(best, elapsed)
+
+        return best / 1e9, output
 
     def __generate_summary(self, summary_data: Dict) -> str:
         """
@@ -332,41 +1176,189 @@ class Tester(unittest.TestCase):
             It fills in placeholders in the template with the relevant information from the summary data.
             The generated summary can include a table of failed cases if show_table is True.
         """
-        headers = ["Input", "Expected Output", "Actual Output"]
+        headers = ["Case", "Input", "Expected Output", "Actual Output"]
         table = []
 
         if self.show_table:
-            # If show_table is enabled, populate the table with data from failed cases (up to 3 cases)
-            for case in summary_data["failed_cases"][0:3]:
-                table.append([case["input"], f'{case["expected"]}'[:10], case["result"]][:10])
+            # If show_table is enabled, populate the table with data from failed cases (up to 3 cases),
+            # the start of the uniform sample, which is a uniform sample of its own
+            for case in sorted(summary_data["sampled_cases"][0:3], key=lambda case: case["index"]):
+                table.append([case["index"], case["input"], f'{case["expected"]}'[:10], case["result"]][:10])
         else:
             # If show_table is disabled, display an empty row
-            table = [["", "", ""]]
+            table = [["", "", "", ""]]
 
         # Generate the table format using tabulate (grid format)
         failed_cases_table = tabulate(table, headers=headers, tablefmt="grid") if self.show_table else ""
 
         # Additional info about more failed cases if applicable
         additional_failed_cases_info = ""
-        if self.show_table and len(summary_data["failed_cases"]) > 3:
-            additional_failed_cases_info = f"\nand more...{len(summary_data['failed_cases']) - 3} cases failed"
+        if self.show_table and summary_data["failed_count"] > 3:
+            additional_failed_cases_info = f"\nand more...{summary_data['failed_count'] - 3} cases failed"
 
         summary_kwargs = {
-            key: value for key, value in summary_data.items() if key != "failed_cases"
+            key: value for key, value in summary_data.items()
+            if key not in ("failed_cases", "sampled_cases", "clusters", "errors")
         }
 
         # Generate the summary using the appropriate template based on a more_detail option
         if self.show_table:
             summary = template.more_info.format(
                 failed_cases_table=failed_cases_table,
+                latency_table=self.__latency_table(summary_data["latency"]),
                 more_info="Table is disabled" if not self.show_table else additional_failed_cases_info,
                 **summary_kwargs
             )
         else:
             summary = template.simple.format(**summary_kwargs)
 
+        # Failures other than wrong outputs are broken down by verdict
+        if set(summary_data["verdicts"]) - {"wrong_output"}:
+            summary += template.verdicts.format(
+                verdicts=", ".join(f"{verdict}: {count}" for verdict, count in sorted(summary_data["verdicts"].items()))
+            )
+
+        if summary_data["clusters"]:
+            summary += template.clusters.format(clusters_table=self.__clusters_table(summary_data["clusters"]))
+
+        if summary_data["errors"]:
+            summary += template.errors.format(errors_table=tabulate(
+                [[error["count"], error["site"], error["index"]] for error in summary_data["errors"]],
+                headers=["Count", "Raised", "First Case"], tablefmt="grid"
+            ))
+            if self.show_table:
+                summary += "".join(
+                    template.error_traceback.format(**error) for error in summary_data["errors"]
+                )
+
+        if summary_data["perf_budget"] is not None:
+            summary += template.budget.format(
+                verdict="Within budget" if summary_data["within_budget"] else "Over budget",
+                **summary_kwargs
+            )
+
+        if summary_data["memory_usage"] is not None:
+            summary += template.memory.format(
+                memory_table=self.__memory_table(summary_data["memory_usage"]),
+                memory_cases_table=self.__memory_cases_table(summary_data["memory_cases"]),
+                memory_limit="none" if summary_data["memory_limit"] is None else f"{summary_data['memory_limit']} bytes"
+            )
+
         return summary
 
+    @staticmethod
+    def __complexity_summary(report: ComplexityReport) -> str:
+        """
+        Generate the summary of a complexity measurement.
+
+        Args:
+            report (ComplexityReport): The measurement.
+
+        Returns:
+            str: The time of a call at each size, the growth classes and the scaling ratio.
+        """
+        headers = ["Size", "User (us)", "Solver (us)", "Slowdown"]
+        table = [
+            [size, user * 1e6, solver * 1e6, slowdown]
+            for size, user, solver, slowdown in zip(report.sizes, report.user_times, report.solver_times,
+                                                   report.slowdowns)
+        ]
+
+        mismatch_info = ""
+        if report.mismatched_sizes:
+            mismatch_info = f"\nWrong outputs at sizes: {', '.join(map(str, report.mismatched_sizes))}"
+
+        return template.complexity.format(
+            function_name=report.function_name,
+            sizes_table=tabulate(table, headers=headers, tablefmt="grid", floatfmt=".2f"),
+            user_growth=report.growth["user"],
+            solver_growth=report.growth["solver"],
+            user_exponent=report.exponent["user"],
+            solver_exponent=report.exponent["solver"],
+            scaling_ratio=report.scaling_ratio,
+            mismatch_info=mismatch_info
+        )
+
+    @classmethod
+    def __clusters_table(cls, clusters: List[Dict]) -> str:
+        """
+        Render the most frequent signatures of the failed cases as a table.
+
+        Args:
+            clusters (List[Dict]): The signature, count and example case of each cluster, most frequent first.
+
+        Returns:
+            str: The table, followed by the number of signatures left out, if any.
+        """
+        headers = ["Count", "Signature", "Case", "Input", "Expected Output", "Actual Output"]
+        table = [
+            [
+                cluster["count"], cluster["signature"], cluster["case"]["index"], f'{cluster["case"]["input"]}'[:30],
+                f'{cluster["case"]["expected"]}'[:20], f'{cluster["case"]["result"]}'[:20]
+            ]
+            for cluster in clusters[:cls.SUMMARY_CLUSTERS]
+        ]
+
+        rendered = tabulate(table, headers=headers, tablefmt="grid")
+        if len(clusters) > cls.SUMMARY_CLUSTERS:
+            rendered += f"\nand {len(clusters) - cls.SUMMARY_CLUSTERS} more signatures"
+        return rendered
+
+    @staticmethod
+    def __latency_table(latency: Dict[str, Dict[str, float]]) -> str:
+        """
+        Generate the table of the latencies of the user function and the solver.
+
+        Args:
+            latency (Dict[str, Dict[str, float]]): The latency summary of each function, as in `TestReport.latency`.
+
+        Returns:
+            str: The latencies in microseconds, as a grid.
+        """
+        headers = ["Function", "p50 (us)", "p95 (us)", "p99 (us)", "Max (us)"]
+        table = [
+            [name.capitalize()] + [latency[name][key] / 1000 for key in ("p50", "p95", "p99", "max")]
+            for name in ("user", "solver")
+        ]
+        return tabulate(table, headers=headers, tablefmt="grid", floatfmt=".2f")
+
+    @staticmethod
+    def __memory_table(memory_usage: Dict[str, Dict[str, float]]) -> str:
+        """
+        Generate the table of the peak memory of the user function and the solver.
+
+        Args:
+            memory_usage (Dict[str, Dict[str, float]]): The peak memory summary of each function,
+                as in `TestReport.memory_usage`.
+
+        Returns:
+            str: The peak memory in bytes, as a grid.
+        """
+        headers = ["Function", "p50 (B)", "p95 (B)", "p99 (B)", "Max (B)"]
+        table = [
+            [name.capitalize()] + [memory_usage[name][key] for key in ("p50", "p95", "p99", "max")]
+            for name in ("user", "solver")
+        ]
+        return tabulate(table, headers=headers, tablefmt="grid")
+
+    @staticmethod
+    def __memory_cases_table(memory_cases: List[Dict]) -> str:
+        """
+        Generate the table of the cases that used the most memory.
+
+        Args:
+            memory_cases (List[Dict]): The cases, as in `TestReport.memory_cases`.
+
+        Returns:
+            str: The index, truncated input and peak memory of each case, as a grid.
+        """
+        headers = ["Case", "Input", "User (B)", "Solver (B)"]
+        table = [
+            [case["index"], f'{case["input"]}'[:40], case["user_peak"], case["solver_peak"]]
+            for case in memory_cases
+        ]
+        return tabulate(table, headers=headers, tablefmt="grid")
+
     def __handle_log_option(
             self: "Tester", formatted_summary_data: str
     ) -> None:
@@ -379,8 +1371,12 @@ class Tester(unittest.TestCase):
         Raises:
             ValueError: If an invalid logging option is provided.
         """
+        if self.log_option == "none":
+            return
+
         if self.log_option == "print":
-            print(formatted_summary_data)
+            with self._stdout_lock:
+                print(formatted_summary_data)
 
         elif self.log_option == "write":
             with open(f"{self.year}_test_summary.txt", "w") as f:
@@ -388,27 +1384,3 @@ class Tester(unittest.TestCase):
 
         else:
             raise ValueError(f"Invalid logging option: {self.log_option}")
-
-    @classmethod
-    def __caller(
-            cls: "Tester",
-            func: Callable,
-            return_type: str,
-            *args: Iterable
-    ) -> Any:
-        """
-        Execute the specified function and capture the output.
-
-        Args:
-            func (Callable): The function to be executed.
-            *args (Iterable): The arguments to pass to the function.
-
-        Returns:
-            str: The output of the function, captured as a string.
-        """
-        captured_output = cls.capture_printed_text(func, *args)
-
-        if return_type == 'None':
-            return captured_output["printed_text"]
-
-        return captured_output["result"]
@@ -0,0 +1,555 @@
+import importlib
+import os
+import pickle
+import signal
+import threading
+import time
+from collections import deque
+from concurrent.futures import CancelledError
+from array import array
+from multiprocessing import Pipe, Process, RawArray, get_start_method, resource_tracker
+from multiprocessing.connection import Connection, wait
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+def _worker_main(
+        tasks: Connection,
+        results: Connection,
+        status: RawArray,
+        preload: Tuple[str, ...],
+        target: Optional[Callable]
+) -> None:
+    """
+    Run the tasks sent by the parent until it sends None.
+
+    Args:
+        tasks (Connection): The connection the worker receives its tasks from.
+        results (Connection): The connection the worker sends its results to.
+        status (RawArray): The index and start time of the case being run, and the number of cases of the shard
+            that passed before it, shared with the parent.
+        preload (Tuple[str, ...]): The modules imported before the first task, so that no task pays for them.
+        target (Optional[Callable]): The function run on each shard, until the parent sends another one.
+    """
+    for module_name in preload:
+        importlib.import_module(module_name)
+
+    while True:
+        try:
+            task = tasks.recv()
+        except EOFError:
+            break
+
+        if task is None:
+            break
+
+        kind, payload = task
+        if kind == "target":
+            target = pickle.loads(payload)
+            continue
+
+        shard = payload
+        try:
+            results.send(("done", target(shard, status=status)))
+        except Exception as e:
+            results.send(("error", str(e)))
+        finally:
+            # Clear the start time before the index, the reverse of the order used by the target
+            status[1] = status[2] = 0.0
+            status[0] = -1.0
+
+
+def _checkpoint(shard: Tuple[int, int], status: RawArray) -> Dict:
+    """
+    Read the progress of a shard from the status of the worker running it.
+
+    Returns:
+        Dict: The first index of the shard, the number of its cases that were completed, and how many of them passed.
+    """
+    start, stop = shard
+    index = int(status[0])
+    cases = index - start if start <= index < stop else 0
+
+    # The passed count is published before the index, so it may already count the case being run
+    return {"start": start, "cases": cases, "passed": min(int(status[2]), cases)}
+
+
+class RunTimeoutError(TimeoutError):
+    """
+    Raised by a pool when a run does not finish before its deadline.
+
+    The results of the shards that were done have already been yielded. `checkpoints` holds the progress of the
+    shards that were cut short, as read by `_checkpoint`, since the cases they ran would be lost otherwise.
+    """
+
+    def __init__(self, message: str, checkpoints: Optional[List[Dict]] = None) -> None:
+        super().__init__(message)
+        self.checkpoints: List[Dict] = checkpoints or []
+
+
+def _exit_description(exitcode: Optional[int]) -> str:
+    """
+    Describe how a worker process exited, from its exit code.
+
+    Example:
+        >>> _exit_description(-11)
+        'killed by signal SIGSEGV'
+    """
+    if exitcode is None:
+        return "exit code unknown"
+
+    if exitcode < 0:
+        try:
+            name = signal.Signals(-exitcode).name
+        except ValueError:
+            name = str(-exitcode)
+
+        description = f"killed by signal {name}"
+        if -exitcode == getattr(signal, "SIGKILL", None):
+            description += " (possibly out of memory)"
+        return description
+
+    return f"exited with exit code {exitcode}"
+
+
+class _Worker:
+    """
+    A worker process together with its connections, its shared status and the task it is running.
+    """
+
+    def __init__(self, preload: Tuple[str, ...], target: Optional[Callable] = None) -> None:
+        task_reader, self.tasks = Pipe(duplex=False)
+        self.results, result_writer = Pipe(duplex=False)
+
+        # [index of the case being run, time.monotonic() when it started, cases of the shard passed before it]
+        self.status = RawArray('d', [-1.0, 0.0, 0.0])
+        self.task: Optional[Tuple[int, int]] = None
+        self.target: Optional[Callable] = target
+
+        # A worker that maps a shared TestCaseBatch registers it with the resource tracker of its parent,
+        # instead of one of its own that would free the shared memory when the worker exits
+        if os.name == "posix":
+            resource_tracker.ensure_running()
+
+        self.process = Process(
+            target=_worker_main,
+            args=(task_reader, result_writer, self.status, preload, target),
+            daemon=True
+        )
+        self.process.start()
+
+        # The parent only keeps its own ends of the pipes
+        task_reader.close()
+        result_writer.close()
+
+    def kill(self) -> None:
+        """
+        Kill the worker process and release its connections.
+        """
+        self.process.kill()
+        self.process.join()
+        self.tasks.close()
+        self.results.close()
+
+
+class WorkerPool:
+    """
+    A pool of supervised worker processes that run shards of test cases.
+
+    Every worker records the index and start time of the case it is running in shared memory,
+    so the parent can enforce a deadline for each case. A worker that overruns it is killed,
+    the case is recorded as a timeout and a new worker resumes from the next case.
+
+    The workers outlive a single run, so a pool can be reused by any number of runs until it is closed.
+    """
+
+    def __init__(
+            self,
+            processes: int,
+            case_timeout: Optional[float] = None,
+            preload: Iterable[str] = ()
+    ) -> None:
+        """
+        Start the worker processes.
+
+        Args:
+            processes (int): The number of worker processes.
+            case_timeout (Optional[float]): The maximum time (in seconds) a single case may take,
+                or None to disable the per-case deadline.
+            preload (Iterable[str]): The modules every worker imports as soon as it starts.
+        """
+        self.case_timeout: Optional[float] = case_timeout
+        self.preload: Tuple[str, ...] = tuple(preload)
+        self.workers: List[_Worker] = [_Worker(self.preload) for _ in range(processes)]
+
+    def run(
+            self,
+            target: Callable,
+            shards: Iterable[Tuple[int, int]],
+            deadline: float,
+            timeout_result: Callable,
+            cancel: Optional[threading.Event] = None,
+            crash_result: Optional[Callable] = None
+    ) -> Iterator[Dict]:
+        """
+        Run every shard on the workers and yield the result of each one as soon as it is available.
+
+        Args:
+            target (Callable): The function run by the workers, called as target((start, stop), status=status).
+                It publishes the progress of the shard in status, see `_worker_main`.
+            shards (Iterable[Tuple[int, int]]): The range of case indices of each shard. It is consumed lazily,
+                one shard whenever a worker is idle, so it may describe any number of cases.
+            deadline (float): The time.monotonic() value at which the whole run times out.
+            timeout_result (Callable): Builds the result of a case that overran the per-case deadline,
+                called as timeout_result(index).
+            cancel (Optional[threading.Event]): Cancels the run when set, e.g. from another thread.
+            crash_result (Optional[Callable]): Builds the result of a case during which the worker died, called as
+                crash_result(index, description), or None to raise a RuntimeError instead.
+
+        Yields:
+            Dict: The result of a shard, or of a single case that timed out or crashed its worker.
+
+        Raises:
+            RunTimeoutError: If the run is not finished by the deadline, with the progress of the busy workers.
+            CancelledError: If the run is cancelled. The busy workers are killed within a poll interval.
+            RuntimeError: If a worker exits unexpectedly and no crash_result is given.
+            Exception: If an error occurs while running the test cases.
+
+        Note:
+            A worker can die in the middle of a case in ways no exception handler sees: a segfault in a C extension,
+            os._exit, or the kernel killing it when the machine runs out of memory. The death of a busy worker is
+            noticed as soon as its process exits, even if it left its connection open, and is handled like a case
+            timeout: the case is yielded as a crash, with the exit code or the signal of the worker, a new worker
+            resumes from the next case, and the run goes on.
+        """
+        shards = iter(shards)
+
+        # Shards put back after a timeout, handed out before the ones not taken from the iterator yet
+        pending = deque()
+
+        # Replace the workers that died or were killed since the last run
+        for position, worker in enumerate(self.workers):
+            if not worker.process.is_alive():
+                self.__replace(position)
+
+        self.__set_target(target)
+
+        # Poll often enough to notice a case overrunning its deadline
+        poll_interval = 0.05 if self.case_timeout is None else min(0.05, self.case_timeout / 4)
+
+        try:
+            while True:
+                for worker in self.workers:
+                    if worker.task is None:
+                        worker.task = pending.popleft() if pending else next(shards, None)
+                        if worker.task is not None:
+                            worker.tasks.send(("shard", worker.task))
+
+                if all(worker.task is None for worker in self.workers):
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise RunTimeoutError("The run did not finish before the deadline.", [
+                        _checkpoint(worker.task, worker.status) for worker in self.workers if worker.task is not None
+                    ])
+
+                if cancel is not None and cancel.is_set():
+                    raise CancelledError("The run was cancelled.")
+
+                # A worker that died is noticed from its process sentinel, even if a process it started keeps its
+                # end of the connection open
+                busy = {}
+                for worker in self.workers:
+                    if worker.task is not None:
+                        busy[worker.results] = busy[worker.process.sentinel] = worker
+
+                crashed = []
+                for ready in wait(list(busy), timeout=min(poll_interval, remaining)):
+                    worker = busy[ready]
+                    if worker.task is None or worker in crashed:
+                        continue
+
+                    try:
+                        # The result sent by a worker right before it died is still in the connection
+                        if not worker.results.poll():
+                            raise EOFError
+                        kind, payload = worker.results.recv()
+                    except (EOFError, OSError):
+                        crashed.append(worker)
+                        continue
+
+                    worker.task = None
+                    if kind == "error":
+                        raise Exception(payload)
+
+                    yield payload
+
+                for worker in crashed:
+                    yield from self.__handle_crash(worker, pending, crash_result)
+
+                if self.case_timeout is not None:
+                    yield from self.__enforce_case_timeout(pending, timeout_result)
+
+        finally:
+            # Stop the workers of a run that was cut short, they are replaced when the next run starts
+            for worker in self.workers:
+                if worker.task is not None:
+                    worker.kill()
+                    worker.task = None
+
+    def __set_target(self, target: Callable) -> None:
+        """
+        Make every worker run the given target.
+
+        The target is pickled once and sent to the workers that run another one. A target that cannot be
+        pickled, such as a function defined inside another function, is handed to new workers instead,
+        which inherit it when they are started. This only works with the "fork" start method, the default on
+        Linux: the "spawn" start method, the default on macOS and Windows, pickles the target of a new worker too.
+
+        Args:
+            target (Callable): The function run by the workers on each shard.
+
+        Raises:
+            TypeError: If the target cannot be pickled and the workers are not started with "fork".
+        """
+        if all(worker.target is target for worker in self.workers):
+            return
+
+        try:
+            payload = pickle.dumps(target)
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            if get_start_method() != "fork":
+                raise TypeError(
+                    f"The tested function cannot be sent to the worker processes ({e}). Please define it at the "
+                    f"top level of a module, or run the tests with in_process=True."
+                ) from None
+            payload = None
+
+        for position, worker in enumerate(self.workers):
+            if worker.target is target:
+                continue
+
+            if payload is None:
+                self.__replace(position, target)
+            else:
+                worker.tasks.send(("target", payload))
+                worker.target = target
+
+    def __replace(self, position: int, target: Optional[Callable] = None) -> None:
+        """
+        Kill the worker at the given position and start a new one in its place.
+
+        Args:
+            position (int): The position of the worker in the pool.
+            target (Optional[Callable]): The target of the new worker, by default the one of the old worker.
+        """
+        worker = self.workers[position]
+        worker.kill()
+        self.workers[position] = _Worker(self.preload, target or worker.target)
+
+    def __enforce_case_timeout(self, pending: deque, timeout_result: Callable) -> Iterator[Dict]:
+        """
+        Replace every worker whose current case overran the per-case deadline.
+
+        The overrunning case is yielded as a timeout, and the rest of its shard is put back in front of
+        the pending shards so that a new worker resumes from it.
+
+        Args:
+            pending (deque): The shards put back after a timeout, handed to the workers first.
+            timeout_result (Callable): Builds the result of a case that overran the per-case deadline.
+
+        Yields:
+            Dict: The result of each case that timed out.
+        """
+        for position, worker in enumerate(self.workers):
+            if worker.task is None:
+                continue
+
+            # Read the index before the start time: a stale index paired with a fresh start time never overruns
+            index, started_at = int(worker.status[0]), worker.status[1]
+            start, stop = worker.task
+            if index < start or not started_at or time.monotonic() - started_at <= self.case_timeout:
+                continue
+
+            self.__replace(position)
+
+            yield timeout_result(index)
+
+            # Cases run before the timeout are run again, since their results were lost with the worker
+            for shard in ((index + 1, stop), (start, index)):
+                if shard[0] < shard[1]:
+                    pending.appendleft(shard)
+
+    def __handle_crash(self, worker: _Worker, pending: deque, crash_result: Optional[Callable]) -> Iterator[Dict]:
+        """
+        Replace a worker that died while running a shard, and yield the case it died on as a crash.
+
+        The rest of its shard is put back in front of the pending shards, like after a case timeout. A worker that
+        died outside of a case, e.g. before its first case, is blamed on the first case of its shard, so that
+        a run always makes progress.
+
+        Args:
+            worker (_Worker): The worker that died.
+            pending (deque): The shards put back after a timeout or a crash, handed to the workers first.
+            crash_result (Optional[Callable]): Builds the result of the case the worker died on.
+
+        Yields:
+            Dict: The result of the case the worker died on.
+
+        Raises:
+            RuntimeError: If no crash_result is given.
+        """
+        worker.process.join(timeout=1)
+        description = _exit_description(worker.process.exitcode)
+        if crash_result is None:
+            raise RuntimeError(f"Worker exited unexpectedly: {description}.")
+
+        index = int(worker.status[0])
+        start, stop = worker.task
+        if not start <= index < stop:
+            index = start
+
+        self.__replace(self.workers.index(worker))
+
+        yield crash_result(index, description)
+
+        for shard in ((index + 1, stop), (start, index)):
+            if shard[0] < shard[1]:
+                pending.appendleft(shard)
+
+    def close(self) -> None:
+        """
+        Stop every worker process.
+        """
+        for worker in self.workers:
+            if worker.task is None and worker.process.is_alive():
+                try:
+                    worker.tasks.send(None)
+                except OSError:
+                    pass
+                worker.process.join(timeout=1)
+
+            worker.kill()
+
+
+class _Overrun(BaseException):
+    """
+    Raised by the alarm of an InlinePool in the case being run when it overruns a deadline.
+
+    It is not an Exception, so the case cannot swallow it by catching every Exception.
+    """
+
+    def __init__(self, index: Optional[int] = None, checkpoint: Optional[Dict] = None) -> None:
+        super().__init__("deadline overrun")
+        # The index of a case that overran the per-case deadline, or None if the whole run did
+        self.index: Optional[int] = index
+        # The progress of the shard when the whole run overran its deadline
+        self.checkpoint: Optional[Dict] = checkpoint
+
+
+class InlinePool:
+    """
+    A drop-in replacement for WorkerPool that runs the shards in the calling process, one after the other.
+
+    It is meant for callers that cannot start worker processes of their own, such as the workers of another pool.
+    The deadlines are enforced by a SIGALRM timer that interrupts the case being run, which only works in the
+    main thread of the process on Unix. Elsewhere, the deadline of the run is only checked between shards,
+    and the per-case deadline is not enforced.
+    """
+
+    def __init__(self, case_timeout: Optional[float] = None) -> None:
+        """
+        Args:
+            case_timeout (Optional[float]): The maximum time (in seconds) a single case may take,
+                or None to disable the per-case deadline.
+        """
+        self.case_timeout: Optional[float] = case_timeout
+
+    def run(
+            self,
+            target: Callable,
+            shards: Iterable[Tuple[int, int]],
+            deadline: float,
+            timeout_result: Callable,
+            cancel: Optional[threading.Event] = None,
+            crash_result: Optional[Callable] = None
+    ) -> Iterator[Dict]:
+        """
+        Run every shard in the calling process and yield the result of each one, like `WorkerPool.run`.
+
+        A crash of the calling process cannot be recovered from, so crash_result is never called.
+
+        Raises:
+            RunTimeoutError: If the run is not finished by the deadline, with the progress of the shard cut short.
+            CancelledError: If the run is cancelled, which is checked between shards.
+            Exception: If an error occurs while running the test cases.
+        """
+        shards = iter(shards)
+        pending = deque()
+
+        # [index of the case being run, time.monotonic() when it started], as in a worker
+        status = array('d', [-1.0, 0.0, 0.0])
+
+        while True:
+            shard = pending.popleft() if pending else next(shards, None)
+            if shard is None:
+                break
+
+            if time.monotonic() >= deadline:
+                raise RunTimeoutError("The run did not finish before the deadline.")
+
+            if cancel is not None and cancel.is_set():
+                raise CancelledError("The run was cancelled.")
+
+            try:
+                payload = self.__call(target, shard, status, deadline)
+
+            except _Overrun as overrun:
+                if overrun.index is None:
+                    raise RunTimeoutError("The run did not finish before the deadline.", [overrun.checkpoint])
+
+                yield timeout_result(overrun.index)
+
+                # Cases run before the timeout are run again, since their results were lost with the shard
+                start, stop = shard
+                for rest in ((overrun.index + 1, stop), (start, overrun.index)):
+                    if rest[0] < rest[1]:
+                        pending.appendleft(rest)
+                continue
+
+            yield payload
+
+    def __call(self, target: Callable, shard: Tuple[int, int], status: array, deadline: float) -> bytes:
+        """
+        Run the target on a shard, with an alarm checking the deadlines while it runs.
+        """
+        # Windows has no interval timers
+        if not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+            return target(shard, status=status)
+
+        def check_deadlines(signal_number: int, frame: object) -> None:
+            now = time.monotonic()
+            if now >= deadline:
+                raise _Overrun(checkpoint=_checkpoint(shard, status))
+
+            index, started_at = int(status[0]), status[1]
+            if self.case_timeout is not None and index >= shard[0] and started_at \
+                    and now - started_at > self.case_timeout:
+                raise _Overrun(index)
+
+        poll_interval = 0.05 if self.case_timeout is None else min(0.05, self.case_timeout / 4)
+        previous_handler = signal.signal(signal.SIGALRM, check_deadlines)
+        signal.setitimer(signal.ITIMER_REAL, poll_interval, poll_interval)
+        try:
+            return target(shard, status=status)
+
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
+            status[1] = status[2] = 0.0
+            status[0] = -1.0
+
+    def close(self) -> None:
+        """
+        Nothing to stop, since the shards are run by the calling process.
+        """
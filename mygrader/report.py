@@ -0,0 +1,266 @@
+from typing import Any, Dict, List, Optional
+
+from mygrader.histogram import LatencyHistogram
+
+
+class TestReport:
+    """
+    The outcome of a `Tester.run_test` call.
+
+    A report holds the pass/fail counts, the sample of failed cases kept for the summary and the time spent
+    in each phase of the run, so the results can be used without parsing the printed summary.
+
+    The phases are:
+        generation: Generating and copying the parameters of the test cases, in the workers.
+        return_type: Probing the return type of the user function and the solver, in the parent.
+        startup: Starting the worker processes and handing them their first shard, in the parent.
+        user: Running the user function, in the workers.
+        solver: Running the solver, in the workers. For a function with a batch solver, computing the expected
+            outputs of every case in vectorized calls, and running the scalar solver on the sampled cases.
+        comparison: Comparing the outputs and recording the failed cases, in the workers.
+        rendering: Rendering and printing or writing the summary, in the parent.
+
+    Every failed case has a verdict, and `verdicts` counts the failed cases of each one. However many cases fail,
+    a report only keeps the failed cases with the lowest indices (`failed_cases`) and a uniform sample of all of
+    them (`sampled_cases`). The failed cases are grouped by signature (`clusters`, see `failure_signature`), so that
+    a failing run is summarized by the few causes of its failures. The cases where the user function raised an
+    exception have the "runtime_error" verdict, and `errors` groups the exceptions by the line they were raised from.
+
+    The per-case latencies of the user function and the solver are kept in streaming histograms (`latencies`),
+    summarized by `latency` as p50/p95/p99/max, and compared by `slowdown`. When the run has a performance budget,
+    `within_budget` tells whether the slowdown stayed within it. In memory mode, the peak memory of every call
+    is kept in histograms (`memory`), summarized by `memory_usage`, with the cases that used the most memory.
+
+    A run that does not finish within the runtime limit raises a `TestTimeoutError` holding the report of the cases
+    that ran, whose `num_requested` is the number of cases of the run. The cases that ran in the shards cut short
+    are counted in `passed_count` and `failed_count`, but only the failed cases of the finished shards are kept.
+
+    Note:
+        For a function with a batch solver, the latencies of the solver are measured on a sample of one case in
+        `Tester.SOLVER_SAMPLE_INTERVAL`, so their count is lower than the number of cases.
+
+        The phases run by the workers are summed over all the workers, so with several `jobs` they can add up to
+        more than `total_time`. Test cases that exceeded the `case_timeout` have no latency.
+
+    Example:
+        >>> report = tester.run_test(calculate_sum)
+        >>> report.success_rate
+        100.0
+        >>> slowest_phase = max(report.timings, key=report.timings.get)
+    """
+
+    # Tell pytest this is not a test class
+    __test__ = False
+
+    PHASES = ("generation", "return_type", "startup", "user", "solver", "comparison", "rendering")
+
+    def __init__(
+            self,
+            function_name: str,
+            seed: Optional[int],
+            passed_count: int,
+            failed_count: int,
+            failed_cases: List[Dict],
+            total_time: float,
+            timings: Optional[Dict[str, float]] = None,
+            latencies: Optional[Dict[str, LatencyHistogram]] = None,
+            perf_budget: Optional[float] = None,
+            memory: Optional[Dict[str, LatencyHistogram]] = None,
+            memory_cases: Optional[List[Dict]] = None,
+            memory_limit: Optional[int] = None,
+            verdicts: Optional[Dict[str, int]] = None,
+            sampled_cases: Optional[List[Dict]] = None,
+            clusters: Optional[List[Dict]] = None,
+            errors: Optional[List[Dict]] = None,
+            num_requested: Optional[int] = None
+    ) -> None:
+        """
+        Args:
+            function_name (str): The name of the tested function.
+            seed (Optional[int]): The seed of the generated test cases, or None for a batch of other test cases.
+            passed_count (int): The number of passed test cases.
+            failed_count (int): The number of failed test cases.
+            failed_cases (List[Dict]): The failed cases with the lowest indices, at most Tester.MAX_FAILED_CASES.
+            total_time (float): The wall-clock time (in seconds) taken to run the test cases.
+            timings (Optional[Dict[str, float]]): The time (in seconds) spent in each phase.
+            latencies (Optional[Dict[str, LatencyHistogram]]): The latencies of the "user" function and the "solver".
+            perf_budget (Optional[float]): The maximum slowdown allowed, or None if performance is not graded.
+            memory (Optional[Dict[str, LatencyHistogram]]): The peak memory (in bytes) of each call of the "user"
+                function and the "solver", or None if memory was not tracked.
+            memory_cases (Optional[List[Dict]]): The cases with the highest peak memory of the user function.
+            memory_limit (Optional[int]): The maximum peak memory of a call of the user function, or None.
+            verdicts (Optional[Dict[str, int]]): The number of failed cases of each verdict, such as "wrong_output",
+                "timeout", "memory_limit" or "cpu_time_limit".
+            sampled_cases (Optional[List[Dict]]): A uniform sample of the failed cases, at most
+                Tester.MAX_SAMPLED_CASES, in random order, so that its first cases are a uniform sample too.
+            clusters (Optional[List[Dict]]): The signature, the number of failed cases and the first failed case
+                of each signature, from the most frequent to the least.
+            errors (Optional[List[Dict]]): The raise site of the exceptions of the user function, the number of cases
+                that raised one, and the index and traceback of the first of them, from the most frequent to the least.
+            num_requested (Optional[int]): The number of test cases of a run cut short by the runtime limit,
+                or None if every test case ran.
+        """
+        self.function_name: str = function_name
+        self.seed: Optional[int] = seed
+        self.passed_count: int = passed_count
+        self.failed_count: int = failed_count
+        self.failed_cases: List[Dict] = failed_cases
+        self.total_time: float = total_time
+        self.timings: Dict[str, float] = dict.fromkeys(self.PHASES, 0.0)
+        self.timings.update(timings or {})
+        self.latencies: Dict[str, LatencyHistogram] = {"user": LatencyHistogram(), "solver": LatencyHistogram()}
+        self.latencies.update(latencies or {})
+        self.perf_budget: Optional[float] = perf_budget
+        self.memory: Optional[Dict[str, LatencyHistogram]] = memory
+        self.memory_cases: List[Dict] = memory_cases or []
+        self.memory_limit: Optional[int] = memory_limit
+        self.verdicts: Dict[str, int] = verdicts or {}
+        self.sampled_cases: List[Dict] = sampled_cases or []
+        self.clusters: List[Dict] = clusters or []
+        self.errors: List[Dict] = errors or []
+        self.num_requested: Optional[int] = num_requested
+
+    def __repr__(self) -> str:
+        return (
+            f"TestReport(function_name={self.function_name!r}, passed_count={self.passed_count}, "
+            f"failed_count={self.failed_count}, success_rate={self.success_rate:.2f})"
+        )
+
+    @property
+    def num_cases(self) -> int:
+        return self.passed_count + self.failed_count
+
+    @property
+    def complete(self) -> bool:
+        """
+        Whether every test case of the run ran, i.e. the run was not cut short by the runtime limit.
+        """
+        return self.num_requested is None
+
+    @property
+    def success_rate(self) -> float:
+        """
+        The percentage of passed test cases, 0 if no test case ran.
+        """
+        return (self.passed_count / self.num_cases) * 100 if self.num_cases else 0.0
+
+    @property
+    def average_time(self) -> float:
+        """
+        The wall-clock time (in seconds) per test case.
+        """
+        return self.total_time / self.num_cases if self.num_cases else float("nan")
+
+    @property
+    def test_per_second(self) -> float:
+        """
+        The number of test cases run per second of wall-clock time.
+        """
+        return self.num_cases / self.total_time if self.total_time else 0.0
+
+    @property
+    def latency(self) -> Dict[str, Dict[str, float]]:
+        """
+        The count, mean, p50, p95, p99 and max latency (in nanoseconds) of the "user" function and the "solver".
+        """
+        return {name: histogram.summary() for name, histogram in self.latencies.items()}
+
+    @property
+    def slowdown(self) -> float:
+        """
+        How many times longer a call of the user function took than a call of the solver, on average.
+        """
+        solver_mean = self.latencies["solver"].mean
+        return self.latencies["user"].mean / solver_mean if solver_mean else float("nan")
+
+    @property
+    def memory_usage(self) -> Optional[Dict[str, Dict[str, float]]]:
+        """
+        The count, mean, p50, p95, p99 and max peak memory (in bytes) of the "user" function and the "solver",
+        or None if memory was not tracked.
+        """
+        if self.memory is None:
+            return None
+
+        return {name: histogram.summary() for name, histogram in self.memory.items()}
+
+    @property
+    def within_budget(self) -> Optional[bool]:
+        """
+        Whether the slowdown is at most the performance budget, or None if performance is not graded.
+        """
+        if self.perf_budget is None:
+            return None
+
+        return self.slowdown <= self.perf_budget
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the report to a dictionary, e.g. to serialize it as JSON.
+
+        Returns:
+            Dict[str, Any]: The fields of the report, including the derived rates.
+        """
+        return {
+            "function_name": self.function_name,
+            "seed": self.seed,
+            "passed_count": self.passed_count,
+            "failed_count": self.failed_count,
+            "failed_cases": self.failed_cases,
+            "sampled_cases": self.sampled_cases,
+            "clusters": self.clusters,
+            "errors": self.errors,
+            "num_requested": self.num_requested,
+            "verdicts": dict(self.verdicts),
+            "success_rate": self.success_rate,
+            "total_time": self.total_time,
+            "average_time": self.average_time,
+            "test_per_second": self.test_per_second,
+            "timings": dict(self.timings),
+            "latency": self.latency,
+            "slowdown": self.slowdown,
+            "perf_budget": self.perf_budget,
+            "within_budget": self.within_budget,
+            "memory_usage": self.memory_usage,
+            "memory_cases": self.memory_cases,
+            "memory_limit": self.memory_limit
+        }
+
+
+class TestTimeoutError(TimeoutError):
+    """
+    Raised by `Tester.run_test` when the test run does not finish within the runtime limit.
+
+    The cases that ran before the limit are not lost: `report` is the TestReport of the cases that ran, and the
+    message tells how many of them ran, how many passed, and how many cases per second the function handled
+    against how many it needed to finish in time.
+
+    Example:
+        >>> try:
+        ...     tester.run_test(nearest_odd, num_test_cases=1_000_000)
+        ... except TestTimeoutError as e:
+        ...     e.report.num_cases, e.report.success_rate
+        (31000, 100.0)
+
+        The message of this error ends with "It handled 31,000 cases/sec but needed 1,000,000 cases/sec."
+    """
+
+    # Tell pytest this is not a test class
+    __test__ = False
+
+    def __init__(self, report: TestReport, runtime_limit: float) -> None:
+        """
+        Args:
+            report (TestReport): The report of the cases that ran, with the number of cases of the run.
+            runtime_limit (float): The runtime limit (in seconds) of the run.
+        """
+        self.report: TestReport = report
+        self.runtime_limit: float = runtime_limit
+
+        num_requested = report.num_requested or report.num_cases
+        super().__init__(
+            f"Function {report.function_name} timed out after {runtime_limit} seconds: "
+            f"{report.num_cases:,} of {num_requested:,} test cases ran ({report.num_cases / num_requested:.1%}), "
+            f"{report.success_rate:.2f}% passed. It handled {report.test_per_second:,.0f} cases/sec "
+            f"but needed {num_requested / runtime_limit:,.0f} cases/sec."
+        )
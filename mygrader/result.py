@@ -0,0 +1,235 @@
+import heapq
+import marshal
+import pickle
+import struct
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from mygrader.failures import merge_clusters, merge_errors
+from mygrader.histogram import LatencyHistogram
+
+# start, stop, passed_count, failed_count, number of timings, size of the histograms, encoding of the cases
+_HEADER = struct.Struct("<qqqqHIB")
+
+_MARSHAL = 0
+_PICKLE = 1
+
+# The fields of a case that hold values of the user function or the test case, which may not be picklable
+_CASE_VALUES = ("input", "expected", "result")
+
+
+def _picklable(value: object) -> object:
+    """
+    Get a value if it can be pickled, or its repr otherwise.
+    """
+    try:
+        pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return repr(value)
+
+    return value
+
+
+def _picklable_case(case: Dict) -> Dict:
+    """
+    Copy a case with the values that cannot be pickled, such as a generator returned by the user function,
+    replaced by their repr.
+    """
+    return {key: _picklable(value) if key in _CASE_VALUES else value for key, value in case.items()}
+
+
+class ShardResult:
+    """
+    The outcome of a range of test cases, sent from a worker to the parent as compact bytes.
+
+    A result holds exact counters, the number of failed cases of each verdict, an array of timings, latency
+    histograms of the user function and the solver, the first failed cases, a uniform sample of the failed cases
+    with their sample keys, the clusters of failed cases by signature and the exceptions of the user function by
+    raise site (see `FailureStore`), the file its failed cases were spilled to, if any, and, when memory
+    is tracked, histograms of the peak memory of each call and the cases that used the most memory. Results of
+    different shards and workers are merged with `merge`, and only the parent renders them as a summary.
+
+    The encoding is a fixed struct header, the raw bytes of the timings array, the marshalled states of the
+    histograms and the sampled cases, serialized with marshal, or with pickle if they hold values marshal does
+    not support. The values of a case that cannot be pickled either are replaced by their repr.
+    """
+
+    __slots__ = (
+        "start", "stop", "passed_count", "failed_count", "timings", "latencies", "memory", "failed_cases",
+        "memory_cases", "verdicts", "sampled_cases", "spill_path",
+        "clusters", "errors"
+    )
+
+    # The name of each slot of the timings array, in seconds
+    TIMINGS = ("total", "generation", "user", "solver", "comparison")
+
+    # The functions whose per-case latencies and peak memory are recorded
+    LATENCIES = ("user", "solver")
+
+    def __init__(
+            self,
+            start: int = 0,
+            stop: int = 0,
+            passed_count: int = 0,
+            failed_count: int = 0,
+            timings: Optional[array] = None,
+            failed_cases: Optional[List[Dict]] = None,
+            latencies: Optional[Dict[str, LatencyHistogram]] = None,
+            memory: Optional[Dict[str, LatencyHistogram]] = None,
+            memory_cases: Optional[List[Dict]] = None,
+            verdicts: Optional[Dict[str, int]] = None,
+            sampled_cases: Optional[List[Tuple[float, Dict]]] = None,
+            spill_path: Optional[str] = None,
+            clusters: Optional[Dict[str, list]] = None,
+            errors: Optional[Dict[str, list]] = None
+    ) -> None:
+        self.start: int = start
+        self.stop: int = stop
+        self.passed_count: int = passed_count
+        self.failed_count: int = failed_count
+        self.timings: array = timings if timings is not None else array('d', bytes(8 * len(self.TIMINGS)))
+        self.failed_cases: List[Dict] = failed_cases if failed_cases is not None else []
+        self.latencies: Dict[str, LatencyHistogram] = (
+            latencies if latencies is not None else {name: LatencyHistogram() for name in self.LATENCIES}
+        )
+        self.memory: Dict[str, LatencyHistogram] = (
+            memory if memory is not None else {name: LatencyHistogram() for name in self.LATENCIES}
+        )
+        self.memory_cases: List[Dict] = memory_cases if memory_cases is not None else []
+        self.verdicts: Dict[str, int] = verdicts if verdicts is not None else {}
+        self.sampled_cases: List[Tuple[float, Dict]] = sampled_cases if sampled_cases is not None else []
+        self.spill_path: Optional[str] = spill_path
+        self.clusters: Dict[str, list] = clusters if clusters is not None else {}
+        self.errors: Dict[str, list] = errors if errors is not None else {}
+
+    @property
+    def num_cases(self) -> int:
+        return self.passed_count + self.failed_count
+
+    def timing(self, name: str) -> float:
+        """
+        Get a timing by name.
+        """
+        return self.timings[self.TIMINGS.index(name)]
+
+    def encode(self) -> bytes:
+        """
+        Encode the result as bytes.
+
+        Returns:
+            bytes: The encoded result, decoded with `ShardResult.decode`.
+        """
+        cases = (self.failed_cases, self.memory_cases, self.verdicts, self.sampled_cases, self.spill_path,
+                 self.clusters, self.errors)
+        try:
+            encoding, cases = _MARSHAL, marshal.dumps(cases)
+        except ValueError:
+            encoding = _PICKLE
+            try:
+                cases = pickle.dumps(cases, protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception:
+                # The case is still recorded as failed, with the repr of the values that cannot be pickled
+                cases = pickle.dumps(self.__picklable_cases(), protocol=pickle.HIGHEST_PROTOCOL)
+
+        histograms = marshal.dumps((
+            tuple(self.latencies[name].to_state() for name in self.LATENCIES),
+            tuple(self.memory[name].to_state() for name in self.LATENCIES)
+        ))
+
+        header = _HEADER.pack(
+            self.start, self.stop, self.passed_count, self.failed_count, len(self.timings), len(histograms), encoding
+        )
+        return header + self.timings.tobytes() + histograms + cases
+
+    def __picklable_cases(self) -> Tuple:
+        """
+        Get the cases of the result to encode, with the values that cannot be pickled replaced by their repr.
+        """
+        return (
+            [_picklable_case(case) for case in self.failed_cases],
+            [_picklable_case(case) for case in self.memory_cases],
+            self.verdicts,
+            [(key, _picklable_case(case)) for key, case in self.sampled_cases],
+            self.spill_path,
+            {signature: [count, _picklable_case(case)] for signature, (count, case) in self.clusters.items()},
+            self.errors
+        )
+
+    @classmethod
+    def decode(cls, data: bytes) -> "ShardResult":
+        """
+        Decode a result encoded with `encode`.
+
+        Args:
+            data (bytes): The encoded result.
+
+        Returns:
+            ShardResult: The decoded result.
+        """
+        start, stop, passed_count, failed_count, num_timings, histograms_size, encoding = _HEADER.unpack_from(data)
+
+        offset = _HEADER.size + 8 * num_timings
+        timings = array('d')
+        timings.frombytes(data[_HEADER.size:offset])
+
+        latency_states, memory_states = marshal.loads(data[offset:offset + histograms_size])
+        latencies = {name: LatencyHistogram.from_state(state) for name, state in zip(cls.LATENCIES, latency_states)}
+        memory = {name: LatencyHistogram.from_state(state) for name, state in zip(cls.LATENCIES, memory_states)}
+        offset += histograms_size
+
+        loads = marshal.loads if encoding == _MARSHAL else pickle.loads
+        failed_cases, memory_cases, verdicts, sampled_cases, spill_path, clusters, errors = loads(data[offset:])
+        return cls(
+            start, stop, passed_count, failed_count, timings, failed_cases, latencies, memory, memory_cases, verdicts,
+            sampled_cases, spill_path, clusters, errors
+        )
+
+    def merge(
+            self,
+            other: "ShardResult",
+            max_failed_cases: int,
+            max_memory_cases: int = 0,
+            max_sampled_cases: int = 0,
+            max_clusters: int = 50
+    ) -> None:
+        """
+        Add the counters, timings, histograms and sampled cases of another result to this one.
+
+        Args:
+            other (ShardResult): The result to merge into this one.
+            max_failed_cases (int): The number of failed cases kept, those with the lowest indices.
+            max_memory_cases (int): The number of cases kept that used the most memory.
+            max_sampled_cases (int): The size of the uniform sample of the failed cases.
+            max_clusters (int): The number of clusters of failed cases kept.
+        """
+        self.start = min(self.start, other.start) if self.num_cases else other.start
+        self.stop = max(self.stop, other.stop)
+        self.passed_count += other.passed_count
+        self.failed_count += other.failed_count
+
+        for verdict, count in other.verdicts.items():
+            self.verdicts[verdict] = self.verdicts.get(verdict, 0) + count
+
+        for slot, value in enumerate(other.timings):
+            self.timings[slot] += value
+
+        for name, histogram in other.latencies.items():
+            self.latencies[name].merge(histogram)
+
+        for name, histogram in other.memory.items():
+            self.memory[name].merge(histogram)
+
+        failed_cases = self.failed_cases + other.failed_cases
+        failed_cases.sort(key=lambda case: case["index"])
+        self.failed_cases = failed_cases[:max_failed_cases]
+
+        self.sampled_cases = heapq.nsmallest(
+            max_sampled_cases, self.sampled_cases + other.sampled_cases, key=lambda entry: (entry[0], entry[1]["index"])
+        )
+
+        self.clusters = merge_clusters(self.clusters, other.clusters, max_clusters)
+        self.errors = merge_errors(self.errors, other.errors)
+
+        memory_cases = self.memory_cases + other.memory_cases
+        memory_cases.sort(key=lambda case: (-case["user_peak"], case["index"]))
+        self.memory_cases = memory_cases[:max_memory_cases]
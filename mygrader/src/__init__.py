@@ -1 +1 @@
-from .y2023 import Generator, Solution
+from .y2023 import BatchSolution, Generator, Solution
@@ -0,0 +1,179 @@
+from functools import lru_cache
+from typing import List, Sequence, Union
+
+import numpy as np
+
+_MASK = (1 << 64) - 1
+_GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+
+
+def _mix(x: int) -> int:
+    """
+    Scramble a 64-bit integer with the SplitMix64 finalizer.
+    """
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK
+    return x ^ (x >> 31)
+
+
+@lru_cache(maxsize=64)
+def _seed_key(seed: int) -> int:
+    """
+    Scramble a seed once, since every case of a run uses the same one.
+    """
+    return _mix(seed & _MASK)
+
+
+class CaseRandom:
+    """
+    Random numbers for a single test case.
+
+    The numbers drawn for case `index` of a given `seed` only depend on the seed, the index and the order of
+    the draws, so any case can be generated on its own, in any process, without generating the cases before it.
+    Every draw hashes a counter with SplitMix64 instead of advancing a shared state.
+
+    Example:
+        >>> rng = CaseRandom(seed=42, index=7)
+        >>> rng.randint(1, 6) == CaseRandom(seed=42, index=7).randint(1, 6)
+        True
+    """
+
+    __slots__ = ("key", "counter")
+
+    def __init__(self, seed: int, index: int) -> None:
+        self.key: int = _mix(_seed_key(seed) ^ index)
+        self.counter: int = 0
+
+    def getrandbits64(self) -> int:
+        """
+        Draw a random 64-bit integer.
+        """
+        self.counter += 1
+
+        # _mix, inlined since it is called for every draw
+        x = (self.key + self.counter * _GOLDEN_GAMMA) & _MASK
+        x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+        x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK
+        return x ^ (x >> 31)
+
+    def random(self) -> float:
+        """
+        Draw a random float in [0.0, 1.0).
+        """
+        return (self.getrandbits64() >> 11) * (1.0 / (1 << 53))
+
+    def uniform(self, a: float, b: float) -> float:
+        """
+        Draw a random float between a and b, like random.uniform.
+        """
+        return a + (b - a) * self.random()
+
+    def randint(self, a: int, b: int) -> int:
+        """
+        Draw a random integer in [a, b], like random.randint.
+        """
+        span = b - a + 1
+        bits = self.getrandbits64()
+
+        # Ranges wider than 64 bits take a second draw
+        if span > _MASK:
+            bits = (bits << 64) | self.getrandbits64()
+
+        return a + bits % span
+
+    def choices(self, population: Sequence, k: int) -> List:
+        """
+        Draw k elements from the population with replacement, like random.choices.
+        """
+        return [population[self.randint(0, len(population) - 1)] for _ in range(k)]
+
+
+def _mix_array(x: np.ndarray) -> np.ndarray:
+    """
+    Scramble an array of 64-bit integers with the SplitMix64 finalizer, like _mix. The products wrap around.
+    """
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+class BulkRandom:
+    """
+    Random numbers for a range of consecutive test cases at once, as NumPy arrays with one value per case.
+
+    Every case keeps its own draw counter, so the n-th draw of a case is the n-th draw of its CaseRandom:
+    a generator that only does arithmetic on its draws generates the same cases with either class, and any case
+    generated in bulk can still be replayed on its own.
+
+    Example:
+        >>> rng = BulkRandom(seed=42, start=0, stop=1000)
+        >>> int(rng.randint(1, 6)[7]) == CaseRandom(seed=42, index=7).randint(1, 6)
+        True
+    """
+
+    __slots__ = ("keys", "counters")
+
+    def __init__(self, seed: int, start: int, stop: int) -> None:
+        indices = np.arange(start, stop, dtype=np.uint64)
+        self.keys: np.ndarray = _mix_array(np.uint64(_seed_key(seed)) ^ indices)
+        self.counters: np.ndarray = np.zeros(len(indices), dtype=np.uint64)
+
+    def getrandbits64(self) -> np.ndarray:
+        """
+        Draw a random 64-bit integer for every case.
+        """
+        self.counters += np.uint64(1)
+        return _mix_array(self.keys + self.counters * np.uint64(_GOLDEN_GAMMA))
+
+    def random(self) -> np.ndarray:
+        """
+        Draw a random float in [0.0, 1.0) for every case.
+        """
+        return (self.getrandbits64() >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+    def uniform(self, a: Union[float, np.ndarray], b: Union[float, np.ndarray]) -> np.ndarray:
+        """
+        Draw a random float between a and b for every case, where a and b may differ between the cases.
+        """
+        return a + (b - a) * self.random()
+
+    def randint(self, a: Union[int, np.ndarray], b: Union[int, np.ndarray]) -> np.ndarray:
+        """
+        Draw a random integer in [a, b] for every case, where a and b may differ between the cases.
+
+        Raises:
+            ValueError: If a bound does not fit in a 64-bit signed integer, e.g. for a range wider than 64 bits,
+                which takes two draws per number.
+        """
+        for bound in (a, b):
+            if isinstance(bound, int) and not -(1 << 63) <= bound < 1 << 63:
+                raise ValueError("Ranges beyond 64-bit integers cannot be drawn in bulk.")
+
+        span = np.asarray(b, dtype=np.int64) - a + 1
+        return (self.getrandbits64() % span.astype(np.uint64)).astype(np.int64) + a
+
+    def uniform_lists(self, lengths: np.ndarray, a: float, b: float) -> List[List[float]]:
+        """
+        Draw a list of random floats between a and b for every case, with one draw per element.
+
+        Args:
+            lengths (np.ndarray): The length of the list of each case.
+            a (float): The lowest value.
+            b (float): The highest value.
+
+        Returns:
+            List[List[float]]: The list of each case, the same as drawing its elements one by one.
+        """
+        lengths = np.asarray(lengths, dtype=np.int64)
+        ends = np.cumsum(lengths)
+
+        # The counters of the elements of a case follow the counter of the case
+        position = np.arange(ends[-1] if len(ends) else 0, dtype=np.int64) - np.repeat(ends - lengths, lengths)
+        counters = np.repeat(self.counters, lengths) + position.astype(np.uint64) + np.uint64(1)
+        self.counters += lengths.astype(np.uint64)
+
+        bits = _mix_array(np.repeat(self.keys, lengths) + counters * np.uint64(_GOLDEN_GAMMA))
+        values = (a + (b - a) * ((bits >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53)))).tolist()
+
+        ends = ends.tolist()
+        return [values[start:end] for start, end in zip([0] + ends[:-1], ends)]
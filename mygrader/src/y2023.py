@@ -1,10 +1,14 @@
 import math
-from random import randint, uniform, choices
+from itertools import chain
+from random import getrandbits
 from string import punctuation, ascii_letters
-from typing import List, Iterable
+from typing import List, Iterable, Iterator, Optional, Sequence, Tuple
 
+import numpy as np
 from faker import Faker
 
+from .case_random import BulkRandom, CaseRandom
+
 
 class Helper:
 
@@ -45,218 +49,498 @@ class Helper:
 
 
 class Generator(Helper):
+    """
+    Generate the test cases of every function of the Solution class.
+
+    Case `index` of a given seed is always the same and is generated on its own, in O(1), by the `<name>_case`
+    method of the function, so a worker can generate its own share of a run, and a failing case can be
+    replayed from its seed and index alone with `Generator.case`.
+
+    Numeric cases are also generated in bulk, as one NumPy array per parameter (see `columns`), which gives
+    the same cases as generating them one by one.
+    """
+
+    # Functions whose cases are the integers 0 to 100 instead of random inputs
+    RANGE_CASES = ("pi", "corner_frame")
+
+    # Functions whose `<name>_case` draws a fixed number of numbers and only does arithmetic on them,
+    # so that it generates a whole range of cases at once when it is given a BulkRandom and an array of indices
+    BULK_CASES = (
+        "calculate_sum", "calculate_new_price", "calculate_triangle_area", "find_intersection",
+        "find_r_from_surface_area", "sphere_volume", "kth_digit", "nearest_odd", "octagon_area", "set_kth_digit",
+        "life_path", "base_b", "gcd", "pi", "reverse_digits", "corner_frame",
+    )
+
+    # The number of cases iter_cases generates at once in bulk
+    BULK_CHUNK_SIZE = 4096
+
+    # The input sizes at which Tester.measure_complexity times each function, built by `<name>_sized_case`
+    COMPLEXITY_SIZES = {
+        "left_max": tuple(2 ** k for k in range(4, 17)),
+        "median_of_median": tuple(2 ** k for k in range(4, 17)),
+        "medal_allocation": tuple(2 ** k for k in range(4, 13)),
+        # The number of sequences grows as C(2n, n), so the lanes only grow one bus at a time
+        "arrival_sequences": tuple(range(1, 10)),
+        "corner_frame": tuple(2 ** k for k in range(3, 10)),
+    }
+
+    _faker = None
 
     @classmethod
-    def calculate_sum_test_cases(cls, num_test_cases: int) -> List:
-        test_cases = []
-        for _ in range(num_test_cases):
-            x = randint(1, 10 ** 9)  # Generate random x value
-            y = randint(x, 10 ** 9)  # Generate random y value
-            test_cases.append((x, y))
-        return test_cases
+    def case(cls, func_name: str, seed: int, index: int) -> tuple:
+        """
+        Generate a single test case.
+
+        Args:
+            func_name (str): The name of the function the test case is for.
+            seed (int): The seed of the run.
+            index (int): The index of the test case in the run.
+
+        Returns:
+            tuple: The parameters of the test case.
+
+        Raises:
+            AttributeError: If there is no generator for the function.
+            IndexError: If the function has no test case at this index.
+
+        Example:
+            >>> Generator.case("kth_digit", seed=42, index=7) == Generator.kth_digit_test_cases(8, seed=42)[7]
+            True
+        """
+        build = getattr(cls, f"{func_name}_case")
+
+        if index < 0 or (func_name in cls.RANGE_CASES and index > 100):
+            raise IndexError(f"No test case {index} for {func_name}")
+
+        return build(CaseRandom(seed, index), index)
 
     @classmethod
-    def calculate_new_price_test_cases(cls, num_test_cases: int) -> List:
-        test_cases = []
-        for _ in range(num_test_cases):
-            old_price = uniform(0.0, 1000.0)  # Generate random old price between 0 and 1000
-            test_cases.append((old_price,))
-        return test_cases
+    def iter_cases(cls, func_name: str, seed: int, start: int, stop: int) -> Iterator[tuple]:
+        """
+        Lazily generate the test cases with indices in [start, stop).
+
+        Only one test case exists at a time, so any number of cases can be run in constant memory.
+
+        Args:
+            func_name (str): The name of the function the test cases are for.
+            seed (int): The seed of the run.
+            start (int): The index of the first test case.
+            stop (int): The index after the last test case.
+
+        Yields:
+            tuple: The parameters of each test case, the same as `case(func_name, seed, index)`.
+        """
+        if func_name in cls.RANGE_CASES:
+            stop = min(stop, 101)
+
+        start = max(start, 0)
+        if cls.has_bulk(func_name):
+            # A chunk of cases at a time, so that memory stays bounded
+            for chunk_start in range(start, stop, cls.BULK_CHUNK_SIZE):
+                yield from cls.to_cases(cls.columns(func_name, seed, chunk_start, min(chunk_start + cls.BULK_CHUNK_SIZE, stop)))
+            return
+
+        build = getattr(cls, f"{func_name}_case")
+        for index in range(start, stop):
+            yield build(CaseRandom(seed, index), index)
+
+    @classmethod
+    def has_bulk(cls, func_name: str) -> bool:
+        """
+        Check whether the cases of a function can be generated in bulk with `columns`.
+        """
+        return func_name in cls.BULK_CASES or hasattr(cls, f"{func_name}_bulk")
 
     @classmethod
-    def calculate_triangle_area_test_cases(cls, num_test_cases: int) -> List:
-        test_cases = []
-        while len(test_cases) < num_test_cases:
-            a = uniform(1.0, 100.0)
-            b = uniform(1.0, 100.0)
+    def columns(cls, func_name: str, seed: int, start: int, stop: int) -> Tuple:
+        """
+        Generate the test cases with indices in [start, stop) in bulk, as one column per parameter.
+
+        Args:
+            func_name (str): The name of the function the test cases are for, one that `has_bulk`.
+            seed (int): The seed of the run.
+            start (int): The index of the first test case.
+            stop (int): The index after the last test case.
 
-            # Ensure that the sum of a and b is greater than c
-            c_min = abs(a - b) + 0.0001  # Add a small epsilon to avoid floating point precision issues
-            c_max = a + b - 0.0001  # Subtract a small epsilon to avoid floating point precision issues
+        Returns:
+            Tuple: The value of a parameter in every case, as a NumPy array, or as a list of lists for the
+                parameters that are lists. Together they hold the same cases as `iter_cases`.
+
+        Raises:
+            AttributeError: If the cases of the function cannot be generated in bulk.
 
-            c = uniform(c_min, c_max)
-            test_cases.append((a, b, c))
+        Example:
+            >>> x, y = Generator.columns("calculate_sum", seed=42, start=0, stop=1_000_000)
+            >>> Generator.to_cases((x[:3], y[:3])) == Generator.calculate_sum_test_cases(3, seed=42)
+            True
+        """
+        if func_name in cls.RANGE_CASES:
+            stop = min(stop, 101)
 
-        return test_cases
+        start = max(start, 0)
+        stop = max(start, stop)
+
+        if func_name in cls.BULK_CASES:
+            build = getattr(cls, f"{func_name}_case")
+        else:
+            build = getattr(cls, f"{func_name}_bulk")
+
+        return build(BulkRandom(seed, start, stop), np.arange(start, stop, dtype=np.int64))
+
+    @staticmethod
+    def to_cases(columns: Tuple) -> List[tuple]:
+        """
+        Turn columns returned by `columns` into the tuple of parameters of each case, with Python values.
+        """
+        return list(zip(*(column.tolist() if isinstance(column, np.ndarray) else column for column in columns)))
 
     @classmethod
-    def display_time_test_cases(cls, num_test_cases: int) -> List:
-        test_cases = []
-        for _ in range(num_test_cases):
-            test_cases.append((randint(1, 10 ** 20),))
+    def sized_case(cls, func_name: str, seed: int, size: int, index: int) -> tuple:
+        """
+        Generate a test case of a given input size, to measure how the runtime of a function grows.
 
-        return test_cases
+        Args:
+            func_name (str): The name of the function the test case is for, one of COMPLEXITY_SIZES.
+            seed (int): The seed of the measurement.
+            size (int): The input size, e.g. the length of the list or of the lanes, or n.
+            index (int): The index of the test case among those of the same size.
+
+        Returns:
+            tuple: The parameters of the test case.
+
+        Raises:
+            AttributeError: If there is no sized generator for the function.
+        """
+        build = getattr(cls, f"{func_name}_sized_case")
+        return build(CaseRandom(seed, index), size)
+
+    @classmethod
+    def cases(cls, func_name: str, num_test_cases: int, seed: Optional[int] = None) -> List:
+        """
+        Generate the test cases of a run.
+
+        Args:
+            func_name (str): The name of the function the test cases are for.
+            num_test_cases (int): The number of test cases requested.
+            seed (Optional[int]): The seed of the run, or None for a random seed.
+
+        Returns:
+            List: The parameters of each test case.
+        """
+        if seed is None:
+            seed = cls.new_seed()
+
+        return list(cls.iter_cases(func_name, seed, 0, cls.num_cases(func_name, num_test_cases)))
+
+    @classmethod
+    def num_cases(cls, func_name: str, num_test_cases: int) -> int:
+        """
+        Get the number of test cases generated for a run.
+
+        Args:
+            func_name (str): The name of the function the test cases are for.
+            num_test_cases (int): The number of test cases requested.
+
+        Returns:
+            int: The number of test cases, which is capped for the functions in RANGE_CASES.
+        """
+        if func_name in cls.RANGE_CASES:
+            return min(100, num_test_cases) + 1
+
+        return num_test_cases
+
+    @classmethod
+    def new_seed(cls) -> int:
+        """
+        Draw a random seed for a run.
+        """
+        return getrandbits(32)
 
     @classmethod
-    def find_intersection_test_cases(cls, num_test_cases: int) -> List:
+    def faker(cls) -> Faker:
+        """
+        Get the Faker instance of the process, which is created once since it is slow to create.
+        """
+        if cls._faker is None:
+            cls._faker = Faker()
+        return cls._faker
+
+    @classmethod
+    def calculate_sum_case(cls, rng: CaseRandom, index: int) -> tuple:
+        x = rng.randint(1, 10 ** 9)  # Generate random x value
+        y = rng.randint(x, 10 ** 9)  # Generate random y value
+        return x, y
+
+    @classmethod
+    def calculate_sum_test_cases(cls, num_test_cases: int, seed: Optional[int] = None) -> List:
+        return cls.cases("calculate_sum", num_test_cases, seed)
+
+    @classmethod
+    def calculate_new_price_case(cls, rng: CaseRandom, index: int) -> tuple:
+        old_price = rng.uniform(0.0, 1000.0)  # Generate random old price between 0 and 1000
+        return old_price,
+
+    @classmethod
+    def calculate_new_price_test_cases(cls, num_test_cases: int, seed: Optional[int] = None) -> List:
+        return cls.cases("calculate_new_price", num_test_cases, seed)
+
+    @classmethod
+    def calculate_triangle_area_case(cls, rng: CaseRandom, index: int) -> tuple:
+        a = rng.uniform(1.0, 100.0)
+        b = rng.uniform(1.0, 100.0)
+
+        # Ensure that the sum of a and b is greater than c
+        c_min = abs(a - b) + 0.0001  # Add a small epsilon to avoid floating point precision issues
+        c_max = a + b - 0.0001  # Subtract a small epsilon to avoid floating point precision issues
+
+        c = rng.uniform(c_min, c_max)
+        return a, b, c
+
+    @classmethod
+    def calculate_triangle_area_test_cases(cls, num_test_cases: int, seed: Optional[int] = None) -> List:
+        return cls.cases("calculate_triangle_area", num_test_cases, seed)
+
+    @classmethod
+    def display_time_case(cls, rng: CaseRandom, index: int) -> tuple:
+        return rng.randint(1, 10 ** 20),
+
+    @classmethod
+    def display_time_test_cases(cls, num_test_cases: int, seed: Optional[int] = None) -> List:
+        return cls.cases("display_time", num_test_cases, seed)
+
+    @classmethod
+    def find_intersection_case(cls, rng: CaseRandom, index: int) -> tuple:
+        m1 = rng.uniform(0.0, 1000.0)
+        b1 = rng.uniform(0.0, 1000.0)
+        m2 = rng.uniform(0.0, 1000.0)
+        b2 = rng.uniform(0.0, 1000.0)
+        return m1, b1, m2, b2
+
+    @classmethod
+    def find_intersection_test_cases(cls, num_test_cases: int, seed: Optional[int] = None) -> List:
         """
         Generate a list of tests cases with random parameters.
 
         Args:
             num_test_cases (int): Number of tests cases to generate.
+            seed (Optional[int]): The seed of the run, or None for a random seed.
         """
-        test_cases = []
-        for _ in range(num_test_cases):
-            m1 = uniform(0.0, 1000.0)
-            b1 = uniform(0.0, 1000.0)
-            m2 = uniform(0.0, 1000.0)
-            b2 = uniform(0.0, 1000.0)
-            test_cases.append((m1, b1, m2, b2))
-        return test_cases
+        return cls.cases("find_intersection", num_test_cases, seed)
+
+    @classmethod
+    def find_r_from_surface_area_case(cls, rng: CaseRandom, index: int) -> tuple:
+        surface_area = rng.uniform(0.0, 1000.0)
+        return surface_area,
+
+    @classmethod
+    def find_r_from_surface_area_test_cases(cls, num_test_cases: int, seed: Optional[int] = None) -> List:
+        return cls.cases("find_r_from_surface_area", num_test_cases, seed)
+
+    @classmethod
+    def sphere_volume_case(cls, rng: CaseRandom, index: int) -> tuple:
+        radius = rng.uniform(0.0, 1000.0)
+        return radius,
+
+    @classmethod
+    def sphere_volume_test_cases(cls, num_test_cases: int, seed: Optional[int] = None) -> List:
+        return cls.cases("sphere_volume", num_test_cases, seed)
+
+    @classmethod
+    def kth_digit_case(cls, rng: CaseRandom, index: int) -> tuple:
+        number = rng.randint(0, 10 ** 9)
+        k = rng.randint(0, 9)
+        return number, k
+
+    @classmethod
+    def kth_digit_test_cases(cls, num_test_cases: int, seed: Optional[int] = None) -> List:
+        return cls.cases("kth_digit", num_test_cases, seed)
+
+    @classmethod
+    def nearest_odd_case(cls, rng: CaseRandom, index: int) -> tuple:
+        x = rng.uniform(0.0, 1000.0)
+        return x,
+
+    @classmethod
+    def nearest_odd_test_cases(cls, num_test_cases: int, seed: Optional[int] = None) -> List:
+        return cls.cases("nearest_odd", num_test_cases, seed)
+
+    @classmethod
+    def octagon_area_case(cls, rng: CaseRandom, index: int) -> tuple:
+        side_length = rng.uniform(0.0, 1000.0)
+        return side_length,
+
+    @classmethod
+    def octagon_area_test_cases(cls, num_test_cases: int, seed: Optional[int] = None) -> List:
+        return cls.cases("octagon_area", num_test_cases, seed)
+
+    @classmethod
+    def set_kth_digit_case(cls, rng: CaseRandom, index: int) -> tuple:
+        number = rng.randint(0, 10 ** 9)
+        k = rng.randint(0, 9)
+        value = rng.randint(0, 9)
+        return number, k, value
+
+    @classmethod
+    def set_kth_digit_test_cases(cls, num_test_cases: int, seed: Optional[int] = None) -> List:
+        return cls.cases("set_kth_digit", num_test_cases, seed)
+
+    @classmethod
+    def patterned_message_case(cls, rng: CaseRandom, index: int) -> tuple:
+        message = ''.join(rng.choices(punctuation + ascii_letters, k=rng.randint(1, 10)))
+        pattern = ''.join(rng.choices(['*', ' '], k=rng.randint(1, 100)))
+        return message, pattern
+
+    @classmethod
+    def patterned_message_test_cases(cls, num_test_cases: int, seed: Optional[int] = None) -> list:
+        return cls.cases("patterned_message", num_test_cases, seed)
+
+    @classmethod
+    def life_path_case(cls, rng: CaseRandom, index: int) -> tuple:
+        n = rng.randint(1, 10 ** 9)
+        return n,
 
     @classmethod
-    def find_r_from_surface_area_test_cases(cls, num_test_cases: int) -> List:
-        test_cases = []
-        for _ in range(num_test_cases):
-            surface_area = uniform(0.0, 1000.0)
-            test_cases.append((surface_area,))
-        return test_cases
+    def life_path_test_cases(cls, num_test_cases: int, seed: Optional[int] = None) -> List:
+        return cls.cases("life_path", num_test_cases, seed)
 
     @classmethod
-    def sphere_volume_test_cases(cls, num_test_cases: int) -> List:
-        test_cases = []
-        for _ in range(num_test_cases):
-            radius = uniform(0.0, 1000.0)
-            test_cases.append((radius,))
-        return test_cases
+    def median_of_median_case(cls, rng: CaseRandom, index: int) -> tuple:
+        if index == 0:
+            return [1.0, 2.0, 3.0],
+
+        list_a = [rng.uniform(0.0, 1000.0) for _ in range(rng.randint(1, 100))]
+        return list_a,
 
     @classmethod
-    def kth_digit_test_cases(cls, num_test_cases: int) -> List:
-        test_cases = []
-        for _ in range(num_test_cases):
-            number = randint(0, 10 ** 9)
-            k = randint(0, 9)
-            test_cases.append((number, k))
-        return test_cases
+    def median_of_median_test_cases(cls, num_test_cases: int, seed: Optional[int] = None) -> List:
+        return cls.cases("median_of_median", num_test_cases, seed)
 
     @classmethod
-    def nearest_odd_test_cases(cls, num_test_cases: int) -> List:
-        test_cases = []
-        for _ in range(num_test_cases):
-            x = uniform(0.0, 1000.0)
-            test_cases.append((x,))
-        return test_cases
+    def median_of_median_bulk(cls, rng: BulkRandom, index: np.ndarray) -> tuple:
+        list_a = rng.uniform_lists(rng.randint(1, 100), 0.0, 1000.0)
+        if len(index) and index[0] == 0:
+            list_a[0] = [1.0, 2.0, 3.0]
+        return list_a,
 
     @classmethod
-    def octagon_area_test_cases(cls, num_test_cases: int) -> List:
-        test_cases = []
-        for _ in range(num_test_cases):
-            side_length = uniform(0.0, 1000.0)
-            test_cases.append((side_length,))
-        return test_cases
+    def median_of_median_sized_case(cls, rng: CaseRandom, size: int) -> tuple:
+        return [rng.uniform(0.0, 1000.0) for _ in range(size)],
 
     @classmethod
-    def set_kth_digit_test_cases(cls, num_test_cases: int) -> List:
-        test_cases = []
-        for _ in range(num_test_cases):
-            number = randint(0, 10 ** 9)
-            k = randint(0, 9)
-            value = randint(0, 9)
-            test_cases.append((number, k, value))
-        return test_cases
+    def left_max_case(cls, rng: CaseRandom, index: int) -> tuple:
+        return cls.median_of_median_case(rng, index)
 
     @classmethod
-    def patterned_message_test_cases(cls, num_test_cases: int) -> list:
+    def left_max_bulk(cls, rng: BulkRandom, index: np.ndarray) -> tuple:
+        return cls.median_of_median_bulk(rng, index)
 
-        test_cases = []
-        for _ in range(num_test_cases):
-            message = ''.join(choices(punctuation + ascii_letters, k=randint(1, 10)))
-            pattern = ''.join(choices(['*', ' '], k=randint(1, 100)))
-            test_cases.append((message, pattern))
-        return test_cases
+    @classmethod
+    def left_max_sized_case(cls, rng: CaseRandom, size: int) -> tuple:
+        return cls.median_of_median_sized_case(rng, size)
 
     @classmethod
-    def life_path_test_cases(cls, num_test_cases: int) -> List:
-        test_cases = []
-        for _ in range(num_test_cases):
-            n = randint(1, 10 ** 9)
-            test_cases.append((n,))
-        return test_cases
+    def left_max_test_cases(cls, num_test_cases: int, seed: Optional[int] = None) -> List:
+        return cls.cases("left_max", num_test_cases, seed)
 
     @classmethod
-    def median_of_median_test_cases(cls, num_test_cases: int) -> List:
-        test_cases = [([1.0, 2.0, 3.0],)]
-        for _ in range(num_test_cases - 1):
-            list_a = [uniform(0.0, 1000.0) for _ in range(randint(1, 100))]
-            test_cases.append((list_a,))
-        return test_cases
+    def arrival_sequences_case(cls, rng: CaseRandom, index: int) -> tuple:
+        group1 = tuple(f'R{rng.randint(0, 1000):03d}' for _ in range(rng.randint(1, 10)))
+        group2 = tuple(f'L{rng.randint(0, 1000):03d}' for _ in range(rng.randint(1, 10)))
+        return group1, group2
 
     @classmethod
-    def left_max_test_cases(cls, num_test_cases: int) -> List:
-        return cls.median_of_median_test_cases(num_test_cases)
+    def arrival_sequences_sized_case(cls, rng: CaseRandom, size: int) -> tuple:
+        group1 = tuple(f'R{rng.randint(0, 1000):03d}' for _ in range(size))
+        group2 = tuple(f'L{rng.randint(0, 1000):03d}' for _ in range(size))
+        return group1, group2
 
     @classmethod
-    def arrival_sequences_test_cases(cls, num_test_cases: int) -> List:
-        test_cases = []
-        for _ in range(num_test_cases):
-            group1 = tuple(f'R{randint(0, 1000):03d}' for _ in range(randint(1, 10)))
-            group2 = tuple(f'L{randint(0, 1000):03d}' for _ in range(randint(1, 10)))
-            test_cases.append((group1, group2))
-        return test_cases
+    def arrival_sequences_test_cases(cls, num_test_cases: int, seed: Optional[int] = None) -> List:
+        return cls.cases("arrival_sequences", num_test_cases, seed)
 
     @classmethod
-    def base_b_test_cases(cls, num_test_cases: int) -> list:
-        test_cases = []
-        for _ in range(num_test_cases):
-            number = randint(0, 10 ** 9)
-            b = randint(2, 10)
-            test_cases.append((number, b))
-        return test_cases
+    def base_b_case(cls, rng: CaseRandom, index: int) -> tuple:
+        number = rng.randint(0, 10 ** 9)
+        b = rng.randint(2, 10)
+        return number, b
 
     @classmethod
-    def gcd_test_cases(cls, num_test_cases: int) -> list:
-        test_cases = []
-        for _ in range(num_test_cases):
-            a = randint(-10 ** 9, 10 ** 9)
-            b = randint(-10 ** 9, 10 ** 9)
-            test_cases.append((a, b))
-        return test_cases
+    def base_b_test_cases(cls, num_test_cases: int, seed: Optional[int] = None) -> list:
+        return cls.cases("base_b", num_test_cases, seed)
 
     @classmethod
-    def pi_test_cases(cls, num_test_cases: int) -> list:
+    def gcd_case(cls, rng: CaseRandom, index: int) -> tuple:
+        a = rng.randint(-10 ** 9, 10 ** 9)
+        b = rng.randint(-10 ** 9, 10 ** 9)
+        return a, b
+
+    @classmethod
+    def gcd_test_cases(cls, num_test_cases: int, seed: Optional[int] = None) -> list:
+        return cls.cases("gcd", num_test_cases, seed)
+
+    @classmethod
+    def pi_case(cls, rng: CaseRandom, index: int) -> tuple:
+        return index,
+
+    @classmethod
+    def pi_test_cases(cls, num_test_cases: int, seed: Optional[int] = None) -> list:
         return cls.generate_100range_max_cases(num_test_cases)
 
     @classmethod
-    def reverse_digits_test_cases(cls, num_test_cases: int) -> list:
-        test_cases = []
-        for _ in range(num_test_cases):
-            number = randint(-10 ** 9, 10 ** 9)
-            test_cases.append((number,))
-        return test_cases
+    def reverse_digits_case(cls, rng: CaseRandom, index: int) -> tuple:
+        number = rng.randint(-10 ** 9, 10 ** 9)
+        return number,
 
     @classmethod
-    def is_anagram_test_cases(cls, num_test_cases: int) -> list:
-        test_cases = []
-        fake = Faker()
+    def reverse_digits_test_cases(cls, num_test_cases: int, seed: Optional[int] = None) -> list:
+        return cls.cases("reverse_digits", num_test_cases, seed)
+
+    @classmethod
+    def is_anagram_case(cls, rng: CaseRandom, index: int) -> tuple:
+        fake = cls.faker()
+        fake.seed_instance(rng.getrandbits64())
+
+        word = fake.sentence(nb_words=2, variable_nb_words=True, ext_word_list=None)
+
+        if index % 2 == 1:
+            # Generate a random anagram by shuffling the characters of the word
+            anagram = ''.join(fake.random_choices(word, length=len(word)))
+        else:
+            anagram = ''.join(rng.choices(ascii_letters, k=rng.randint(1, len(word))))
+
+        return word, anagram
 
-        for i in range(num_test_cases):
-            word = fake.sentence(nb_words=2, variable_nb_words=True, ext_word_list=None)
+    @classmethod
+    def is_anagram_test_cases(cls, num_test_cases: int, seed: Optional[int] = None) -> list:
+        return cls.cases("is_anagram", num_test_cases, seed)
 
-            if i % 2 == 1:
-                # Generate a random anagram by shuffling the characters of the word
-                anagram = ''.join(fake.random_choices(word, length=len(word)))
-                if i % 2 == 0:
-                    anagram += anagram[0]
-            else:
-                anagram = ''.join(choices(ascii_letters, k=randint(1, len(word))))
+    @classmethod
+    def corner_frame_case(cls, rng: CaseRandom, index: int) -> tuple:
+        return index,
 
-            test_cases.append((word, anagram))
-        return test_cases
+    @classmethod
+    def corner_frame_sized_case(cls, rng: CaseRandom, size: int) -> tuple:
+        return size,
 
     @classmethod
-    def corner_frame_test_cases(cls, num_test_cases: int) -> list:
+    def corner_frame_test_cases(cls, num_test_cases: int, seed: Optional[int] = None) -> list:
         return cls.generate_100range_max_cases(num_test_cases)
 
     @classmethod
-    def medal_allocation_test_cases(cls, num_test_cases: int) -> list:
-        test_cases = []
-        for _ in range(num_test_cases):
-            lst = [randint(-100, 100) for _ in range(randint(1, 100))]
-            lst.extend([lst[0]] * randint(0, 3))
-            lst.extend([lst[-1]] * randint(0, 3))
-            lst.extend([lst[int(len(lst) / 2)]] * randint(0, 3))
-            test_cases.append((lst,))
-        return test_cases
+    def medal_allocation_case(cls, rng: CaseRandom, index: int) -> tuple:
+        lst = [rng.randint(-100, 100) for _ in range(rng.randint(1, 100))]
+        lst.extend([lst[0]] * rng.randint(0, 3))
+        lst.extend([lst[-1]] * rng.randint(0, 3))
+        lst.extend([lst[int(len(lst) / 2)]] * rng.randint(0, 3))
+        return lst,
+
+    @classmethod
+    def medal_allocation_sized_case(cls, rng: CaseRandom, size: int) -> tuple:
+        return [rng.randint(-100, 100) for _ in range(size)],
+
+    @classmethod
+    def medal_allocation_test_cases(cls, num_test_cases: int, seed: Optional[int] = None) -> list:
+        return cls.cases("medal_allocation", num_test_cases, seed)
 
 
 class Solution(Helper):
@@ -572,3 +856,140 @@ class Solution(Helper):
         else:
             # Three or more gold medalists, no silver or bronze medalist
             return gold, [], []
+
+
+class BatchSolution:
+    """
+    Vectorized counterparts of the scalar Solution methods.
+
+    Each method takes one sequence per parameter of the scalar method, holding that parameter for every test case,
+    and returns the list of the outputs of the scalar method on each case, computed by NumPy in a single call.
+    The arithmetic is the same as the scalar method, operation by operation, so the outputs are the same.
+
+    Note:
+        The powers of floats use np.float_power, which calls the same pow() as the ** of Python floats.
+        The ** of NumPy arrays, and np.power, may use other approximations that differ in the last place.
+    """
+
+    @classmethod
+    def calculate_sum(cls, x: Sequence[int], y: Sequence[int]) -> List[int]:
+        try:
+            x_array = np.asarray(x, dtype=np.int64)
+            y_array = np.asarray(y, dtype=np.int64)
+        except OverflowError:
+            return cls.__scalar("calculate_sum", x, y)
+
+        # x + y and y - x + 1 must fit in an int64, and so must the product truncated to an int
+        if len(x_array) and not (-2 ** 62 < min(x_array.min(), y_array.min())
+                                 and max(x_array.max(), y_array.max()) < 2 ** 62):
+            return cls.__scalar("calculate_sum", x, y)
+
+        total = (x_array + y_array) * ((y_array - x_array + 1) / 2)
+        if len(total) and not np.abs(total).max() < 2.0 ** 63:
+            return cls.__scalar("calculate_sum", x, y)
+
+        return total.astype(np.int64).tolist()
+
+    @classmethod
+    def calculate_triangle_area(cls, a: Sequence[float], b: Sequence[float], c: Sequence[float]) -> List[float]:
+        a = np.asarray(a, dtype=np.float64)
+        b = np.asarray(b, dtype=np.float64)
+        c = np.asarray(c, dtype=np.float64)
+
+        s = (a + b + c) / 2
+        area_squared = s * (s - a) * (s - b) * (s - c)
+        if (area_squared < 0).any():
+            # Like math.sqrt in the scalar method
+            raise ValueError("math domain error")
+        return np.sqrt(area_squared).tolist()
+
+    @classmethod
+    def find_r_from_surface_area(cls, surface_area: Sequence[float]) -> List[float]:
+        surface_area = np.asarray(surface_area, dtype=np.float64)
+        return np.float_power(surface_area / (4 * math.pi), 0.5).tolist()
+
+    @classmethod
+    def sphere_volume(cls, radius: Sequence[float]) -> List[float]:
+        radius = np.asarray(radius, dtype=np.float64)
+        return ((4 / 3) * math.pi * np.float_power(radius, 3)).tolist()
+
+    @classmethod
+    def kth_digit(cls, number: Sequence[int], k: Sequence[int]) -> List[int]:
+        number, k = cls.__digit_arrays(number, k)
+        return (np.abs(number) // 10 ** k % 10).tolist()
+
+    @classmethod
+    def nearest_odd(cls, x: Sequence[float]) -> List[int]:
+        x_array = np.asarray(x, dtype=np.float64)
+
+        # The odd number must fit in an int64, and NaN and infinities raise in math.ceil like in the scalar method
+        if len(x_array) and not np.abs(x_array).max() < 2.0 ** 62:
+            return cls.__scalar("nearest_odd", x)
+
+        return (np.ceil(x_array / 2).astype(np.int64) * 2 - 1).tolist()
+
+    @classmethod
+    def octagon_area(cls, side_length: Sequence[float]) -> List[float]:
+        side_length = np.asarray(side_length, dtype=np.float64)
+        return (np.float_power(side_length, 2) - np.float_power(side_length / 3, 2) * 2).tolist()
+
+    @classmethod
+    def set_kth_digit(cls, number: Sequence[int], k: Sequence[int], value: Sequence[int]) -> List[int]:
+        number, k, value = cls.__digit_arrays(number, k, value)
+
+        coeff = 10 ** k
+        kth = np.abs(number) // coeff % 10 * coeff
+        return (number - kth + value * coeff).tolist()
+
+    @classmethod
+    def __scalar(cls, func_name: str, *columns: Sequence) -> List:
+        """
+        Run the scalar Solution method on every case, for the inputs whose outputs do not fit in NumPy types.
+        """
+        solver = getattr(Solution, func_name)
+        values = [column.tolist() if isinstance(column, np.ndarray) else column for column in columns]
+        return [solver(*params) for params in zip(*values)]
+
+    @classmethod
+    def __digit_arrays(cls, number: Sequence[int], k: Sequence[int], *values: Sequence[int]) -> Tuple[np.ndarray, ...]:
+        """
+        Convert the parameters of kth_digit or set_kth_digit to int64 arrays when their arithmetic cannot overflow,
+        or to arrays of Python ints otherwise.
+
+        10 ** k only fits in an int64 up to k = 18, and the int64 ** of NumPy rejects a negative k, so the cases of
+        a custom batch with a k outside [0, 17], a number of 10^18 or more, or a digit value outside [-9, 9] are
+        computed with the exact arithmetic of Python ints, as in the scalar methods.
+        """
+        columns = [number, k, *values]
+        try:
+            arrays = [np.asarray(column, dtype=np.int64) for column in columns]
+        except OverflowError:
+            arrays = None
+
+        # The bounds are checked on the min and max, since the abs of the smallest int64 overflows
+        if arrays is not None and (not len(arrays[0]) or (
+                -10 ** 18 < arrays[0].min() and arrays[0].max() < 10 ** 18
+                and 0 <= arrays[1].min() and arrays[1].max() <= 17
+                and all(-9 <= array.min() and array.max() <= 9 for array in arrays[2:]))):
+            return tuple(arrays)
+
+        return tuple(np.array([int(item) for item in column], dtype=object) for column in columns)
+
+    @classmethod
+    def left_max(cls, list_a: Sequence[List[float]]) -> List[List[float]]:
+        if not len(list_a):
+            return []
+
+        lengths = np.fromiter(map(len, list_a), dtype=np.int64, count=len(list_a))
+        values = np.fromiter(chain.from_iterable(list_a), dtype=np.float64, count=int(lengths.sum()))
+
+        # The lists are padded to the same length, so the running maximum of every list is a single call
+        width = int(lengths.max())
+        in_list = np.arange(width) < lengths[:, None]
+        padded = np.full((len(list_a), width), -np.inf)
+        padded[in_list] = values
+        running_max = np.maximum.accumulate(padded, axis=1)[in_list].tolist()
+
+        # Converting only the values of the lists, without the padding, is the most expensive step
+        ends = np.cumsum(lengths).tolist()
+        return [running_max[start:end] for start, end in zip([0] + ends[:-1], ends)]
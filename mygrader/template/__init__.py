@@ -1 +1 @@
-from .log_template import more_info, simple
+from .log_template import budget, clusters, complexity, error_traceback, errors, memory, more_info, simple, verdicts
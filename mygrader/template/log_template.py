@@ -3,6 +3,8 @@ simple = """Test Results:
 |  Passed         | {passed_count:-7d}    |
 |  Failed         | {failed_count:-7d}    |
 |  Success Rate   | {success_rate:8.2f}%  |
+|  Seed           | {seed!s:>10} |
+|  Slowdown       | {slowdown:9.2f}x |
 +-----------------+------------+"""
 
 more_info = """
@@ -13,6 +15,7 @@ more_info = """
 Test cases passed: {passed_count}
 Test cases failed: {failed_count}
 Success rate: {success_rate:.2f}%
+Seed: {seed}
 
 ## Execution Time
 
@@ -20,8 +23,48 @@ Average time per tests case: {average_time:.5f} seconds
 Total time taken: {total_time_result:.2f} seconds
 Tests conducted at a rate of: {test_per_second:.2f} tests/second
 
+## Latency
+
+{latency_table}
+Your function took {slowdown:.2f}x the time of the solution
+
 ## Failed Test Cases
 
 {failed_cases_table}
 {more_info}
 """
+
+verdicts = """
+Failed cases by verdict: {verdicts}"""
+
+clusters = """
+
+Failed cases by signature:
+{clusters_table}"""
+
+errors = """
+
+Exceptions by raise site:
+{errors_table}"""
+
+error_traceback = """
+
+Traceback of case {index} ({count} cases):
+```
+{traceback}```"""
+
+budget = """
+Performance: {verdict} ({slowdown:.2f}x the solution, budget {perf_budget:g}x)"""
+
+memory = """
+
+Peak memory per case (limit: {memory_limit}):
+{memory_table}
+Cases that used the most memory:
+{memory_cases_table}"""
+
+complexity = """Complexity of {function_name}:
+{sizes_table}
+User function: {user_growth} (time ~ n^{user_exponent:.2f})
+Solution:      {solver_growth} (time ~ n^{solver_exponent:.2f})
+Scaling ratio: {scaling_ratio:.2f}x{mismatch_info}"""
@@ -1,4 +1,5 @@
 import csv
+import json
 
 
 def write_failed_cases_to_csv(failed_cases, filename="failed_cases.csv"):
@@ -19,3 +20,33 @@ def write_failed_cases_to_csv(failed_cases, filename="failed_cases.csv"):
         for failed_case in failed_cases:
             writer.writerow(
                 {"Input": failed_case["Input"], "Expected": failed_case["Expected"], "Got": failed_case["Got"]})
+
+
+def write_gradebook(grades, filename="gradebook.csv", metadata=None):
+    """
+    Write the grades of a batch of submissions to a CSV or JSON gradebook, depending on the extension of the file.
+
+    Parameters:
+        grades (list): List of dictionaries with the grade of a student on a function, all with the same keys.
+        filename (str, optional): The name of the output file, ending with ".csv" or ".json".
+            Defaults to "gradebook.csv".
+        metadata (dict, optional): How the grades were obtained, such as the year and the seed. Only written to
+            a JSON gradebook, next to the grades.
+
+    Raises:
+        ValueError: If the extension of the file is neither ".csv" nor ".json".
+    """
+    if filename.endswith(".json"):
+        with open(filename, "w") as file:
+            json.dump({**(metadata or {}), "grades": grades}, file, indent=2, default=str)
+
+    elif filename.endswith(".csv"):
+        with open(filename, "w", newline="") as file:
+            fieldnames = list(grades[0]) if grades else []
+            writer = csv.DictWriter(file, fieldnames=fieldnames)
+
+            writer.writeheader()
+            writer.writerows(grades)
+
+    else:
+        raise ValueError(f"Invalid gradebook file: {filename}. Please use a .csv or .json file.")
@@ -33,7 +33,7 @@ setup(
     ],
     entry_points={
         'console_scripts': [
-            'your_script=your_package:main',
+            'mygrader=mygrader.cli:main',
         ],
     },
     extras_require={
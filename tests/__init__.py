@@ -1,3 +1,12 @@
+import os
+import signal
+import sys
+import tempfile
+import time
+
+from mygrader.src import Solution
+
+
 class MockClass:
     @staticmethod
     def calculate_sum(x: int, y: int) -> int:
@@ -33,3 +42,192 @@ class MockClass:
         __import__('time').sleep(1)
 
         return __import__('math').ceil(x / 2) * 2 - 1
+
+    @staticmethod
+    def reverse_digits(number: int) -> int:
+        """
+            Mock test function to test the Tester class
+
+        Raise expect: per-case timeout
+        description: this function never returns for negative numbers
+        """
+        while number < 0:
+            pass
+
+        return int(str(number)[::-1])
+
+
+class DestructiveMockClass:
+    @staticmethod
+    def left_max(list_a: list) -> list:
+        """
+            Mock test function to test the Tester class
+
+        description: this function clears its parameter after computing the right answer
+        """
+        result = Solution.left_max(list_a)
+        list_a.clear()
+        return result
+
+
+class PrintingMockClass:
+    @staticmethod
+    def display_time(ms: int) -> None:
+        """
+            Mock test function to test the Tester class
+
+        description: this function prints its answer like the solution
+        """
+        Solution.display_time(ms)
+
+
+class WrongMockClass:
+    @staticmethod
+    def kth_digit(number: int, k: int) -> int:
+        """
+            Mock test function to test the Tester class
+
+        description: this function is wrong when k is 0
+        """
+        return number // 10 ** k % 10 if k else -1
+
+    @staticmethod
+    def nearest_odd(number: float) -> int:
+        """
+            Mock test function to test the Tester class
+
+        description: this function is wrong from 500 on
+        """
+        return Solution.nearest_odd(number) if number < 500 else 0
+
+    @staticmethod
+    def calculate_sum(x: int, y: int) -> int:
+        """
+            Mock test function to test the Tester class
+
+        description: this function is always wrong
+        """
+        return 0
+
+    @staticmethod
+    def reverse_digits(number: int) -> int:
+        """
+            Mock test function to test the Tester class
+
+        description: this function is off by one for negative numbers
+        """
+        reversed_number = Solution.reverse_digits(number)
+        return reversed_number + 1 if number < 0 else reversed_number
+
+
+class SlowMockClass:
+    @staticmethod
+    def left_max(list_a: list) -> list:
+        """
+            Mock test function to test the Tester class
+
+        description: this function is right but takes quadratic time
+        """
+        return [max(list_a[:i + 1]) for i in range(len(list_a))]
+
+    @staticmethod
+    def calculate_sum(x: int, y: int) -> int:
+        """
+            Mock test function to test the Tester class
+
+        description: this function is right but much slower than the solution
+        """
+        for _ in range(2000):
+            pass
+        return int((x + y) * ((y - x + 1) / 2))
+
+
+class HungryMockClass:
+    @staticmethod
+    def left_max(list_a: list) -> list:
+        """
+            Mock test function to test the Tester class
+
+        description: this function is right but keeps every prefix of its list in memory
+        """
+        prefixes = [list_a[:i + 1] for i in range(len(list_a))]
+        return [max(prefix) for prefix in prefixes]
+
+
+class ResourceMockClass:
+    @staticmethod
+    def left_max(list_a: list) -> list:
+        """
+            Mock test function to test the Tester class
+
+        description: depending on the length of its list, this function allocates 8 GiB, writes a large file,
+        opens many files or never returns
+        """
+        if len(list_a) % 5 == 0:
+            bytearray(1 << 33)
+        elif len(list_a) % 5 == 2:
+            with tempfile.TemporaryFile() as file:
+                file.write(b"x" * 200_000)
+        elif len(list_a) % 5 == 3:
+            files = [open(os.devnull) for _ in range(100)]
+            files.clear()
+        elif len(list_a) % 5 == 4:
+            while True:
+                try:
+                    pass
+                except Exception:
+                    pass
+        return Solution.left_max(list_a)
+
+
+class RaisingMockClass:
+    @staticmethod
+    def nearest_odd(number: float) -> int:
+        """
+            Mock test function to test the Tester class
+
+        description: this function divides by zero below 100 and exits below 200
+        """
+        if number < 100:
+            return int(number) // 0
+        if number < 200:
+            sys.exit(1)
+        return Solution.nearest_odd(number)
+
+
+class CrashingMockClass:
+    @staticmethod
+    def nearest_odd(number: float) -> int:
+        """
+            Mock test function to test the Tester class
+
+        description: this function kills its process below 10 and exits it below 20
+        """
+        if number < 10:
+            os.kill(os.getpid(), signal.SIGKILL)
+        if number < 20:
+            os._exit(3)
+        return Solution.nearest_odd(number)
+
+
+class SleepyMockClass:
+    @staticmethod
+    def nearest_odd(number: float) -> int:
+        """
+            Mock test function to test the Tester class
+
+        description: this function is right but sleeps for a millisecond on every call
+        """
+        time.sleep(0.001)
+        return Solution.nearest_odd(number)
+
+
+class LazyMockClass:
+    @staticmethod
+    def left_max(list_a: list) -> list:
+        """
+            Mock test function to test the Tester class
+
+        description: this function returns a generator, which cannot be sent to the parent process
+        """
+        return (value for value in Solution.left_max(list_a))
@@ -1,10 +1,41 @@
+import asyncio
 import contextlib
+import csv
+import gzip
 import io
+import json
+import multiprocessing
+import os
+import pickle
+import re
+import sys
+import tempfile
+from copy import deepcopy
 
 import pytest
 
-from mygrader import Tester
-from tests import MockClass
+from mygrader import Comparator, ResourceLimits, TestCaseBatch, TestReport, TestTimeoutError, Tester
+from mygrader.cli import main
+from mygrader.capture import BatchCapture
+from mygrader.complexity import fit_growth
+from mygrader.copying import copy_plan
+from mygrader.failures import merge_clusters, sample_key
+from mygrader.histogram import LatencyHistogram
+from mygrader.result import ShardResult
+from mygrader.src import BatchSolution, Generator, Solution
+from tests import (
+    MockClass,
+    CrashingMockClass,
+    DestructiveMockClass,
+    HungryMockClass,
+    LazyMockClass,
+    PrintingMockClass,
+    RaisingMockClass,
+    ResourceMockClass,
+    SleepyMockClass,
+    SlowMockClass,
+    WrongMockClass,
+)
 
 
 class TestMyGrader:
@@ -14,6 +45,11 @@ class TestMyGrader:
         modules = [
             'mygrader', 'mygrader.printer', 'mygrader.template', 'mygrader.writer',
             'mygrader.template.log_template', 'mygrader.src', 'mygrader.src.y2023',
+            'mygrader.src.case_random', 'mygrader.pool', 'mygrader.copying', 'mygrader.capture',
+            'mygrader.result', 'mygrader.report', 'mygrader.histogram',
+            'mygrader.complexity', 'mygrader.memory',
+            'mygrader.limits', 'mygrader.cli', 'mygrader.comparator', 'mygrader.batch',
+            'mygrader.failures',
         ]
         for module_name in modules:
             assert __import__(module_name)
@@ -43,6 +79,52 @@ class TestMyGrader:
                 tester.run_test(MockClass.calculate_sum, num_test_cases=10 ** num_test_cases)
             assert buffer.getvalue() != ""
 
+    # Test running a test sharded across several worker processes
+    def test_run_test_with_jobs(self):
+        tester = Tester(2023, debug=True, jobs=2)
+        buffer = io.StringIO()
+        with contextlib.redirect_stdout(buffer):
+            tester.run_test(MockClass.calculate_sum, num_test_cases=1000)
+        assert "100.00%" in buffer.getvalue()
+
+    # Test running several tests on the same persistent worker processes
+    def test_run_test_with_persistent_workers(self):
+        buffer = io.StringIO()
+        with Tester(2023, debug=True, jobs=2, persistent_workers=True) as tester:
+            with contextlib.redirect_stdout(buffer):
+                tester.run_test(MockClass.calculate_sum)
+                pids = [worker.process.pid for worker in tester.pool.workers]
+                tester.run_test(MockClass.calculate_sum)
+            assert [worker.process.pid for worker in tester.pool.workers] == pids
+        assert tester.pool is None
+        assert buffer.getvalue().count("100.00%") == 2
+
+    # Test running a test on a function that cannot be pickled
+    @pytest.mark.skipif(multiprocessing.get_start_method() != "fork", reason="Requires the fork start method")
+    def test_run_test_with_local_function(self):
+        def calculate_sum(x: int, y: int) -> int:
+            return int((x + y) * ((y - x + 1) / 2))
+
+        buffer = io.StringIO()
+        with Tester(2023, debug=True, persistent_workers=True) as tester:
+            with contextlib.redirect_stdout(buffer):
+                tester.run_test(calculate_sum)
+        assert "100.00%" in buffer.getvalue()
+
+    # Test rejecting a function that cannot be pickled when the workers are not forked
+    def test_run_test_with_local_function_without_fork(self, monkeypatch):
+        def calculate_sum(x: int, y: int) -> int:
+            return int((x + y) * ((y - x + 1) / 2))
+
+        monkeypatch.setattr("mygrader.pool.get_start_method", lambda: "spawn")
+        with pytest.raises(TypeError, match="top level of a module"):
+            Tester(2023, log_option="none").run_test(calculate_sum)
+
+    # Test creating a Tester with an invalid number of jobs
+    def test_create_tester_with_invalid_jobs(self):
+        with pytest.raises(ValueError):
+            Tester(2023, jobs=0)
+
     # Test running a test with a runtime limit
     def test_run_test_with_runtime_limit(self):
         tester = Tester(2023, runtime_limit=0.01, debug=True)
@@ -50,13 +132,446 @@ class TestMyGrader:
             with contextlib.redirect_stderr(io.StringIO()):
                 tester.run_test(MockClass.nearest_odd, num_test_cases=1_000_000)
 
-    # Test running a test that exceeds the memory limit
-    def test_run_test_with_memory_limit(self):
+    # Test reporting the test cases that ran before the runtime limit
+    @pytest.mark.parametrize("options", [{"jobs": 2}, {"in_process": True}])
+    def test_run_test_timeout_report(self, options):
+        tester = Tester(2023, log_option="none", runtime_limit=2, **options)
+        with pytest.raises(TestTimeoutError) as error:
+            tester.run_test(SleepyMockClass.nearest_odd, num_test_cases=50_000)
+        report = error.value.report
+        assert 0 < report.num_cases < 50_000 and report.num_requested == 50_000 and not report.complete
+        assert report.passed_count == report.num_cases and report.success_rate == 100.0
+        assert "cases/sec but needed 25,000 cases/sec" in str(error.value)
+
+    # Test running a test where some test cases exceed the per-case timeout
+    def test_run_test_with_case_timeout(self):
+        tester = Tester(2023, debug=True, runtime_limit=30, case_timeout=0.1, seed=2023)
+        buffer = io.StringIO()
+        with contextlib.redirect_stdout(buffer):
+            tester.run_test(MockClass.reverse_digits, num_test_cases=20)
+        passed, failed = map(int, re.findall(r"(?:Passed|Failed)\s*\|\s*(\d+)", buffer.getvalue()))
+        assert passed + failed == 20
+        assert failed > 0
+
+    # Test generating the same test cases from the same seed
+    def test_generate_seeded_test_cases(self):
+        test_cases = Generator.medal_allocation_test_cases(50, seed=2023)
+        assert test_cases == Generator.medal_allocation_test_cases(50, seed=2023)
+        assert test_cases != Generator.medal_allocation_test_cases(50, seed=2024)
+        assert all(Generator.case("medal_allocation", 2023, i) == case for i, case in enumerate(test_cases))
+
+    # Test running a test with a fixed seed
+    def test_run_test_with_seed(self):
+        tester = Tester(2023, debug=True, seed=2023)
+        buffer = io.StringIO()
+        with contextlib.redirect_stdout(buffer):
+            tester.run_test(MockClass.calculate_sum)
+        assert "2023" in buffer.getvalue()
+
+    # Test choosing how the parameters of the test cases are copied
+    def test_copy_plan(self):
+        assert copy_plan(Generator.calculate_sum_test_cases(5)) is None
+        assert copy_plan(Generator.arrival_sequences_test_cases(5)) is None
+        assert copy_plan(Generator.left_max_test_cases(5)) == (list,)
+        assert copy_plan([([[1, 2]], "a")]) == (deepcopy, None)
+
+    # Test running a test on a function that changes its parameters
+    def test_run_test_with_destructive_function(self):
         tester = Tester(2023, debug=True)
-        with pytest.raises(MemoryError):
+        buffer = io.StringIO()
+        with contextlib.redirect_stdout(buffer):
+            tester.run_test(DestructiveMockClass.left_max)
+        assert "100.00%" in buffer.getvalue()
+
+    # Test capturing the printed output of several calls with a single redirection
+    def test_batch_capture(self):
+        with BatchCapture(capture=True) as capture:
+            assert capture.call(print, "Hello") == "Hello\n"
+            assert capture.call(print, "world!") == "world!\n"
+            capture.clear()
+            assert capture.call(print, "again") == "again\n"
+
+        buffer = io.StringIO()
+        with contextlib.redirect_stdout(buffer):
+            with BatchCapture(capture=False) as capture:
+                assert capture.call(lambda: print("ignored") or 42) == 42
+        assert buffer.getvalue() == ""
+
+    # Test running a test on a function that prints its answer
+    def test_run_test_with_printing_function(self):
+        tester = Tester(2023, debug=True)
+        buffer = io.StringIO()
+        with contextlib.redirect_stdout(buffer):
+            tester.run_test(PrintingMockClass.display_time)
+        assert "100.00%" in buffer.getvalue()
+
+    # Test running a test with more test cases than fit in memory at once
+    def test_run_test_with_huge_num_test_cases(self):
+        tester = Tester(2023, debug=True, runtime_limit=0.5)
+        with pytest.raises(TimeoutError):
             with contextlib.redirect_stderr(io.StringIO()):
                 tester.run_test(MockClass.calculate_sum, num_test_cases=100_000_000)
 
+    # Test the report returned by a run
+    def test_run_test_report(self):
+        tester = Tester(2023, debug=True, seed=2023)
+        with contextlib.redirect_stdout(io.StringIO()):
+            report = tester.run_test(WrongMockClass.kth_digit, num_test_cases=200)
+        assert isinstance(report, TestReport)
+        assert (report.function_name, report.seed, report.num_cases) == ("kth_digit", 2023, 200)
+        assert 0 < report.failed_count < 200
+        assert report.success_rate == report.passed_count / 2
+        assert len(report.failed_cases) == min(report.failed_count, Tester.MAX_FAILED_CASES)
+        assert set(report.timings) == set(TestReport.PHASES)
+        assert all(report.timings[phase] > 0 for phase in ("generation", "user", "solver", "comparison"))
+        assert report.to_dict()["timings"] == report.timings
+        # The batch solver of kth_digit computes every expected output, the scalar solver only runs on a sample
+        assert report.latency["user"]["count"] == 200
+        assert report.latency["solver"]["count"] == len(range(0, 200, Tester.SOLVER_SAMPLE_INTERVAL))
+        assert report.slowdown > 0
+
+    # Test estimating percentiles with a latency histogram
+    def test_latency_histogram(self):
+        first, second = LatencyHistogram(), LatencyHistogram()
+        for ns in range(1, 100_001):
+            (first if ns % 2 else second).add(ns)
+        first.merge(second)
+
+        summary = first.summary()
+        assert (summary["count"], summary["mean"], summary["max"]) == (100_000, 50_000.5, 100_000)
+        for percent in LatencyHistogram.PERCENTILES:
+            exact = percent * 1000
+            assert exact <= summary[f"p{percent}"] <= exact * 1.0625
+        assert len(first.counts) < 300
+
+    # Test grading performance relative to the solution
+    def test_run_test_with_perf_budget(self):
+        tester = Tester(2023, debug=True, runtime_limit=10, perf_budget=5)
+        with contextlib.redirect_stdout(io.StringIO()) as buffer:
+            slow_report = tester.run_test(SlowMockClass.calculate_sum, num_test_cases=200)
+            report = tester.run_test(MockClass.calculate_sum, num_test_cases=200)
+        assert slow_report.slowdown > 5 and slow_report.within_budget is False
+        assert report.within_budget is True
+        assert "Over budget" in buffer.getvalue() and "Within budget" in buffer.getvalue()
+        with pytest.raises(ValueError):
+            Tester(2023, perf_budget=0)
+
+    # Test measuring and limiting the peak memory of each case
+    def test_run_test_with_memory_limit(self):
+        tester = Tester(2023, debug=True, runtime_limit=10, memory_limit=10_000)
+        with contextlib.redirect_stdout(io.StringIO()) as buffer:
+            report = tester.run_test(HungryMockClass.left_max, num_test_cases=200)
+        assert tester.track_memory
+        assert 0 < report.failed_count < 200
+        assert all(case["result"].endswith(" bytes") for case in report.failed_cases)
+        assert report.memory_usage["user"]["max"] > 10_000 > report.memory_usage["solver"]["max"]
+
+        peaks = [case["user_peak"] for case in report.memory_cases]
+        assert len(peaks) == Tester.MAX_MEMORY_CASES and peaks == sorted(peaks, reverse=True)
+        assert peaks[0] == report.memory_usage["user"]["max"]
+        assert "Cases that used the most memory" in buffer.getvalue()
+
+        with pytest.raises(ValueError):
+            Tester(2023, memory_limit=0)
+
+    # Test reporting the violations of the resource limits of the workers as verdicts
+    @pytest.mark.skipif(sys.platform != "linux", reason="Requires the resource limits enforced by Linux")
+    def test_run_test_with_resource_limits(self):
+        limits = ResourceLimits(address_space=2 << 30, cpu_time=1, open_files=64, file_size=100_000)
+        tester = Tester(2023, debug=True, runtime_limit=30, seed=2023, resource_limits=limits)
+        with contextlib.redirect_stdout(io.StringIO()) as buffer:
+            report = tester.run_test(ResourceMockClass.left_max, num_test_cases=12)
+        assert report.verdicts == {
+            "address_space_limit": 5, "cpu_time_limit": 2, "file_size_limit": 3, "open_files_limit": 2
+        }
+        assert {case["verdict"] for case in report.failed_cases} == set(report.verdicts)
+        assert "Failed cases by verdict" in buffer.getvalue()
+
+        with pytest.raises(ValueError):
+            ResourceLimits(cpu_time=0)
+
+    # Test running concurrent gradings on one event loop
+    def test_run_test_async(self):
+        async def grade():
+            tester = Tester(2023, debug=True, runtime_limit=30, seed=2023, max_concurrency=2)
+            reports = await asyncio.gather(*(
+                tester.run_test_async(MockClass.calculate_sum, num_test_cases=1000) for _ in range(6)
+            ))
+            tester.close()
+            return reports
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            reports = asyncio.run(grade())
+        assert [report.passed_count for report in reports] == [1000] * 6
+
+        with pytest.raises(ValueError):
+            Tester(2023, max_concurrency=0)
+
+    # Test cancelling an async grading kills its workers
+    def test_run_test_async_cancel(self):
+        async def grade():
+            tester = Tester(2023, debug=True, runtime_limit=60, jobs=2)
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(tester.run_test_async(MockClass.nearest_odd, num_test_cases=100), 1.5)
+            tester.close()
+
+        asyncio.run(grade())
+        assert multiprocessing.active_children() == []
+
+    # Test rejecting asynchronous runs in the calling process
+    def test_run_test_async_in_process(self):
+        with pytest.raises(ValueError):
+            asyncio.run(Tester(2023, log_option="none", in_process=True).run_test_async(MockClass.calculate_sum))
+
+    # Test running the test cases in the calling process
+    def test_run_test_inline(self):
+        tester = Tester(2023, debug=True, runtime_limit=30, in_process=True, case_timeout=0.2, log_option="none")
+        report = tester.run_test(MockClass.nearest_odd, num_test_cases=3)
+        assert report.verdicts == {"timeout": 3}
+
+    # Test grading a directory of submissions into a gradebook
+    def test_cli_gradebook(self):
+        submissions = {
+            "alice.py": "from mygrader.src import Solution\ncalculate_sum = Solution.calculate_sum\n",
+            "bob.py": "def calculate_sum(x, y):\n    return 0\n",
+            "carol.py": "print('hello'\n",
+        }
+        with tempfile.TemporaryDirectory() as directory:
+            for name, source in submissions.items():
+                with open(os.path.join(directory, name), "w") as file:
+                    file.write(source)
+
+            gradebook = os.path.join(directory, "gradebook.csv")
+            with contextlib.redirect_stdout(io.StringIO()):
+                assert main([directory, "-f", "calculate_sum", "kth_digit", "-j", "2", "-o", gradebook]) == 0
+
+            with open(gradebook, newline="") as file:
+                grades = [(row["student"], row["function"], row["status"], row["score"]) for row in csv.DictReader(file)]
+
+        assert grades == [
+            ("alice", "calculate_sum", "ok", "100.0"),
+            ("alice", "kth_digit", "missing", "0.0"),
+            ("bob", "calculate_sum", "ok", "0.0"),
+            ("bob", "kth_digit", "missing", "0.0"),
+            ("carol", "calculate_sum", "error", "0.0"),
+            ("carol", "kth_digit", "error", "0.0"),
+        ]
+
+    # Test comparing nested outputs with tolerances
+    def test_comparator(self):
+        compare = Comparator()
+        assert compare((0.1 + 0.2, [1 / 3, 2.0]), (0.3, [0.3333333333333333, 2.0]))
+        assert not compare([0.3, 1.0], (0.3, 1.0))
+        assert not compare({"x": 1.0}, {"x": 1.1})
+        assert compare(float("nan"), float("nan"))
+        assert not compare(float("inf"), 1e308)
+
+        near_one = 1.0 + 2 ** -52
+        assert not Comparator(rel_tol=0.0)(near_one, 1.0)
+        assert Comparator(rel_tol=0.0, ulps=1)(near_one, 1.0)
+
+        # Long float lists are compared as arrays, with the same result as leaf by leaf
+        expected = [i / 7 for i in range(1000)]
+        output = [x * (1 + 1e-12) for x in expected]
+        assert compare(output, expected)
+        output[500] += 1e-3
+        assert not compare(output, expected)
+        assert not compare([float("inf")] * 100, [float("inf")] * 99 + [1e308])
+        assert Comparator(rel_tol=0.0, ulps=1)([near_one] * 100, [1.0] * 100)
+
+    # Test the batch solvers give exactly the outputs of the scalar solvers
+    @pytest.mark.parametrize("func_name", [
+        "calculate_sum", "sphere_volume", "octagon_area", "find_r_from_surface_area", "kth_digit",
+        "set_kth_digit", "nearest_odd", "calculate_triangle_area", "left_max"
+    ])
+    def test_batch_solution(self, func_name):
+        cases = list(Generator.iter_cases(func_name, 2023, 0, 5000))
+        expected = [getattr(Solution, func_name)(*params) for params in cases]
+        outputs = getattr(BatchSolution, func_name)(*zip(*cases))
+        assert outputs == expected
+        assert [type(output) for output in outputs] == [type(output) for output in expected]
+
+    # Test the vectorized digit solvers fall back to exact ints where int64 arithmetic would overflow
+    def test_batch_solution_large_digits(self):
+        cases = [(10 ** 30 + 7, 30), (-2 ** 63, 18), (2 ** 63 - 1, 18), (12345, 19), (987, -1), (5, 0)]
+        assert BatchSolution.kth_digit(*zip(*cases)) == [Solution.kth_digit(*params) for params in cases]
+
+        cases = [(10 ** 30, 25, 4), (9 * 10 ** 17, 17, 9), (10 ** 18, 3, 1), (-2 ** 63, 18, 3), (5, 0, 12)]
+        assert BatchSolution.set_kth_digit(*zip(*cases)) == [Solution.set_kth_digit(*params) for params in cases]
+
+    # Test grading custom batches beyond the range of the NumPy types of the batch solvers
+    def test_run_test_batch_out_of_range(self):
+        cases = [(2 ** 62, 2 ** 62 + 5), (10 ** 20, 10 ** 20 + 3), (-5, 7), (1, 100)]
+        expected = [Solution.calculate_sum(*params) for params in cases]
+        assert BatchSolution.calculate_sum(*zip(*cases)) == expected
+
+        tester = Tester(2023, log_option="none")
+        report = tester.run_test(MockClass.calculate_sum, cases=TestCaseBatch.from_cases(cases * 10))
+        assert report.passed_count == 40
+
+        cases = [(1e19,), (-3e18,), (2.5,)]
+        expected = [Solution.nearest_odd(*params) for params in cases]
+        assert BatchSolution.nearest_odd(*zip(*cases)) == expected
+        report = tester.run_test(Solution.nearest_odd, cases=TestCaseBatch.from_cases(cases * 10))
+        assert report.passed_count == 30
+
+        # The solver fails on NaN, like without a batch solver
+        with pytest.raises(ValueError):
+            Solution.nearest_odd(float("nan"))
+        with pytest.raises(Exception, match="Error occurred while running test cases"):
+            tester.run_test(WrongMockClass.nearest_odd, cases=TestCaseBatch.from_cases([(1.5,), (float("nan"),)]))
+
+    # Test generating cases in bulk gives exactly the cases generated one by one
+    @pytest.mark.parametrize("func_name", list(Generator.BULK_CASES) + ["median_of_median", "left_max"])
+    def test_bulk_cases(self, func_name):
+        start, stop = (0, 101) if func_name in Generator.RANGE_CASES else (3000, 8000)
+        expected = [Generator.case(func_name, 2023, index) for index in range(start, stop)]
+
+        cases = list(Generator.iter_cases(func_name, 2023, start, stop))
+        assert cases == expected
+        assert [list(map(type, params)) for params in cases] == [list(map(type, params)) for params in expected]
+        assert Generator.to_cases(Generator.columns(func_name, 2023, 0, 50)) == \
+            [Generator.case(func_name, 2023, index) for index in range(50)]
+
+    # Test a columnar batch gives back its test cases, locally and from shared memory
+    def test_test_case_batch(self):
+        cases = [
+            (1, 2.5, True, "héllo", [1, 2], [1.0]), (-3, 0.1, False, "", [], []), (2 ** 62, -1.0, True, "x", [5], [])
+        ]
+        batch = TestCaseBatch.from_cases(cases, seed=7)
+        assert list(batch) == cases and batch[2] == cases[2] and len(batch) == 3
+        assert list(pickle.loads(pickle.dumps(batch))) == cases
+
+        with batch.share() as shared:
+            attached = pickle.loads(pickle.dumps(shared))
+            assert attached.shared and attached.cases(1, 3) == cases[1:]
+            attached.close()
+
+        with pytest.raises(TypeError):
+            TestCaseBatch.from_cases([(1,), (1.5,)])
+
+        batch = TestCaseBatch.generate(Generator, "kth_digit", 2023, 100_000)
+        assert batch.nbytes == 100_000 * 2 * 8
+        assert batch.cases(500, 600) == list(Generator.iter_cases("kth_digit", 2023, 500, 600))
+
+        # The milliseconds of display_time go beyond an int64
+        batch = TestCaseBatch.generate(Generator, "display_time", 2023, 1000)
+        assert list(batch) == list(Generator.iter_cases("display_time", 2023, 0, 1000))
+        assert max(ms for ms, in batch) > 2 ** 63
+
+    # Test running the test cases of a batch shared with the workers
+    def test_run_test_batch(self):
+        batch = TestCaseBatch.generate(Generator, "nearest_odd", 2023, 3000)
+        expected = sum(number >= 500 and Solution.nearest_odd(number) != 0 for number, in batch)
+
+        report = Tester(2023, log_option="none", jobs=2).run_test(WrongMockClass.nearest_odd, cases=batch)
+        assert report.seed == 2023 and report.failed_count == expected
+        assert report.passed_count + report.failed_count == 3000
+        assert not batch.shared
+
+    # Test fitting growth classes to runtime curves
+    def test_fit_growth(self):
+        sizes = [2 ** k for k in range(4, 14)]
+        assert fit_growth(sizes, [1e-6 + 1e-8 * n for n in sizes])[0] == "O(n)"
+        assert fit_growth(sizes, [1e-6 + 1e-9 * n * n for n in sizes])[0] == "O(n^2)"
+        assert fit_growth(sizes, [1e-6 * 1.01 ** n for n in sizes])[0] == "O(c^n)"
+        assert fit_growth(list(range(1, 10)), [1e-6 * 4 ** n for n in range(1, 10)])[0] == "O(c^n)"
+        with pytest.raises(ValueError):
+            fit_growth([1, 2], [1.0, 2.0])
+
+    # Test measuring the complexity of a correct but quadratic function
+    def test_measure_complexity(self):
+        tester = Tester(2023, debug=True)
+        with contextlib.redirect_stdout(io.StringIO()) as buffer:
+            report = tester.measure_complexity(SlowMockClass.left_max, time_limit=20, max_size=2048)
+        assert report.sizes == [16, 32, 64, 128, 256, 512, 1024, 2048]
+        assert report.growth["user"] == "O(n^2)"
+        assert report.scaling_ratio > 10
+        assert report.mismatched_sizes == []
+        assert "Scaling ratio" in buffer.getvalue()
+
+        with pytest.raises(ValueError):
+            tester.measure_complexity(MockClass.calculate_sum)
+
+    # Test encoding and merging the results of shards
+    def test_shard_result(self):
+        failed = {"index": 3, "input": (1, 2), "expected": 3, "result": "3"}
+        unmarshallable = {"index": 5, "input": (1,), "expected": 1, "result": MockClass()}
+        first = ShardResult.decode(ShardResult(0, 4, 3, 1, failed_cases=[failed]).encode())
+        second = ShardResult.decode(ShardResult(4, 6, 1, 1, failed_cases=[unmarshallable]).encode())
+        assert (first.start, first.stop, first.failed_cases) == (0, 4, [failed])
+        assert isinstance(second.failed_cases[0]["result"], MockClass)
+
+        first.merge(second, max_failed_cases=1)
+        assert (first.start, first.stop, first.num_cases) == (0, 6, 6)
+        assert first.failed_cases == [failed]
+
+    # Test an output that cannot be pickled fails its case instead of the run
+    def test_run_test_unpicklable_output(self):
+        report = Tester(2023, log_option="none", jobs=2).run_test(LazyMockClass.left_max, 200)
+        assert report.failed_count == 200 and report.verdicts == {"wrong_output": 200}
+        assert all(case["result"].startswith("<generator object") for case in report.failed_cases)
+        assert all(case["input"] and isinstance(case["expected"], list) for case in report.failed_cases)
+
+    # Test a failing run keeps a bounded uniform sample and spills every failed case to the failure log
+    def test_failure_log(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "failures.jsonl.gz")
+            tester = Tester(2023, log_option="none", jobs=2, seed=2023, failure_log=path)
+            report = tester.run_test(WrongMockClass.calculate_sum, 5000)
+
+            with gzip.open(path, "rt") as log:
+                failures = [json.loads(line) for line in log]
+            assert os.listdir(directory) == ["failures.jsonl.gz"]
+
+        assert sorted(case["index"] for case in failures) == list(range(5000))
+        assert len(report.failed_cases) == Tester.MAX_FAILED_CASES
+        lowest_keys = sorted(range(5000), key=sample_key)[:Tester.MAX_SAMPLED_CASES]
+        assert [case["index"] for case in report.sampled_cases] == lowest_keys
+
+    # Test failed cases are grouped by signature, with the rarest signatures merged beyond the maximum
+    def test_failure_clusters(self):
+        report = Tester(2023, log_option="none", jobs=2).run_test(WrongMockClass.reverse_digits, 2000)
+        assert report.failed_count > 0
+        assert [(cluster["signature"], cluster["count"]) for cluster in report.clusters] == [
+            ("off by +1, inputs (-)", report.failed_count)
+        ]
+
+        case = {"index": 0, "input": (), "expected": 1, "result": 2, "verdict": "wrong_output"}
+        clusters = merge_clusters({"a": [3, case], "b": [1, case]}, {"c": [2, {**case, "index": 7}]}, max_clusters=2)
+        assert clusters == {"a": [3, case], "other": [3, case]}
+
+    # Test exceptions of the user function fail their cases, grouped by raise site, and the run goes on
+    def test_run_test_exceptions(self):
+        report = Tester(2023, log_option="none", jobs=2).run_test(RaisingMockClass.nearest_odd, 2000)
+        assert report.num_cases == 2000 and report.passed_count > 0
+        assert report.verdicts == {"runtime_error": report.failed_count}
+        assert [error["site"].split(" at ")[0] for error in report.errors] in (
+            ["ZeroDivisionError", "SystemExit"], ["SystemExit", "ZeroDivisionError"]
+        )
+        assert sum(error["count"] for error in report.errors) == report.failed_count
+        assert all(os.path.join("mygrader", "mygrader.py") not in error["traceback"] for error in report.errors)
+        assert all("in nearest_odd" in error["traceback"] for error in report.errors)
+
+    # Test recording the cases that kill their worker process as crashes
+    @pytest.mark.skipif(sys.platform == "win32", reason="Requires POSIX signals")
+    def test_run_test_crashes(self):
+        tester = Tester(2023, log_option="none", jobs=2, runtime_limit=60, seed=1)
+        report = tester.run_test(CrashingMockClass.nearest_odd, 300)
+        crashes = [case for case in report.failed_cases if case["verdict"] == "crash"]
+        assert report.num_cases == 300 and report.passed_count == 300 - len(crashes)
+        assert crashes and report.verdicts == {"crash": len(crashes)}
+        assert {case["result"] for case in crashes} == {
+            "Worker killed by signal SIGKILL (possibly out of memory)", "Worker exited with exit code 3"
+        }
+        assert all((case["input"][0] < 10) == ("SIGKILL" in case["result"]) for case in crashes)
+
+    # Test generating test cases lazily
+    def test_iter_seeded_test_cases(self):
+        test_cases = Generator.iter_cases("kth_digit", 2023, 10, 20)
+        assert next(test_cases) == Generator.case("kth_digit", 2023, 10)
+        assert list(test_cases) == Generator.kth_digit_test_cases(20, seed=2023)[11:]
+
     # Test running a test with mismatched data type
     def test_run_test_mismatched_data_type(self):
         tester = Tester(2023, debug=True)